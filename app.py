@@ -1,7 +1,11 @@
+import os
+
 import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 
+from utils.barrido import iniciar_pool
+
 external_stylesheets = [
     dbc.themes.BOOTSTRAP,
     "https://maxcdn.bootstrapcdn.com/font-awesome/4.7.0/css/font-awesome.min.css",
@@ -102,5 +106,12 @@ def toggle_offcanvas(n, is_open):
 # ===============================
 # RUN
 # ===============================
+DEBUG = True
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Pool de procesos compartido por el servicio de solvers y los barridos,
+    # creado antes de que el servidor abra hilos. Con el recargador de debug
+    # solo lo crea el proceso hijo que sirve las peticiones.
+    if not DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        iniciar_pool()
+    app.run(debug=DEBUG)
@@ -5,6 +5,8 @@ import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
 
+from utils.functions import registrar_logistica_interactiva
+
 # --- Página multipage (puedes cambiar el path/name si quieres) ---
 dash.register_page(__name__, path='/pagina2', name='Pagina 2', order=2)
 
@@ -147,7 +149,8 @@ $
                         ], md=6),
                     ], className="mb-3"),
 
-                    dcc.Graph(id="graph-logistico", style={'height': '360px', 'width': '100%'}),
+                    dcc.Graph(id="graph-logistico", figure=make_figure(100, 0.03, 1000, 300, 20),
+                              style={'height': '360px', 'width': '100%'}),
 
                     html.Div(id="info-logistico", style={"marginTop":"6px","color":"#333"})
                 ])
@@ -158,31 +161,12 @@ $
 ], fluid=True)
 
 # ---------- Callbacks ----------
-@dash.callback(
-    Output("graph-logistico", "figure"),
-    Output("info-logistico", "children"),
-    Input("inp-P0", "value"),
-    Input("inp-r", "value"),
-    Input("inp-K", "value"),
-    Input("inp-tmax", "value"),
-    Input("inp-npoints", "value"),
+# La curva tiene forma cerrada: se evalúa en el navegador y solo se
+# parchean los datos de la traza, la línea de K y el texto informativo.
+registrar_logistica_interactiva(
+    "graph-logistico", "info-logistico",
+    ["inp-P0", "inp-r", "inp-K", "inp-tmax", "inp-npoints"],
 )
-def update_graph(P0, r, K, tmax, npoints):
-    # Sane defaults
-    P0 = 0 if P0 is None else P0
-    r  = 0.0 if r is None else r
-    K  = 1.0 if K is None else K
-    tmax = 100 if tmax is None else tmax
-    npoints = 200 if npoints is None else npoints
-
-    fig = make_figure(P0, r, K, tmax, npoints)
-
-    info = (
-        f"Modelo: dP/dt = r·P·(1 - P/K).  "
-        f"Solución: P(t) = K / (1 + ((K - P₀)/P₀) e^(-r t)).  "
-        f"Usando P₀={P0:g}, r={r:g}, K={K:g}, t_max={tmax:g}, puntos={npoints}."
-    )
-    return fig, info
 
 # ---------- Ejecutar standalone (opcional) ----------
 if __name__ == '__main__':
@@ -4,61 +4,12 @@ import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
 
-dash.register_page(__name__, path='/pagina3', name='Pagina 3')
-
-layout = dbc.Container([
-    dbc.Row([
-        # === COLUMNA IZQUIERDA: PARÁMETROS ===
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Parámetros del modelo"),
-                dbc.CardBody([
-                    dbc.Label("Población inicial P(0):"),
-                    dbc.Input(id="input-p0", type="number", value=200, className="mb-2"),
-
-                    dbc.Label("Tasa de crecimiento (r):"),
-                    dbc.Input(id="input-r", type="number", value=0.04, className="mb-2"),
-
-                    dbc.Label("Capacidad de carga (K):"),
-                    dbc.Input(id="input-k", type="number", value=750, className="mb-2"),
-
-                    dbc.Label("Tiempo máximo (t):"),
-                    dbc.Input(id="input-t", type="number", value=100, className="mb-3"),
-
-                    dbc.Button("Generar gráfica", id="btn-generar", color="primary", className="w-100")
-                ])
-            ], className="shadow")
-        ], md=4),
-
-        # === COLUMNA DERECHA: GRÁFICA ===
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Gráfica del modelo"),
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='grafica-poblacion',
-                        style={'height': '350px', 'width': '100%'}
-                    )
-                ])
-            ], className="shadow")
-        ], md=8)
-    ], className="mt-4")
-], fluid=True)
-
-
+from utils.functions import registrar_logistica_boton
 
+dash.register_page(__name__, path='/pagina3', name='Pagina 3')
 
-### Callbacks ###
-@dash.callback(
-    Output('grafica-poblacion', 'figure'),
-    Input('btn-generar', 'n_clicks'),
-    State('input-p0', 'value'),
-    State('input-r', 'value'),
-    State('input-k', 'value'),
-    State('input-t', 'value'),
-    prevent_initial_call=False
-)
-def actualizar_grafica(n_clicks, P0, r, K, t_max):
+def figura_poblacion(P0, r, K, t_max):
+    """Figura inicial; los clics posteriores solo parchean sus datos en el navegador."""
     # Generar los valores de tiempo
     t = np.linspace(0, t_max, 20)
 
@@ -102,3 +53,48 @@ def actualizar_grafica(n_clicks, P0, r, K, t_max):
     return fig
 
 
+layout = dbc.Container([
+    dbc.Row([
+        # === COLUMNA IZQUIERDA: PARÁMETROS ===
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader("Parámetros del modelo"),
+                dbc.CardBody([
+                    dbc.Label("Población inicial P(0):"),
+                    dbc.Input(id="input-p0", type="number", value=200, className="mb-2"),
+
+                    dbc.Label("Tasa de crecimiento (r):"),
+                    dbc.Input(id="input-r", type="number", value=0.04, className="mb-2"),
+
+                    dbc.Label("Capacidad de carga (K):"),
+                    dbc.Input(id="input-k", type="number", value=750, className="mb-2"),
+
+                    dbc.Label("Tiempo máximo (t):"),
+                    dbc.Input(id="input-t", type="number", value=100, className="mb-3"),
+
+                    dbc.Button("Generar gráfica", id="btn-generar", color="primary", className="w-100")
+                ])
+            ], className="shadow")
+        ], md=4),
+
+        # === COLUMNA DERECHA: GRÁFICA ===
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader("Gráfica del modelo"),
+                dbc.CardBody([
+                    dcc.Graph(
+                        id='grafica-poblacion',
+                        figure=figura_poblacion(200, 0.04, 750, 100),
+                        style={'height': '350px', 'width': '100%'}
+                    )
+                ])
+            ], className="shadow")
+        ], md=8)
+    ], className="mt-4")
+], fluid=True)
+
+
+### Callbacks ###
+# P(t) tiene forma cerrada: se evalúa en el navegador con cada clic
+registrar_logistica_boton('grafica-poblacion', 'btn-generar',
+                          ['input-p0', 'input-r', 'input-k', 'input-t'])
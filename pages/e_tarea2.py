@@ -2,7 +2,7 @@ import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc 
 # Importa tu función utilitaria
-from utils.functions import build_logistic_figure
+from utils.functions import build_logistic_figure, registrar_logistica_boton
 dash.register_page(__name__, path='/pagina4', name='Pagina 4')
 
 layout = dbc.Container([
@@ -41,6 +41,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dcc.Graph(
                         id='grafica-poblacion2',
+                        figure=build_logistic_figure(200, 0.04, 750, 100, npoints=20),
                         style={'height': '350px', 'width': '100%'}
                     )
                 ])
@@ -50,20 +51,6 @@ layout = dbc.Container([
 ], fluid=True)
 
 
-@dash.callback(
-    Output('grafica-poblacion2', 'figure'),
-    Input('btn-generar', 'n_clicks'),
-    State('input-p0', 'value'),
-    State('input-r', 'value'),
-    State('input-k', 'value'),
-    State('input-t', 'value'),
-    prevent_initial_call=False
-)
-def actualizar_grafica(n_clicks, P0, r, K, t_max):
-    if None in (P0, r, K, t_max):
-        # Devuelve figura vacía o un placeholder si faltan datos
-        return build_logistic_figure(0, 0.0, 1, 1)  # o go.Figure()
-    # Delegas todo el dibujo a la función de utils
-    return build_logistic_figure(P0, r, K, t_max, npoints=20)
-
-
+# Con cada clic la curva se evalúa en el navegador y solo se parchean los datos
+registrar_logistica_boton('grafica-poblacion2', 'btn-generar',
+                          ['input-p0', 'input-r', 'input-k', 'input-t'], npoints=20)
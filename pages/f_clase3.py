@@ -3,8 +3,19 @@ import dash_bootstrap_components as dbc
 import dash
 import plotly.graph_objects as go
 import numpy as np
+
+from utils.campo import (animar_particulas, cuadros_particulas, escala_por_celda,
+                         integrar_trayectorias, malla_adaptativa, particulas_aleatorias,
+                         semillas_malla, traza_trayectorias, trazas_quiver)
+from utils.expresiones import ErrorExpresion, compilar_expresion
+from utils.fase import CAPAS, analizar_campo, campo_escalar, reducir_malla, traza_capa, trazas_analisis
+
 dash.register_page(__name__, path='/pagina5', name='Campo Vectorial')
 
+MAX_MALLADO = 200   # 200×200 = 40 000 flechas en dos trazas WebGL
+MAX_SEMILLAS = 60   # por eje: 3600 trayectorias
+PASOS_TRAYECTORIA = 200
+
 layout = dbc.Container([
     dbc.Row([
         # ------------------ COLUMNA IZQUIERDA (controles) ------------------
@@ -41,6 +52,58 @@ layout = dbc.Container([
                           className="form-control", debounce=True)
             ], className="mb-3"),
 
+            html.Div([
+                html.Label("Modo", className="form-label fw-semibold"),
+                dcc.RadioItems(
+                    id="input-modo",
+                    options=[
+                        {"label": "Flechas", "value": "flechas"},
+                        {"label": "Malla adaptativa", "value": "adaptativa"},
+                        {"label": "Trayectorias", "value": "trayectorias"},
+                        {"label": "Animación de partículas", "value": "animacion"},
+                    ],
+                    value="flechas",
+                    inline=True,
+                    inputClassName="me-1",
+                    labelClassName="me-3",
+                )
+            ], className="mb-3"),
+
+            html.Div([
+                html.Label("Capa de fondo", className="form-label fw-semibold"),
+                dcc.Dropdown(
+                    id="input-capa",
+                    options=[
+                        {"label": "Ninguna", "value": "ninguna"},
+                        {"label": "Magnitud |F|", "value": "magnitud"},
+                        {"label": "Divergencia", "value": "divergencia"},
+                        {"label": "Rotacional", "value": "rotacional"},
+                    ],
+                    value="ninguna",
+                    clearable=False,
+                )
+            ], className="mb-3"),
+
+            dcc.Checklist(
+                id="input-analisis",
+                options=[{"label": "Nulclinas y equilibrios", "value": "analisis"}],
+                value=[],
+                inputClassName="me-1",
+                className="mb-3",
+            ),
+
+            html.Div([
+                html.Label("Semillas por eje (trayectorias y partículas)", className="form-label fw-semibold"),
+                dcc.Input(id="input-semillas", type="number", value=20,
+                          className="form-control", debounce=True)
+            ], className="mb-3"),
+
+            html.Div([
+                html.Label("Tiempo de integración (trayectorias y animación)", className="form-label fw-semibold"),
+                dcc.Input(id="input-tiempo-campo", type="number", value=5,
+                          className="form-control", debounce=True)
+            ], className="mb-3"),
+
             html.Button("Generar campo", id="btn-generar",
                         className="btn btn-primary w-100 my-2"),
 
@@ -73,6 +136,26 @@ layout = dbc.Container([
     ], className="g-4")   # g-4 = espacio horizontal entre columnas
 ], fluid=True)
 
+def mensaje_error(error):
+    """Mensaje con el componente, el motivo y la posición del error."""
+    detalle = [html.Strong(f"Error en {error.componente or 'la expresión'}: "),
+               error.mensaje]
+    if error.columna:
+        detalle.append(html.Pre(f"{error.expresion}\n{' ' * (error.columna - 1)}^",
+                                className="mb-0 mt-1"))
+    return html.Div(detalle, className="text-danger")
+
+
+def describir_equilibrios(puntos, maximo=8):
+    """Lista corta de equilibrios con su tipo."""
+    if not puntos:
+        return "Sin equilibrios en la ventana."
+    texto = "; ".join(f"({p['x']:.3f}, {p['y']:.3f}) {p['tipo']}" for p in puntos[:maximo])
+    if len(puntos) > maximo:
+        texto += f"; … ({len(puntos) - maximo} más)"
+    return f"Equilibrios: {texto}"
+
+
 @dash.callback(
     Output("grafica-campo", "figure"),
     Output("info-campo", "children"),
@@ -82,10 +165,17 @@ layout = dbc.Container([
     State("input-xmax", "value"),
     State("input-ymax", "value"),
     State("input-n", "value"),
+    State("input-modo", "value"),
+    State("input-semillas", "value"),
+    State("input-tiempo-campo", "value"),
+    State("input-analisis", "value"),
+    State("input-capa", "value"),
     prevent_initial_call=False
 )
 
-def graficar_campo(n_clicks, fx_str, fy_str, xmax, ymax, n):
+def graficar_campo(n_clicks, fx_str, fy_str, xmax, ymax, n, modo="flechas", semillas=20, tiempo=5,
+                   analisis=(), capa="ninguna"):
+    n = int(np.clip(n or 15, 2, MAX_MALLADO))
     # Crear el mallado (rejilla)
     x = np.linspace(-xmax, xmax, n)
     y = np.linspace(-ymax, ymax, n)
@@ -93,56 +183,81 @@ def graficar_campo(n_clicks, fx_str, fy_str, xmax, ymax, n):
     info_mensaje = ""
 
     try:
-        # Diccionario de funciones disponibles para eval()
-        diccionario = {
-            'X': X,
-            'Y': Y,
-            'np': np,
-            'sin': np.sin,
-            'cos': np.cos,
-            'tan': np.tan,
-            'exp': np.exp,
-            'sqrt': np.sqrt
-        }
-
-        
-        fx = eval(fx_str, {}, diccionario)
-        fy = eval(fy_str, {}, diccionario)
-
-        
-        mag_max = np.max(np.sqrt(fx**2 + fy**2))
-        mag_min = np.min(np.sqrt(fx**2 + fy**2))
-
-   
+        # Expresiones validadas y compiladas una sola vez (utils.expresiones)
+        expresiones = []
+        for nombre, texto in (("dx/dt", fx_str), ("dy/dt", fy_str)):
+            try:
+                expresiones.append(compilar_expresion(texto))
+            except ErrorExpresion as error:
+                error.componente = nombre
+                raise
+        ex_fx, ex_fy = expresiones
+
+        def campo(x, y):
+            return ex_fx(X=x, Y=y), ex_fy(X=x, Y=y)
+
+        fx, fy = campo(X, Y)
+
+        magnitud = np.hypot(fx, fy)
+        mag_max = np.nanmax(magnitud)
+        mag_min = np.nanmin(magnitud)
+
         info_mensaje = f"Magnitud: min = {mag_min:.2f}, max = {mag_max:.2f}"
 
-    except Exception as error:
+    except ErrorExpresion as error:
         fx = np.zeros_like(X)
         fy = np.zeros_like(Y)
-        info_mensaje = f"Error en las expresiones: {str(error)}"
-
-    fig = go.Figure()
-
-    for i in range(n):
-        for j in range(n):
-            # Puntos iniciales (x0, y0)
-            x0, y0 = X[i, j], Y[i, j]
-            # Puntos finales (x1, y1)
-            x1, y1 = x0 + fx[i, j], y0 + fy[i, j]
-
-            # Agregar una línea con marcador (flecha)
-            fig.add_trace(go.Scatter(
-                x=[x0, x1],
-                y=[y0, y1],
-                mode="lines+markers",
-                line=dict(color="blue", width=2),
-                marker=dict(size=[3, 5], color=["blue", "red"]),
-                showlegend=False,
-                hovertemplate=(
-                    f"Punto: ({x0:.1f}, {y0:.1f})<br>"
-                    f"Vector: ({fx[i, j]:.2f}, {fy[i, j]:.2f})"
-                )
-            ))
+        campo = None
+        info_mensaje = mensaje_error(error)
+
+    if modo == "trayectorias" and campo is not None:
+        # Todas las semillas avanzan juntas; una sola traza con todas las curvas
+        semillas = int(np.clip(semillas or 20, 1, MAX_SEMILLAS))
+        x0, y0 = semillas_malla(xmax, ymax, semillas)
+        xs, ys = integrar_trayectorias(campo, x0, y0, tiempo or 5, PASOS_TRAYECTORIA,
+                                       (-xmax, xmax, -ymax, ymax))
+        fig = go.Figure(traza_trayectorias(xs, ys))
+        fuera = int((~np.isfinite(xs[:, [0, -1]])).any(axis=1).sum())
+        info_mensaje = (f"{info_mensaje} · {x0.size} trayectorias, {PASOS_TRAYECTORIA} pasos RK4 "
+                        f"por sentido; {fuera} salieron de la ventana")
+    elif modo == "animacion" and campo is not None:
+        # Todas las posiciones se calculan aquí; el navegador solo reproduce cuadros
+        n_particulas = int(np.clip(semillas or 20, 1, MAX_SEMILLAS)) ** 2
+        x0, y0 = particulas_aleatorias(xmax, ymax, n_particulas)
+        xs, ys = cuadros_particulas(campo, x0, y0, tiempo or 5, (-xmax, xmax, -ymax, ymax))
+        fig = go.Figure(trazas_quiver(X, Y, fx, fy, color="lightsteelblue",
+                                      color_punta="lightsteelblue"))
+        animar_particulas(fig, xs, ys, tiempo or 5)
+        info_mensaje = (f"{info_mensaje} · {n_particulas} partículas, {len(xs)} cuadros; "
+                        f"{int(np.isfinite(xs[-1]).sum())} siguen en la ventana al final")
+    elif modo == "adaptativa" and campo is not None:
+        # Quadtree: más flechas donde el campo cambia rápido, con tope de flechas
+        malla = malla_adaptativa(campo, xmax, ymax, n)
+        fig = go.Figure(trazas_quiver(malla["x"], malla["y"], malla["u"], malla["v"],
+                                      escala=escala_por_celda(malla)))
+        niveles = np.bincount(malla["nivel"])
+        info_mensaje = (f"{info_mensaje} · {malla['x'].size} flechas adaptativas "
+                        f"(por nivel: {', '.join(str(k) for k in niveles)})")
+    else:
+        # Todas las flechas en dos trazas (segmentos separados por NaN + bases)
+        fig = go.Figure(trazas_quiver(X, Y, fx, fy))
+
+    if capa in CAPAS and campo is not None:
+        # |F|, divergencia o rotacional en malla fina, debajo de todo lo demás
+        x_capa, y_capa, Z = campo_escalar(campo, xmax, ymax, capa)
+        fig = go.Figure([traza_capa(*reducir_malla(x_capa, y_capa, Z), capa), *fig.data],
+                        layout=fig.layout,
+                        frames=[c.update(traces=[i + 1 for i in c.traces]) for c in fig.frames])
+        finitos = Z[np.isfinite(Z)]
+        if finitos.size:
+            info_mensaje = (f"{info_mensaje} · {CAPAS[capa]['titulo']} en {Z.shape[1]}×{Z.shape[0]}: "
+                            f"min = {finitos.min():.2f}, max = {finitos.max():.2f}")
+
+    if analisis and campo is not None:
+        # Nulclinas (marching squares) y equilibrios (Newton vectorizado) en malla fina
+        resultado = analizar_campo(campo, xmax, ymax)
+        fig.add_traces(trazas_analisis(resultado))
+        info_mensaje = [info_mensaje, html.Br(), describir_equilibrios(resultado["equilibrios"])]
 
     fig.update_layout(
     title=dict(
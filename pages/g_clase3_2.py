@@ -1,9 +1,12 @@
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 import dash
-import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import odeint
+from utils.muestreo import (simular_adaptativo, presupuesto_puntos, ancho_de,
+                            registrar_ancho_graficas, parche_zoom)
+from utils.servicio import SERVICIO_SOLVER
+from utils.figuras import (actualizar_figura, store_firma, id_firma, resumen_envio,
+                           figura_rapida, linea)
 dash.register_page(__name__, path='/pagina6', name='Modelo SIR')
 
 layout = dbc.Container([
@@ -56,123 +59,87 @@ layout = dbc.Container([
                 id="grafica-sir",
                 style={"height": "460px", "width": "100%"},
                 className="border rounded shadow-sm"
-            )
+            ),
+            html.Div(id="envio-sir", className="text-muted small mt-1"),
+            dcc.Store(id="ancho-sir"),
+            dcc.Store(id="sim-sir"),
+            store_firma("grafica-sir")
         ], md=8, lg=8)  # <-- DERECHA
     ], className="g-4")   # g-4 = espacio horizontal entre columnas
 ], fluid=True)
 
-def modelo_sir(y, t, beta, gamma, N):
-    S,I,R = y
-
-    dS_dt = -beta * S * I / N
-    dI_dt = beta * S * I / N - gamma * I
-    dR_dt = gamma * I
-
-    return [dS_dt, dI_dt, dR_dt]
+registrar_ancho_graficas("ancho-sir", ["grafica-sir"])
 
 # --- Callback para actualizar la gráfica ---
 @dash.callback(
     Output("grafica-sir", "figure"),
+    Output("sim-sir", "data"),
+    Output(id_firma("grafica-sir"), "data"),
+    Output("envio-sir", "children"),
     Input("btn-simular", "n_clicks"),
     State("input-N", "value"),
     State("input-beta", "value"),
     State("input-gamma", "value"),
     State("input-I0", "value"),
     State("input-tiempo", "value"),
+    State("ancho-sir", "data"),
+    State(id_firma("grafica-sir"), "data"),
     prevent_initial_call=False
 )
 
 
 
-def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max):
+def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max, anchos, firma):
     S0 = N - I0
     R0_inicial = 0
     y0 = [S0, I0, R0_inicial]
 
-    # Crear el vector de tiempo
-    t = np.linspace(0, tiempo_max, 200)
+    params = {"beta": beta, "gamma": gamma, "N": N}
+    simulacion = None
 
     try:
-        solucion = odeint(modelo_sir, y0, t, args=(beta, gamma, N))
-        S, I, R = solucion.T
+        # Muestreo adaptativo: tantos puntos como permite el ancho de la gráfica
+        t, y = simular_adaptativo("sir", y0, params,
+                                  tiempo_max, presupuesto_puntos(ancho_de(anchos, "grafica-sir")),
+                                  ejecutar=SERVICIO_SOLVER.extender, method="LSODA")
+        S, I, R = y[:, 0, :]
+        simulacion = {"y0": y0, "params": params, "t_max": tiempo_max}
 
     except Exception as e:
         # Si ocurre un error en la integración, generar valores constantes
+        t = np.linspace(0, tiempo_max, 2)
         S = np.full_like(t, S0)
         I = np.full_like(t, I0)
         R = np.full_like(t, R0_inicial)
         
 
-    # Crear la figura
-    fig = go.Figure()
-
-    # --- Curva de Susceptibles ---
-    fig.add_trace(go.Scatter(
-        x=t,
-        y=S,
-        mode="lines",
-        name="Susceptibles (5)",
-        line=dict(color="blue", width=2),
-        hovertemplate='Día: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=t,
-        y=I,
-        mode="lines",
-        name="Infectados (I)",
-        line=dict(color="red", width=2),
-        hovertemplate='Día: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=t,
-        y=R,
-        mode="lines",
-        name="Recuperados (R)",
-        line=dict(color="green", width=2),
-        hovertemplate='Día: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        title=dict(
-            text="<b>Evolución del Modelo SIR</b>",
-            x=0.5,  # Centrar título
-            font=dict(size=16, color="darkblue")
-        ),
-        xaxis_title="Tiempo (días)",
-        yaxis_title="Número de personas",
-        paper_bgcolor="lightgray",   # Fondo general
-        plot_bgcolor="white",        # Fondo del área de la gráfica
-        font=dict(family="Outfit", size=12),
-
-        legend=dict(
-            orientation="h",       # horizontal
-            yanchor="bottom",
-            xanchor="right",
-            y=1.02,
-            x=0.5
-        ),
-
-        margin=dict(l=40, r=40, t=60, b=40)
+    # Crear la figura (dict sobre el estilo "sir", sin validación por petición)
+    fig = figura_rapida([
+        linea(t, S, "Susceptibles (5)", "blue",
+              hovertemplate='Día: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'),
+        linea(t, I, "Infectados (I)", "red",
+              hovertemplate='Día: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'),
+        linea(t, R, "Recuperados (R)", "green",
+              hovertemplate='Día: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'),
+    ], "sir",
+        title={"text": "<b>Evolución del Modelo SIR</b>"},
+        uirevision=n_clicks or 0   # conserva el zoom al re-muestrear
     )
 
-    fig.update_xaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='lightpink',
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='black'
-    )
+    # Tras el primer dibujo solo se envían los datos nuevos
+    salida, firma = actualizar_figura(fig, firma)
+    return salida, simulacion, firma, resumen_envio(firma)
 
-    fig.update_yaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='lightpink',
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='black'
-    )
 
-    return fig
\ No newline at end of file
+# --- Callback de zoom: re-muestrea la ventana visible ---
+@dash.callback(
+    Output("grafica-sir", "figure", allow_duplicate=True),
+    Input("grafica-sir", "relayoutData"),
+    State("sim-sir", "data"),
+    State("ancho-sir", "data"),
+    prevent_initial_call=True
+)
+def zoom_sir(relayout, simulacion, anchos):
+    presupuesto = presupuesto_puntos(ancho_de(anchos, "grafica-sir"))
+    return parche_zoom(relayout, simulacion, "sir", presupuesto,
+                       ejecutar=SERVICIO_SOLVER.extender, method="LSODA")
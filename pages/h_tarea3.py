@@ -1,9 +1,12 @@
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 import dash
-import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import odeint
+from utils.muestreo import (simular_adaptativo, presupuesto_puntos, ancho_de,
+                            registrar_ancho_graficas, parche_zoom)
+from utils.servicio import SERVICIO_SOLVER
+from utils.figuras import (actualizar_figura, store_firma, id_firma, resumen_envio,
+                           figura_rapida, linea)
 
 dash.register_page(__name__, path='/pagina7', name='Modelo SEIR')
 
@@ -67,30 +70,23 @@ layout = dbc.Container([
                 id="grafica-seir",
                 style={"height": "460px", "width": "100%"},
                 className="border rounded shadow-sm"
-            )
+            ),
+            html.Div(id="envio-seir", className="text-muted small mt-1"),
+            dcc.Store(id="ancho-seir"),
+            dcc.Store(id="sim-seir"),
+            store_firma("grafica-seir")
         ], md=8, lg=8)
     ], className="g-4")
 ], fluid=True)
 
-# -------------------- ODEs SEIR --------------------
-def seir_rhs(y, t, beta, sigma, gamma, N):
-    """
-    y = [S, E, I, R]
-    S' = -β S I / N
-    E' =  β S I / N - σ E
-    I' =  σ E - γ I
-    R' =  γ I
-    """
-    S, E, I, R = y
-    dS = -beta * S * I / N
-    dE =  beta * S * I / N - sigma * E
-    dI =  sigma * E - gamma * I
-    dR =  gamma * I
-    return [dS, dE, dI, dR]
+registrar_ancho_graficas("ancho-seir", ["grafica-seir"])
 
 # -------------------- Callback --------------------
 @dash.callback(
     Output("grafica-seir", "figure"),
+    Output("sim-seir", "data"),
+    Output(id_firma("grafica-seir"), "data"),
+    Output("envio-seir", "children"),
     Input("seir-btn", "n_clicks"),
     State("seir-N", "value"),
     State("seir-beta", "value"),
@@ -99,59 +95,65 @@ def seir_rhs(y, t, beta, sigma, gamma, N):
     State("seir-E0", "value"),
     State("seir-I0", "value"),
     State("seir-tiempo", "value"),
+    State("ancho-seir", "data"),
+    State(id_firma("grafica-seir"), "data"),
     prevent_initial_call=False
 )
-def simular_seir(n_clicks, N, beta, sigma, gamma, E0, I0, tiempo_max):
+def simular_seir(n_clicks, N, beta, sigma, gamma, E0, I0, tiempo_max, anchos, firma):
     # Condiciones iniciales
     S0 = N - E0 - I0
     R0 = 0
     y0 = [S0, E0, I0, R0]
 
-    # Vector de tiempo
-    t = np.linspace(0, tiempo_max, 300)
+    params = {"beta": beta, "sigma": sigma, "gamma": gamma, "N": N}
+    simulacion = None
 
     # Resolver SEIR
     try:
-        sol = odeint(seir_rhs, y0, t, args=(beta, sigma, gamma, N))
-        S, E, I, R = sol.T
+        # Muestreo adaptativo: tantos puntos como permite el ancho de la gráfica
+        t, y = simular_adaptativo("seir", y0, params,
+                                  tiempo_max, presupuesto_puntos(ancho_de(anchos, "grafica-seir")),
+                                  ejecutar=SERVICIO_SOLVER.extender, method="LSODA")
+        S, E, I, R = y[:, 0, :]
+        simulacion = {"y0": y0, "params": params, "t_max": tiempo_max}
     except Exception as e:
         # Fallback en caso de error numérico
         print(f"Error en la simulación SEIR: {e}")
+        t = np.linspace(0, tiempo_max, 2)
         S = np.full_like(t, S0)
         E = np.full_like(t, E0)
         I = np.full_like(t, I0)
         R = np.full_like(t, R0)
 
-    # Figura
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t, y=S, mode="lines", name="Susceptibles",
-                             line=dict(color="royalblue", width=2),
-                             hovertemplate='Día: %{x:.0f}<br>S: %{y:.0f}<extra></extra>'))
-    fig.add_trace(go.Scatter(x=t, y=E, mode="lines", name="Expuestos",
-                             line=dict(color="orange", width=2),
-                             hovertemplate='Día: %{x:.0f}<br>E: %{y:.0f}<extra></extra>'))
-    fig.add_trace(go.Scatter(x=t, y=I, mode="lines", name="Infectados",
-                             line=dict(color="crimson", width=2),
-                             hovertemplate='Día: %{x:.0f}<br>I: %{y:.0f}<extra></extra>'))
-    fig.add_trace(go.Scatter(x=t, y=R, mode="lines", name="Recuperados",
-                             line=dict(color="seagreen", width=2),
-                             hovertemplate='Día: %{x:.0f}<br>R: %{y:.0f}<extra></extra>'))
-
-    # Estilo igual que el SIR que ya usas
-    fig.update_layout(
-        title=dict(text="<b>Evolución del Modelo SEIR</b>", x=0.5,
-                   font=dict(size=16, color="darkblue")),
-        xaxis_title="Tiempo (días)",
-        yaxis_title="Número de personas",
-        paper_bgcolor="lightgray",
-        plot_bgcolor="white",
-        font=dict(family="Outfit", size=12),
-        legend=dict(orientation="h", yanchor="bottom", xanchor="right", y=1.02, x=0.5),
-        margin=dict(l=40, r=40, t=60, b=40)
+    # Figura: mismo estilo "sir" que la página SIR, como dict sin validar
+    fig = figura_rapida([
+        linea(t, S, "Susceptibles", "royalblue",
+              hovertemplate='Día: %{x:.0f}<br>S: %{y:.0f}<extra></extra>'),
+        linea(t, E, "Expuestos", "orange",
+              hovertemplate='Día: %{x:.0f}<br>E: %{y:.0f}<extra></extra>'),
+        linea(t, I, "Infectados", "crimson",
+              hovertemplate='Día: %{x:.0f}<br>I: %{y:.0f}<extra></extra>'),
+        linea(t, R, "Recuperados", "seagreen",
+              hovertemplate='Día: %{x:.0f}<br>R: %{y:.0f}<extra></extra>'),
+    ], "sir",
+        title={"text": "<b>Evolución del Modelo SEIR</b>"},
+        uirevision=n_clicks or 0   # conserva el zoom al re-muestrear
     )
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='lightpink',
-                     zeroline=True, zerolinewidth=2, zerolinecolor='black')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='lightpink',
-                     zeroline=True, zerolinewidth=2, zerolinecolor='black')
 
-    return fig
+    # Tras el primer dibujo solo se envían los datos nuevos
+    salida, firma = actualizar_figura(fig, firma)
+    return salida, simulacion, firma, resumen_envio(firma)
+
+
+# -------------------- Zoom --------------------
+@dash.callback(
+    Output("grafica-seir", "figure", allow_duplicate=True),
+    Input("grafica-seir", "relayoutData"),
+    State("sim-seir", "data"),
+    State("ancho-seir", "data"),
+    prevent_initial_call=True
+)
+def zoom_seir(relayout, simulacion, anchos):
+    presupuesto = presupuesto_puntos(ancho_de(anchos, "grafica-seir"))
+    return parche_zoom(relayout, simulacion, "seir", presupuesto,
+                       ejecutar=SERVICIO_SOLVER.extender, method="LSODA")
@@ -1,13 +1,54 @@
 import dash
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 import numpy as np
 import plotly.graph_objects as go
 import requests
-import datetime as dt
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cliente_http import ClienteHTTP
+from utils.covid import alinear_historicos, historico_columnar
+from utils.figuras import registrar_estilo, figura_rapida, linea, traza
 
 dash.register_page(__name__, path='/pagina8', name='Covid-19')
 
+# Cliente compartido por todas las sesiones: los datos de disease.sh cambian
+# como mucho una vez al día, así que se sirven de cache y se revalidan en
+# segundo plano. DISEASE_SH_URL permite apuntar a un servidor local de pruebas.
+DISEASE_SH = ClienteHTTP(
+    os.environ.get("DISEASE_SH_URL", "https://disease.sh/v3/covid-19"),
+    ttl={"countries": 10 * 60, "historical": 60 * 60},
+)
+# Hilos para pedir el histórico mientras el callback pide el resumen; ambos
+# van por la misma sesión del cliente (conexiones keep-alive reutilizadas)
+PETICIONES = ThreadPoolExecutor(max_workers=8, thread_name_prefix="covid")
+# Métricas de la gráfica: columna del Historico que se compara entre países,
+# título del eje, factor de escala y formato del valor en el hover
+METRICAS_COVID = {
+    "acumulados": {"etiqueta": "Acumulados (casos y muertes)", "campo": "cases",
+                   "eje": "Casos totales", "escala": 1, "formato": ",.0f"},
+    "diarios": {"etiqueta": "Casos nuevos (medias de 7 y 14 días)", "campo": "media_7",
+                "eje": "Casos nuevos por día", "escala": 1, "formato": ",.0f"},
+    "crecimiento": {"etiqueta": "Tasa de crecimiento diaria", "campo": "crecimiento",
+                    "eje": "Crecimiento diario (%)", "escala": 100, "formato": ".2f"},
+    "duplicacion": {"etiqueta": "Tiempo de duplicación", "campo": "duplicacion",
+                    "eje": "Días para duplicar los casos", "escala": 1, "formato": ".1f"},
+    "rt": {"etiqueta": "Número reproductivo Rt (Cori)", "campo": "rt",
+           "eje": "Rt", "escala": 1, "formato": ".2f"},
+}
+# Países por petición a /historical/{a,b,c} en el modo comparación
+TAMANO_GRUPO = 20
+# Etiquetas en español de los países de siempre; el resto con el nombre de la API
+ETIQUETAS_ES = {"Peru": "Perú", "Mexico": "México", "USA": "Estados Unidos", "Canada": "Canadá"}
+OPCIONES_BASE = [{"label": etiqueta, "value": pais} for pais, etiqueta in ETIQUETAS_ES.items()]
+ESTADOS_CACHE = {
+    "fresco": "desde cache",
+    "obsoleto": "desde cache, actualizando en segundo plano",
+    "red": "recién descargados",
+    "error": "copia guardada: disease.sh no respondió",
+}
+
 
 layout = dbc.Container([
     # Título
@@ -28,20 +69,41 @@ layout = dbc.Container([
             html.Div([
 
                
-                html.Label("Seleccione el país:", className="form-label fw-semibold mb-2"),
-                dcc.Dropdown(
-                    id="dropdown-pais",
+                dcc.RadioItems(
+                    id="modo-covid",
                     options=[
-                        {"label": "Perú", "value": "Peru"},
-                        {"label": "México", "value": "Mexico"},
-                        {"label": "Estados Unidos", "value": "USA"},
-                        {"label": "Canadá", "value": "Canada"},
+                        {"label": " Un país", "value": "pais"},
+                        {"label": " Comparar países", "value": "comparar"},
                     ],
-                    value="Peru",
-                    className="mb-3",
-                    style={"width": "100%"}
+                    value="pais",
+                    inline=True,
+                    inputStyle={"marginLeft": "10px"},
+                    className="mb-3"
                 ),
 
+                html.Div([
+                    html.Label("Seleccione el país:", className="form-label fw-semibold mb-2"),
+                    dcc.Dropdown(
+                        id="dropdown-pais",
+                        options=OPCIONES_BASE,
+                        value="Peru",
+                        className="mb-3",
+                        style={"width": "100%"}
+                    ),
+                ], id="bloque-pais"),
+
+                html.Div([
+                    html.Label("Países a comparar:", className="form-label fw-semibold mb-2"),
+                    dcc.Dropdown(
+                        id="dropdown-paises-comparar",
+                        options=OPCIONES_BASE,
+                        value=list(ETIQUETAS_ES),
+                        multi=True,
+                        className="mb-3",
+                        style={"width": "100%"}
+                    ),
+                ], id="bloque-comparar", style={"display": "none"}),
+
                
                 html.Label("Días históricos", className="form-label fw-semibold mb-2"),
                 dcc.Dropdown(
@@ -58,6 +120,17 @@ layout = dbc.Container([
                     style={"width": "100%"}
                 ),
 
+                html.Label("Métrica", className="form-label fw-semibold mb-2"),
+                dcc.Dropdown(
+                    id="dropdown-metrica-covid",
+                    options=[{"label": m["etiqueta"], "value": clave}
+                             for clave, m in METRICAS_COVID.items()],
+                    value="acumulados",
+                    clearable=False,
+                    className="mb-3",
+                    style={"width": "100%"}
+                ),
+
                 
                 dbc.Button(
                     "Actualizar Datos",
@@ -145,26 +218,200 @@ layout = dbc.Container([
 
 
 def obtener_datos_pais(pais):
+    """Datos actuales del país y estado de la cache (ver ESTADOS_CACHE)."""
     try:
-        url = f"https://disease.sh/v3/covid-19/countries/{pais}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return DISEASE_SH.obtener_con_estado(f"countries/{pais}")
     except requests.RequestException as e:
         print(f"Error al obtener datos del país {pais}: {e}")
-        return None
+        return None, None
 
 
 def obtener_historico_pais(pais, dias):
+    """Histórico del país y estado de la cache (ver ESTADOS_CACHE)."""
     try:
-        url = f"https://disease.sh/v3/covid-19/historical/{pais}"
         params = {"lastdays": dias}     # puede ser número o 'all'
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return DISEASE_SH.obtener_con_estado(f"historical/{pais}", params)
     except requests.RequestException as e:
         print(f"Error al obtener histórico del país {pais}: {e}")
+        return None, None
+
+
+def obtener_paises():
+    """Resumen de todos los países con un solo GET a /countries ([] si falla)."""
+    try:
+        return DISEASE_SH.obtener("countries")
+    except requests.RequestException as e:
+        print(f"Error al obtener la lista de países: {e}")
+        return []
+
+
+def codigos_paises(resumenes):
+    """{nombre: código ISO3} para las consultas agrupadas (los nombres pueden tener comas)."""
+    return {r["country"]: (r.get("countryInfo") or {}).get("iso3") or r["country"]
+            for r in resumenes}
+
+
+def _historico_grupo(codigos, dias):
+    """Timelines de un grupo con /historical/{a,b,c}, o None si falla o viene incompleto."""
+    try:
+        datos = DISEASE_SH.obtener(f"historical/{','.join(codigos)}", {"lastdays": dias})
+    except requests.RequestException:
         return None
+    datos = datos if isinstance(datos, list) else [datos]
+    # Solo se puede emparejar por posición si vinieron todos
+    if len(datos) != len(codigos) or not all(isinstance(d, dict) and "timeline" in d for d in datos):
+        return None
+    return [d["timeline"] for d in datos]
+
+
+def _historico_individual(codigo, dias):
+    try:
+        datos = DISEASE_SH.obtener(f"historical/{codigo}", {"lastdays": dias})
+    except requests.RequestException as e:
+        print(f"Error al obtener histórico del país {codigo}: {e}")
+        return None
+    return datos.get("timeline") if isinstance(datos, dict) else None
+
+
+def obtener_historicos(paises, dias, codigos):
+    """
+    {pais: timeline} para varios países. Primero grupos de TAMANO_GRUPO en
+    paralelo; los países de grupos que fallan se piden uno a uno, también en
+    paralelo. PETICIONES acota las peticiones simultáneas.
+    """
+    grupos = [paises[i:i + TAMANO_GRUPO] for i in range(0, len(paises), TAMANO_GRUPO)]
+    futuros = [PETICIONES.submit(_historico_grupo, [codigos.get(p, p) for p in grupo], dias)
+               for grupo in grupos]
+    timelines, pendientes = {}, []
+    for grupo, futuro in zip(grupos, futuros):
+        resultado = futuro.result()
+        if resultado is None:
+            pendientes.extend(grupo)
+        else:
+            timelines.update(zip(grupo, resultado))
+
+    futuros = [PETICIONES.submit(_historico_individual, codigos.get(p, p), dias) for p in pendientes]
+    for pais, futuro in zip(pendientes, futuros):
+        timeline = futuro.result()
+        if timeline:
+            timelines[pais] = timeline
+    # Mismo orden que la selección
+    return {p: timelines[p] for p in paises if p in timelines}
+
+
+registrar_estilo("covid", template="plotly_white", margin=dict(l=40, r=40, t=60, b=40),
+                 xaxis=dict(title="Fecha"), yaxis=dict(title="Casos totales"))
+
+
+def comparar_paises(paises, dias, metrica="acumulados"):
+    """Salidas del dashboard en modo comparación (tarjetas con la suma de los países)."""
+    resumenes = obtener_paises()
+    por_nombre = {r["country"]: r for r in resumenes}
+    paises = [p for p in dict.fromkeys(paises or []) if p in por_nombre or not por_nombre]
+    if not paises:
+        return ("N/A", "N/A", "N/A", "N/A", figura_error("Seleccione al menos un país"),
+                "No hay países seleccionados.")
+
+    timelines = obtener_historicos(paises, dias, codigos_paises(resumenes))
+    historicos = {p: historico_columnar(("historical", p, dias), timeline)
+                  for p, timeline in timelines.items()}
+    # Las métricas salen de la cache de cada Historico: cambiar de métrica no recalcula
+    opciones = METRICAS_COVID[metrica]
+    fechas, con_datos, valores = alinear_historicos(historicos, opciones["campo"])
+    if not fechas.size:
+        return ("N/A", "N/A", "N/A", "N/A", figura_error(), "No se pudieron actualizar los datos.")
+
+    elegidos = [por_nombre[p] for p in paises if p in por_nombre]
+    totales = [formatear_numero(sum(r.get(campo) or 0 for r in elegidos)) if elegidos else "N/A"
+               for campo in ("cases", "todayCases", "deaths", "recovered")]
+
+    fechas_texto = np.datetime_as_string(fechas)
+    valores = valores * opciones["escala"]
+    fig = figura_rapida(
+        [linea(fechas_texto, valores[:, j], ETIQUETAS_ES.get(pais, pais), ancho=1.5,
+               hovertemplate=f"{pais}<br>Fecha: %{{x|%d %b %Y}}<br>{opciones['eje']}: "
+                             f"%{{y:{opciones['formato']}}}<extra></extra>")
+         for j, pais in enumerate(con_datos)],
+        "covid",
+        title={"text": f"<b>{opciones['etiqueta']}: {len(con_datos)} países</b>", "x": 0.5},
+        yaxis={"title": {"text": opciones["eje"]}},
+        shapes=[LINEA_RT_1] if metrica == "rt" else [],
+    )
+    faltan = len(paises) - len(con_datos)
+    return (*totales, fig,
+            f"Comparación de {len(con_datos)} países, {fechas.size} fechas"
+            + (f" ({faltan} sin histórico disponible)." if faltan else "."))
+
+
+LINEA_RT_1 = {"type": "line", "xref": "paper", "x0": 0, "x1": 1, "y0": 1, "y1": 1,
+              "line": {"color": "gray", "dash": "dot", "width": 1}}
+
+
+def figura_metrica(serie, metrica, pais):
+    """Figura de un país para la métrica elegida (arrays del Historico, ya en cache)."""
+    fechas = np.datetime_as_string(serie.fechas)
+    opciones = METRICAS_COVID[metrica]
+    cambios = {"title": {"text": f"<b>{opciones['etiqueta']} en {pais}</b>", "x": 0.5},
+               "yaxis": {"title": {"text": opciones["eje"]}}}
+
+    if metrica == "acumulados":
+        trazas = [
+            linea(fechas, serie["cases"], "Casos Totales", "orange",
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Casos: %{y}<extra></extra>"),
+            linea(fechas, serie["deaths"], "Muertes Totales", "red",
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Muertes: %{y}<extra></extra>"),
+        ]
+        cambios = {"title": {"text": f"<b>Evolución Covid-19 en {pais}</b>", "x": 0.5},
+                   "yaxis": {"title": {"text": "Número de personas"}}}
+    elif metrica == "diarios":
+        trazas = [
+            traza(fechas, serie["nuevos"], "Casos nuevos", tipo="bar",
+                  marker={"color": "rgba(255, 165, 0, 0.35)"},
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Nuevos: %{y:,.0f}<extra></extra>"),
+            linea(fechas, serie["media_7"], "Media 7 días", "darkorange",
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Media 7 días: %{y:,.0f}<extra></extra>"),
+            linea(fechas, serie["media_14"], "Media 14 días", "firebrick",
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Media 14 días: %{y:,.0f}<extra></extra>"),
+        ]
+    elif metrica == "rt":
+        valido = ~np.isnan(serie["rt"])
+        x = fechas[valido]
+        trazas = [
+            # Banda del 95 % de la posterior: ida por el límite alto, vuelta por el bajo
+            traza(np.concatenate([x, x[::-1]]),
+                  np.concatenate([serie["rt_alto"][valido], serie["rt_bajo"][valido][::-1]]),
+                  "IC 95 %", fill="toself", fillcolor="rgba(70, 130, 180, 0.25)",
+                  line={"width": 0}, hoverinfo="skip"),
+            linea(x, serie["rt"][valido], "Rt", "steelblue",
+                  customdata=np.column_stack([serie["rt_bajo"][valido], serie["rt_alto"][valido]]),
+                  hovertemplate="Fecha: %{x|%d %b %Y}<br>Rt: %{y:.2f} "
+                                "(%{customdata[0]:.2f} – %{customdata[1]:.2f})<extra></extra>"),
+        ]
+        cambios["shapes"] = [LINEA_RT_1]
+    else:
+        trazas = [
+            linea(fechas, serie[opciones["campo"]] * opciones["escala"], opciones["etiqueta"],
+                  "seagreen",
+                  hovertemplate=f"Fecha: %{{x|%d %b %Y}}<br>{opciones['eje']}: "
+                                f"%{{y:{opciones['formato']}}}<extra></extra>"),
+        ]
+    return figura_rapida(trazas, "covid", **cambios)
+
+
+def figura_error(texto="❗ Error al obtener datos"):
+    fig = go.Figure()
+    fig.add_annotation(
+        text=texto,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5,
+        showarrow=False,
+        font=dict(size=15, color="red")
+    )
+    fig.update_layout(
+        paper_bgcolor="lightcyan",
+        plot_bgcolor="white"
+    )
+    return fig
 
 
 def formatear_numero(numero):
@@ -186,32 +433,33 @@ def formatear_numero(numero):
     Output("grafico-covid", "figure"),
     Output("info-actualizado-covid", "children"),
     Input("btn-actualizar-covid", "n_clicks"),
+    Input("dropdown-metrica-covid", "value"),
     State("dropdown-pais", "value"),
     State("dropdown-dias-covid", "value"),
+    State("modo-covid", "value"),
+    State("dropdown-paises-comparar", "value"),
     prevent_initial_call=True
 )
-def actualizar_dashboard_covid(n_clicks, pais, dias):
+def actualizar_dashboard_covid(n_clicks, metrica, pais, dias, modo="pais", paises=None):
+    # Cambiar de métrica vuelve a entrar aquí, pero los datos salen de la cache
+    # del cliente y las métricas de la del Historico: ni red ni recálculo
+
+    if modo == "comparar":
+        return comparar_paises(paises, dias, metrica or "acumulados")
 
-    datos_actuales = obtener_datos_pais(pais)
-    historico = obtener_historico_pais(pais, dias)
+    # Las dos peticiones a la vez: la latencia es la de la más lenta, no la suma
+    futuro_historico = PETICIONES.submit(obtener_historico_pais, pais, dias)
+    datos_actuales, estado_actual = obtener_datos_pais(pais)
+    historico, estado_historico = futuro_historico.result()
 
  
     if not datos_actuales or not historico:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="❗ Error al obtener datos",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5,
-            showarrow=False,
-            font=dict(size=15, color="red")
-        )
-        fig.update_layout(
-            paper_bgcolor="lightcyan",
-            plot_bgcolor="white"
-        )
-        return "N/A", "N/A", "N/A", "N/A", fig, "No se pudieron actualizar los datos."
+        return "N/A", "N/A", "N/A", "N/A", figura_error(), "No se pudieron actualizar los datos."
 
   
+    origen = (ESTADOS_CACHE[estado_actual] if estado_actual == estado_historico else
+              f"actuales {ESTADOS_CACHE[estado_actual]}; histórico {ESTADOS_CACHE[estado_historico]}")
+
     total_casos       = datos_actuales.get("cases", 0)
     casos_hoy         = datos_actuales.get("todayCases", 0)
     total_muertes     = datos_actuales.get("deaths", 0)
@@ -223,23 +471,10 @@ def actualizar_dashboard_covid(n_clicks, pais, dias):
     total_recuperados_text = formatear_numero(total_recuperados)
 
 
-    timeline = historico.get("timeline", {})
-
-  
-    if isinstance(timeline, dict):
-        casos_historicos   = timeline.get("cases", {})
-        muertes_historicas = timeline.get("deaths", {})
-    else:
-        # Si viene lista, cogemos el primero
-        casos_historicos   = historico[0]["timeline"]["cases"]
-        muertes_historicas = historico[0]["timeline"]["deaths"]
+    # Conversión columnar (fechas datetime64, acumulados int64), una vez por respuesta
+    serie = historico_columnar(("historical", pais, dias), historico)
 
-    fechas          = list(casos_historicos.keys())
-    valores_casos   = list(casos_historicos.values())
-    valores_muertes = list(muertes_historicas.values())
-
-    
-    if not fechas:
+    if not len(serie):
         fig = go.Figure()
         fig.add_annotation(
             text="Sin datos históricos disponibles",
@@ -253,42 +488,7 @@ def actualizar_dashboard_covid(n_clicks, pais, dias):
                 fig,
                 f"Datos actualizados para {pais}, pero sin histórico.")
 
-    
-    fechas_dt = [dt.datetime.strptime(fecha, "%m/%d/%y") for fecha in fechas]
-
-  
-    fig = go.Figure()
-
-   
-    fig.add_trace(go.Scatter(
-        x=fechas_dt,
-        y=valores_casos,
-        mode="lines",
-        name="Casos Totales",
-        line=dict(color="orange", width=2),
-        hovertemplate="Fecha: %{x|%d %b %Y}<br>Casos: %{y}<extra></extra>"
-    ))
-
-   
-    fig.add_trace(go.Scatter(
-        x=fechas_dt,
-        y=valores_muertes,
-        mode="lines",
-        name="Muertes Totales",
-        line=dict(color="red", width=2),
-        hovertemplate="Fecha: %{x|%d %b %Y}<br>Muertes: %{y}<extra></extra>"
-    ))
-
-    fig.update_layout(
-        title=dict(
-            text=f"<b>Evolución Covid-19 en {pais}</b>",
-            x=0.5
-        ),
-        xaxis_title="Fecha",
-        yaxis_title="Número de personas",
-        template="plotly_white",
-        margin=dict(l=40, r=40, t=60, b=40)
-    )
+    fig = figura_metrica(serie, metrica or "acumulados", pais)
 
     return (
         total_casos_text,
@@ -296,5 +496,25 @@ def actualizar_dashboard_covid(n_clicks, pais, dias):
         total_muertes_text,
         total_recuperados_text,
         fig,
-        f"Datos actualizados para {pais}."
+        f"Datos actualizados para {pais} ({origen})."
     )
+
+
+# Bloque visible según el modo. La lista completa de países (de /countries,
+# en cache) solo se pide al pasar al modo comparación: cargar la página no
+# sale a la red, así que no se queda esperando si disease.sh no responde.
+@dash.callback(
+    Output("dropdown-pais", "options"),
+    Output("dropdown-paises-comparar", "options"),
+    Output("bloque-pais", "style"),
+    Output("bloque-comparar", "style"),
+    Input("modo-covid", "value"),
+    prevent_initial_call=True
+)
+def opciones_paises(modo):
+    visible, oculto = {}, {"display": "none"}
+    if modo != "comparar":
+        return no_update, no_update, visible, oculto
+    nombres = sorted(r["country"] for r in obtener_paises())
+    opciones = OPCIONES_BASE + [{"label": p, "value": p} for p in nombres if p not in ETIQUETAS_ES]
+    return opciones, opciones, oculto, visible
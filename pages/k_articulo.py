@@ -1,48 +1,104 @@
 # pages/seir_tablas_beta.py
 import dash
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, Patch, ctx, no_update
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
+from plotly.colors import qualitative
+import math
 import numpy as np
-from scipy.integrate import solve_ivp
+from utils.modelos import obtener_trayectoria
+from utils.muestreo import (muestrear_trayectoria, muestrear_ventana, presupuesto_puntos,
+                            ancho_de, registrar_ancho_graficas, ventana_relayout)
+from utils.figuras import (actualizar_figura, store_firma, id_firma, resumen_envio,
+                           EJES_ROSA, registrar_estilo, figura_rapida, linea)
 
 # ==================== Registrar página multipage ====================
 dash.register_page(__name__, path="/seir-tablas", name="SEIR (Tablas y β)")
 
 # ==================== Modelo SEIR normalizado ====================
 
-def seir_rhs(t, y, beta, mu, alpha, delta, mu_i, nu):
-    """
-    Sistema SEIR normalizado del artículo:
+# Con más curvas que esto se agrupan en una sola traza (coste de dibujo constante)
+MAX_CURVAS_INDIVIDUALES = 12
+COLORES_BASE = ["magenta", "black", "blue"]
+SUBINDICES = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
 
-      dS/dt = mu - (alpha * I + mu + nu) * S
-      dE/dt = alpha * I * S - (beta + mu) * E
-      dI/dt = beta * E - (mu_i + delta + mu) * I
-      dR/dt = delta * I + nu * S - mu * R
 
-    donde S, E, I, R son fracciones respecto a N.
+def parsear_betas(texto):
     """
-    S, E, I, R = y
+    Convierte "0.2, 0.35,0.5" en ([0.2, 0.35, 0.5], []). Las entradas que no
+    son números finitos ("abc", "nan", "inf") no llegan al solver: vuelven
+    en la segunda lista para avisar. Las vacías se ignoran.
+    """
+    valores, invalidas = [], []
+    for parte in (texto or "").replace(";", ",").split(","):
+        if not parte.strip():
+            continue
+        try:
+            valor = float(parte)
+        except ValueError:
+            valor = math.nan
+        if math.isfinite(valor):
+            valores.append(valor)
+        else:
+            invalidas.append(parte.strip())
+    return valores, invalidas
+
+
+def aviso_betas(invalidas):
+    """Mensaje de validación de "Otros β" ("" si todo es válido)."""
+    if not invalidas:
+        return ""
+    return f"Se ignoraron valores de β no válidos (deben ser números finitos): {', '.join(invalidas)}.  "
+
+
+def colores_betas(n):
+    paleta = COLORES_BASE + qualitative.Plotly
+    return [paleta[i % len(paleta)] for i in range(n)]
 
-    dS = mu - (alpha * I + mu + nu) * S
-    dE = alpha * I * S - (beta + mu) * E
-    dI = beta * E - (mu_i + delta + mu) * I
-    dR = delta * I + nu * S - mu * R
 
-    return [dS, dE, dI, dR]
+def etiquetas_betas(betas):
+    return [f"β{str(i).translate(SUBINDICES)} = {b:.4f}" for i, b in enumerate(betas, start=1)]
+
+
+def trazas_por_beta(t, curvas, betas, colores, etiquetas, variable):
+    """
+    Una traza por β mientras haya pocas; con muchas, todas las curvas van en
+    una única traza separada por NaN con el β en ``customdata``.
+    """
+    if len(curvas) <= MAX_CURVAS_INDIVIDUALES:
+        return [
+            linea(t, curva, label, color,
+                  hovertemplate=f"t: %{{x:.2f}}<br>{variable}(t): %{{y:.2f}}<extra></extra>")
+            for curva, color, label in zip(curvas, colores, etiquetas)
+        ]
+
+    curvas = np.asarray(curvas)
+    n, m = curvas.shape
+    x = np.concatenate([np.tile(t, (n, 1)), np.full((n, 1), np.nan)], axis=1).ravel()
+    y = np.concatenate([curvas, np.full((n, 1), np.nan)], axis=1).ravel()
+    beta = np.repeat(np.asarray(betas, dtype=float), m + 1)
+    return [linea(
+        x, y, f"{n} valores de β", "rgba(0, 0, 160, 0.35)", ancho=1,
+        customdata=beta,
+        hovertemplate=f"β: %{{customdata:.4f}}<br>t: %{{x:.2f}}<br>{variable}(t): %{{y:.2f}}<extra></extra>"
+    )]
 
 
 def simular_seir_tablas(
     N, S0_cnt, E0_cnt, I0_cnt, R0_cnt,
     mu, alpha, delta, mu_i, nu,
     beta_list,
-    tmax, npoints
+    tmax, npoints, ancho_px=None, ventana=None, metodo="auto"
 ):
     """
     Simula el modelo con las condiciones y parámetros dados
-    para cada valor de β en beta_list.
+    para cada valor de β en beta_list. ``npoints`` es el máximo de
+    muestras por curva; el número real sale del ancho de la gráfica
+    (``ancho_px``) y se reparte según la curvatura. Con ``ventana=(t0, t1)``
+    solo se muestrea ese intervalo, reutilizando la trayectoria en cache.
+    ``metodo`` es un método de solve_ivp o "auto" (BDF con jacobiano
+    analítico si el problema es rígido, RK45 si no).
     Devuelve:
-      t, resultados_expuestos, resultados_infectados
+      t, resultados_expuestos, resultados_infectados, trayectoria
     donde resultados_expuestos / infectados son listas de arrays:
       [E_beta1(t)*N, E_beta2(t)*N, ...], etc.
     """
@@ -63,110 +119,72 @@ def simular_seir_tablas(
 
     tmax    = max(float(tmax), 1.0)
     npoints = int(max(npoints, 10))
-    t_eval  = np.linspace(0, tmax, npoints)
-
-    resultados_E = []
-    resultados_I = []
-
-    for beta in beta_list:
-        beta = float(beta)
-        sol = solve_ivp(
-            lambda t, y: seir_rhs(t, y, beta, mu, alpha, delta, mu_i, nu),
-            [0, tmax],
-            y0,
-            t_eval=t_eval,
-            method="RK45"
-        )
-        S, E, I, R = sol.y
-        # Convertir fracciones a población (como en tu código original)
-        resultados_E.append(E * N)
-        resultados_I.append(I * N)
-
-    return t_eval, resultados_E, resultados_I
-
-
-def make_figure_expuestos(t, resultados_E, betas, colores, etiquetas):
-    fig = go.Figure()
-
-    for E_pop, beta, color, label in zip(resultados_E, betas, colores, etiquetas):
-        fig.add_trace(go.Scatter(
-            x=t, y=E_pop,
-            mode="lines",
-            line=dict(width=2, color=color),
-            name=label,
-            hovertemplate="t: %{x:.2f}<br>E(t): %{y:.2f}<extra></extra>"
-        ))
-
-    fig.update_layout(
-        title=dict(
-            text="<b>Fig. 6 – Expuestos E(t) para distintos β</b>",
-            font=dict(size=18, color="red"),
-            x=0.5,
-            y=0.93
-        ),
-        xaxis_title="Time (day)",
-        yaxis_title="Exposed E(t)",
-        margin=dict(l=40, r=40, t=50, b=40),
-        paper_bgcolor="#b1b1f1",
-        plot_bgcolor="white",
-        font=dict(family="Outfit", size=11, color="black"),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-    )
 
-    fig.update_xaxes(
-        showgrid=True, gridwidth=1, gridcolor="lightpink",
-        zeroline=True, zerolinewidth=2, zerolinecolor="red",
-        showline=True, linecolor="black", linewidth=2, mirror=True,
+    # Todos los β se integran juntos: un escenario por columna del lote
+    trayectoria = obtener_trayectoria(
+        "seir_normalizado",
+        y0,
+        {"beta": np.asarray(beta_list, dtype=float), "mu": mu, "alpha": alpha,
+         "delta": delta, "mu_i": mu_i, "nu": nu},
+        tmax,
+        method=metodo or "auto"
     )
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor="lightpink",
-        zeroline=True, zerolinewidth=2, zerolinecolor="red",
-        showline=True, linecolor="black", linewidth=2, mirror=True,
-    )
-
-    return fig
-
-
-def make_figure_infectados(t, resultados_I, betas, colores, etiquetas):
-    fig = go.Figure()
+    presupuesto = presupuesto_puntos(ancho_px, tope=npoints)
+    if ventana is None:
+        t, y = muestrear_trayectoria(trayectoria, 0.0, tmax, presupuesto)
+    else:
+        t, y = muestrear_ventana(trayectoria, *ventana, presupuesto, t_max=tmax)
+    S, E, I, R = y
+    # Convertir fracciones a población (como en tu código original)
+    resultados_E = list(E * N)
+    resultados_I = list(I * N)
+
+    return t, resultados_E, resultados_I, trayectoria
+
+
+def describir_solver(trayectoria):
+    """Texto con el método usado y el coste acumulado de la integración."""
+    est = trayectoria.estadisticas
+    metodo = trayectoria.metodo + (" compilado (numba)" if trayectoria.compilado else "")
+    texto = (f"Solver: {metodo}; pasos={est['pasos']}, evaluaciones f={est['nfev']}, "
+             f"jacobianos={est['njev']}, factorizaciones LU={est['nlu']}")
+    if trayectoria.diagnostico is not None:
+        d = trayectoria.diagnostico
+        texto += (f" (automático: {'rígido' if d['rigido'] else 'no rígido'}, "
+                  f"max|λ|·T≈{d['rigidez']:.3g}, cociente de escalas≈{d['cociente']:.3g})")
+    return texto + "."
+
+
+# Estilo común de las Fig. 6 y 7: validado una vez al importar
+registrar_estilo(
+    "articulo",
+    title=dict(font=dict(size=18, color="red"), x=0.5, y=0.93),
+    xaxis=dict(title="Time (day)", **EJES_ROSA),
+    yaxis=EJES_ROSA,
+    margin=dict(l=40, r=40, t=50, b=40),
+    paper_bgcolor="#b1b1f1",
+    plot_bgcolor="white",
+    font=dict(family="Outfit", size=11, color="black"),
+    legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+)
 
-    for I_pop, beta, color, label in zip(resultados_I, betas, colores, etiquetas):
-        fig.add_trace(go.Scatter(
-            x=t, y=I_pop,
-            mode="lines",
-            line=dict(width=2, color=color),
-            name=label,
-            hovertemplate="t: %{x:.2f}<br>I(t): %{y:.2f}<extra></extra>"
-        ))
 
-    fig.update_layout(
-        title=dict(
-            text="<b>Fig. 7 – Infectados I(t) para distintos β</b>",
-            font=dict(size=18, color="red"),
-            x=0.5,
-            y=0.93
-        ),
-        xaxis_title="Time (day)",
-        yaxis_title="Infected I(t)",
-        margin=dict(l=40, r=40, t=50, b=40),
-        paper_bgcolor="#b1b1f1",
-        plot_bgcolor="white",
-        font=dict(family="Outfit", size=11, color="black"),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+def make_figure_expuestos(t, resultados_E, betas, colores, etiquetas, **cambios):
+    return figura_rapida(
+        trazas_por_beta(t, resultados_E, betas, colores, etiquetas, "E"), "articulo",
+        title={"text": "<b>Fig. 6 – Expuestos E(t) para distintos β</b>"},
+        yaxis={"title": {"text": "Exposed E(t)"}},
+        **cambios,
     )
 
-    fig.update_xaxes(
-        showgrid=True, gridwidth=1, gridcolor="lightpink",
-        zeroline=True, zerolinewidth=2, zerolinecolor="red",
-        showline=True, linecolor="black", linewidth=2, mirror=True,
-    )
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor="lightpink",
-        zeroline=True, zerolinewidth=2, zerolinecolor="red",
-        showline=True, linecolor="black", linewidth=2, mirror=True,
-    )
 
-    return fig
+def make_figure_infectados(t, resultados_I, betas, colores, etiquetas, **cambios):
+    return figura_rapida(
+        trazas_por_beta(t, resultados_I, betas, colores, etiquetas, "I"), "articulo",
+        title={"text": "<b>Fig. 7 – Infectados I(t) para distintos β</b>"},
+        yaxis={"title": {"text": "Infected I(t)"}},
+        **cambios,
+    )
 
 
 # ==================== Layout ====================
@@ -364,6 +382,20 @@ normalizan internamente.
                                 style={"width": "100%"}
                             )
                         ], md=4),
+                    ], className="mb-2"),
+
+                    dbc.Row([
+                        dbc.Col([
+                            html.Label("Otros β (separados por coma)"),
+                            dcc.Input(
+                                id="inp-betas-extra-tablas",
+                                type="text",
+                                value="",
+                                debounce=True,
+                                placeholder="0.05, 0.1, 0.2",
+                                style={"width": "100%"}
+                            )
+                        ], md=12),
                     ], className="mb-3"),
 
                     html.H5("Rango de tiempo"),
@@ -381,7 +413,7 @@ normalizan internamente.
                             )
                         ], md=6),
                         dbc.Col([
-                            html.Label("Puntos de la simulación"),
+                            html.Label("Puntos máximos por curva"),
                             dcc.Slider(
                                 id="inp-npoints-tablas",
                                 min=200,
@@ -392,6 +424,24 @@ normalizan internamente.
                             )
                         ], md=6),
                     ], className="mb-2"),
+
+                    dbc.Row([
+                        dbc.Col([
+                            html.Label("Método del solver"),
+                            dcc.Dropdown(
+                                id="inp-metodo-tablas",
+                                options=[
+                                    {"label": "Automático (detecta rigidez)", "value": "auto"},
+                                    {"label": "RK45 (explícito)", "value": "RK45"},
+                                    {"label": "LSODA", "value": "LSODA"},
+                                    {"label": "BDF (implícito)", "value": "BDF"},
+                                    {"label": "Radau (implícito)", "value": "Radau"},
+                                ],
+                                value="auto",
+                                clearable=False
+                            )
+                        ], md=6),
+                    ], className="mb-2"),
                 ])
             ),
             className="mb-4", md=6
@@ -413,6 +463,12 @@ normalizan internamente.
                         style={"height": "320px", "width": "100%"}
                     ),
 
+                    dcc.Store(id="ancho-tablas"),
+                    # Ventana con zoom de cada gráfica: {"tmax", id_grafica: [t0, t1]}
+                    dcc.Store(id="ventana-tablas"),
+                    store_firma("graph-expuestos-tablas"),
+                    store_firma("graph-infectados-tablas"),
+
                     html.Div(
                         id="info-tablas",
                         style={"marginTop": "6px", "color": "#333"}
@@ -427,10 +483,41 @@ normalizan internamente.
 
 # ==================== Callback ====================
 
+def valores_por_defecto(
+    N, S0, E0, I0, R0,
+    mu, alpha, delta, mu_i, nu,
+    beta1, beta2, beta3,
+    tmax, npoints
+):
+    # Valores por defecto si vienen None
+    N     = 100000   if N     is None else N
+    S0    = 37538    if S0    is None else S0
+    E0    = 13923    if E0    is None else E0
+    I0    = 23191    if I0    is None else I0
+    R0    = 13213    if R0    is None else R0
+    mu    = 6.25e-3  if mu    is None else mu
+    alpha = 0.62e-8  if alpha is None else alpha
+    delta = 0.0006667 if delta is None else delta
+    mu_i  = 7.344e-7 if mu_i  is None else mu_i
+    nu    = 0.50     if nu    is None else nu
+    beta1 = 1/3      if beta1 is None else beta1
+    beta2 = 1/7      if beta2 is None else beta2
+    beta3 = 1/14     if beta3 is None else beta3
+    tmax  = 60       if tmax  is None else tmax
+    npoints = 1500   if npoints is None else npoints
+
+    return (N, S0, E0, I0, R0, mu, alpha, delta, mu_i, nu,
+            beta1, beta2, beta3, tmax, npoints)
+
+
+registrar_ancho_graficas("ancho-tablas", ["graph-expuestos-tablas", "graph-infectados-tablas"])
+
 @dash.callback(
     Output("graph-expuestos-tablas", "figure"),
     Output("graph-infectados-tablas", "figure"),
     Output("info-tablas", "children"),
+    Output(id_firma("graph-expuestos-tablas"), "data"),
+    Output(id_firma("graph-infectados-tablas"), "data"),
     Input("inp-N-tablas", "value"),
     Input("inp-S0-tablas", "value"),
     Input("inp-E0-tablas", "value"),
@@ -444,57 +531,139 @@ normalizan internamente.
     Input("inp-beta1-tablas", "value"),
     Input("inp-beta2-tablas", "value"),
     Input("inp-beta3-tablas", "value"),
+    Input("inp-betas-extra-tablas", "value"),
     Input("inp-tmax-tablas", "value"),
     Input("inp-npoints-tablas", "value"),
+    Input("inp-metodo-tablas", "value"),
+    State("ancho-tablas", "data"),
+    State("ventana-tablas", "data"),
+    State(id_firma("graph-expuestos-tablas"), "data"),
+    State(id_firma("graph-infectados-tablas"), "data"),
 )
 def update_seir_tablas(
     N, S0, E0, I0, R0,
     mu, alpha, delta, mu_i, nu,
-    beta1, beta2, beta3,
-    tmax, npoints
+    beta1, beta2, beta3, betas_extra,
+    tmax, npoints, metodo, anchos, ventanas, firma_E, firma_I
 ):
-    # Valores por defecto si vienen None
-    N     = 100000   if N     is None else N
-    S0    = 37538    if S0    is None else S0
-    E0    = 13923    if E0    is None else E0
-    I0    = 23191    if I0    is None else I0
-    R0    = 13213    if R0    is None else R0
-    mu    = 6.25e-3  if mu    is None else mu
-    alpha = 0.62e-8  if alpha is None else alpha
-    delta = 0.0006667 if delta is None else delta
-    mu_i  = 7.344e-7 if mu_i  is None else mu_i
-    nu    = 0.50     if nu    is None else nu
-    beta1 = 1/3      if beta1 is None else beta1
-    beta2 = 1/7      if beta2 is None else beta2
-    beta3 = 1/14     if beta3 is None else beta3
-    tmax  = 60       if tmax  is None else tmax
-    npoints = 1500   if npoints is None else npoints
-
-    betas = [beta1, beta2, beta3]
-    etiquetas = [
-        f"β₁ = {beta1:.4f}",
-        f"β₂ = {beta2:.4f}",
-        f"β₃ = {beta3:.4f}",
-    ]
-    colores = ["magenta", "black", "blue"]
+    (N, S0, E0, I0, R0, mu, alpha, delta, mu_i, nu,
+     beta1, beta2, beta3, tmax, npoints) = valores_por_defecto(
+        N, S0, E0, I0, R0, mu, alpha, delta, mu_i, nu,
+        beta1, beta2, beta3, tmax, npoints
+    )
 
-    t, resultados_E, resultados_I = simular_seir_tablas(
+    extra, invalidas = parsear_betas(betas_extra)
+    betas = [beta1, beta2, beta3] + extra
+    etiquetas = etiquetas_betas(betas)
+    colores = colores_betas(len(betas))
+
+    # Mismo uirevision mientras no cambie el horizonte: el zoom sobrevive al
+    # recálculo, así que cada gráfica se muestrea en la ventana que tiene a la
+    # vista (la trayectoria ya está en cache: la segunda llamada solo muestrea)
+    ventana_E, ventana_I = (ventana_guardada(ventanas, id_grafica, tmax)
+                            for id_grafica in ("graph-expuestos-tablas", "graph-infectados-tablas"))
+    t, resultados_E, resultados_I, trayectoria = simular_seir_tablas(
         N, S0, E0, I0, R0,
         mu, alpha, delta, mu_i, nu,
         betas,
-        tmax, npoints
+        tmax, npoints, ancho_de(anchos, "graph-expuestos-tablas"), ventana=ventana_E, metodo=metodo
     )
+    t_I = t
+    if ventana_I != ventana_E:
+        t_I, _, resultados_I, _ = simular_seir_tablas(
+            N, S0, E0, I0, R0,
+            mu, alpha, delta, mu_i, nu,
+            betas,
+            tmax, npoints, ancho_de(anchos, "graph-infectados-tablas"), ventana=ventana_I,
+            metodo=metodo
+        )
 
-    fig_E = make_figure_expuestos(t, resultados_E, betas, colores, etiquetas)
-    fig_I = make_figure_infectados(t, resultados_I, betas, colores, etiquetas)
+    fig_E = make_figure_expuestos(t, resultados_E, betas, colores, etiquetas, uirevision=tmax)
+    fig_I = make_figure_infectados(t_I, resultados_I, betas, colores, etiquetas, uirevision=tmax)
+    # Si no cambió el número de curvas solo viajan x/y y las etiquetas
+    fig_E, firma_E = actualizar_figura(fig_E, firma_E)
+    fig_I, firma_I = actualizar_figura(fig_I, firma_I)
 
     info = (
-        "Simulación SEIR normalizado con parámetros de Tabla 3.  "
+        aviso_betas(invalidas)
+        + "Simulación SEIR normalizado con parámetros de Tabla 3.  "
         f"N={N:g}, S₀={S0:g}, E₀={E0:g}, I₀={I0:g}, R₀={R0:g}, "
         f"μ={mu:.5g}, α={alpha:.5g}, δ={delta:.5g}, μᵢ={mu_i:.5g}, ν={nu:.3g}.  "
-        f"β₁={beta1:.5g}, β₂={beta2:.5g}, β₃={beta3:.5g}, "
-        f"t_max={tmax:g}, puntos={int(npoints)}.  "
-        "Las curvas muestran E(t)·N (arriba) e I(t)·N (abajo) para cada valor de β."
+        f"β₁={beta1:.5g}, β₂={beta2:.5g}, β₃={beta3:.5g}"
+        f"{f' y {len(betas) - 3} β adicionales' if len(betas) > 3 else ''}, "
+        f"t_max={tmax:g}, puntos={len(t)} (máx. {int(npoints)}).  "
+        "Las curvas muestran E(t)·N (arriba) e I(t)·N (abajo) para cada valor de β.  "
+        + describir_solver(trayectoria) + "  "
+        + resumen_envio([firma_E, firma_I])
+    )
+
+    return fig_E, fig_I, info, firma_E, firma_I
+
+
+# ==================== Zoom ====================
+
+def ventana_guardada(ventanas, id_grafica, tmax):
+    """Ventana con zoom de ``id_grafica`` si sigue vigente (mismo horizonte), o None."""
+    if not ventanas or ventanas.get("tmax") != tmax:
+        return None
+    ventana = ventanas.get(id_grafica)
+    return tuple(ventana) if ventana else None
+
+
+ENTRADAS_TABLAS = [
+    "inp-N-tablas", "inp-S0-tablas", "inp-E0-tablas", "inp-I0-tablas", "inp-R0-tablas",
+    "inp-mu-tablas", "inp-alpha-tablas", "inp-delta-tablas", "inp-mui-tablas", "inp-nu-tablas",
+    "inp-beta1-tablas", "inp-beta2-tablas", "inp-beta3-tablas", "inp-betas-extra-tablas",
+    "inp-tmax-tablas", "inp-npoints-tablas", "inp-metodo-tablas",
+]
+
+
+@dash.callback(
+    Output("graph-expuestos-tablas", "figure", allow_duplicate=True),
+    Output("graph-infectados-tablas", "figure", allow_duplicate=True),
+    Output("ventana-tablas", "data"),
+    Input("graph-expuestos-tablas", "relayoutData"),
+    Input("graph-infectados-tablas", "relayoutData"),
+    *[State(id_entrada, "value") for id_entrada in ENTRADAS_TABLAS],
+    State("ancho-tablas", "data"),
+    State("ventana-tablas", "data"),
+    prevent_initial_call=True
+)
+def zoom_seir_tablas(relayout_E, relayout_I,
+                     N, S0, E0, I0, R0,
+                     mu, alpha, delta, mu_i, nu,
+                     beta1, beta2, beta3, betas_extra,
+                     tmax, npoints, metodo, anchos, ventanas):
+    """
+    Re-muestrea solo la ventana visible de la gráfica que se hizo zoom y la
+    guarda en "ventana-tablas" para que el siguiente recálculo la respete.
+    """
+    (N, S0, E0, I0, R0, mu, alpha, delta, mu_i, nu,
+     beta1, beta2, beta3, tmax, npoints) = valores_por_defecto(
+        N, S0, E0, I0, R0, mu, alpha, delta, mu_i, nu,
+        beta1, beta2, beta3, tmax, npoints
+    )
+    es_E = ctx.triggered_id == "graph-expuestos-tablas"
+    relayout = relayout_E if es_E else relayout_I
+    ventana = ventana_relayout(relayout, max(float(tmax), 1.0))
+    if ventana is None:
+        return no_update, no_update, no_update
+
+    betas = [beta1, beta2, beta3] + parsear_betas(betas_extra)[0]
+    id_grafica = "graph-expuestos-tablas" if es_E else "graph-infectados-tablas"
+    ventanas = dict(ventanas or {}) if (ventanas or {}).get("tmax") == tmax else {"tmax": tmax}
+    # Con el zoom automático el recálculo vuelve a muestrear toda la serie
+    ventanas[id_grafica] = None if relayout.get("xaxis.autorange") else list(ventana)
+    t, resultados_E, resultados_I, _ = simular_seir_tablas(
+        N, S0, E0, I0, R0,
+        mu, alpha, delta, mu_i, nu,
+        betas,
+        tmax, npoints, ancho_de(anchos, id_grafica), ventana=ventana, metodo=metodo
     )
 
-    return fig_E, fig_I, info
+    trazas = trazas_por_beta(t, resultados_E if es_E else resultados_I, betas,
+                             colores_betas(len(betas)), etiquetas_betas(betas),
+                             "E" if es_E else "I")
+    parche = Patch()
+    parche["data"] = trazas
+    return ((parche, no_update) if es_E else (no_update, parche)) + (ventanas,)
@@ -1,37 +1,89 @@
 import dash
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 import numpy as np
-from scipy.integrate import solve_ivp
-import plotly.graph_objects as go
+from utils.modelos import integrar_trayectoria, MODELOS
+from utils.muestreo import (simular_adaptativo, muestrear_trayectoria, presupuesto_puntos,
+                            ancho_de, registrar_ancho_graficas)
+from utils.cache import CACHE_SIMULACIONES, clave_canonica
+from utils.barrido import ejecutar_barrido, resumen_barrido
+from utils.figuras import (actualizar_figura, store_firma, id_firma, resumen_envio,
+                           figura_rapida, traza)
 
 dash.register_page(__name__, path="/sir-adopcion", name="Modelo SIR – Adopción App")
 
 # ===============================================================
 # Modelo SIR de adopción (β, γ, α)
 # ===============================================================
-def sir_rhs(t, y, beta, gamma, alpha, N):
-    S, I, R = y
-    dS = -(beta * S * I / N) - alpha * S
-    dI = (beta * S * I / N) + alpha * S - gamma * I
-    dR = gamma * I
-    return [dS, dI, dR]
-
-
-def simular_sir(N, S0, I0, R0, beta, gamma, alpha, tmax=120):
+TAMANO_LOTE = 32
+
+def simular_sir(N, S0, I0, R0, beta, gamma, alpha, tmax=120, presupuesto=None):
+    """
+    Integra el modelo de adopción. ``beta``, ``gamma`` y ``alpha`` pueden ser
+    escalares o listas: cada combinación es un escenario del mismo lote y
+    ``y`` tiene forma (3, n_escenarios, n_tiempos). Los instantes se eligen
+    de forma adaptativa (``presupuesto`` puntos).
+    """
     y0 = [S0, I0, R0]
-    t_eval = np.linspace(0, tmax, 1000)
 
-    sol = solve_ivp(
-        lambda t, y: sir_rhs(t, y, beta, gamma, alpha, N),
-        [0, tmax], y0, t_eval=t_eval
+    return simular_adaptativo(
+        "sir_adopcion", y0,
+        {"beta": beta, "gamma": gamma, "alpha": alpha, "N": N},
+        tmax, presupuesto or presupuesto_puntos()
     )
 
-    return sol.t, sol.y
+
+def barrer_sir(N, S0, I0, R0, betas, gammas, alpha, tmax=120, presupuesto=None):
+    """
+    Un escenario por cada par (β, γ). Los escenarios se agrupan en lotes de
+    TAMANO_LOTE que el ejecutor reparte entre procesos (o resuelve en serie
+    si son pocos). Cada lote vuelve como trayectoria densa y se muestrea
+    aquí. Devuelve resultados (t, y_escenario) en el orden de entrada y los
+    tiempos medidos de cada lote integrado ahora (no de los que salen de
+    cache): los escenarios de un lote se integran juntos, así que no tienen
+    tiempo propio.
+    """
+    betas, gammas = np.broadcast_arrays(np.asarray(betas, dtype=float),
+                                        np.asarray(gammas, dtype=float))
+    lotes = [
+        {
+            "modelo": "sir_adopcion",
+            "y0": [S0, I0, R0],
+            "params": {"beta": betas[i:i + TAMANO_LOTE], "gamma": gammas[i:i + TAMANO_LOTE],
+                       "alpha": alpha, "N": N},
+            "t_max": tmax,
+        }
+        for i in range(0, betas.size, TAMANO_LOTE)
+    ]
+    # Solo se envían al ejecutor los lotes que no están en cache. En cache
+    # se guarda la Trayectoria sola, como en obtener_trayectoria, pero con
+    # claves de otro espacio ("barrer_sir" frente a "trayectoria"); los
+    # tiempos son de esta ejecución y no se guardan
+    version = MODELOS["sir_adopcion"]["version"]
+    claves = [clave_canonica("barrer_sir", version, lote) for lote in lotes]
+    guardados = [CACHE_SIMULACIONES.obtener(c) for c in claves]
+    pendientes = [i for i, g in enumerate(guardados) if g is None]
+
+    barrido = ejecutar_barrido(integrar_trayectoria, [lotes[i] for i in pendientes],
+                               umbral_serial=2)
+    for i, trayectoria in zip(pendientes, barrido["resultados"]):
+        guardados[i] = trayectoria
+        CACHE_SIMULACIONES.guardar(claves[i], trayectoria)
+
+    resultados = []
+    for trayectoria in guardados:
+        t, y = muestrear_trayectoria(trayectoria, 0.0, float(tmax),
+                                     presupuesto or presupuesto_puntos())
+        resultados.extend((t, y[:, j, :]) for j in range(y.shape[1]))
+    integrados = sum(lotes[i]["params"]["beta"].size for i in pendientes)
+    return {**barrido, "resultados": resultados, "escenarios": integrados,
+            "desde_cache": len(lotes) - len(pendientes)}
 
 # ===============================================================
 # Layout
 # ===============================================================
+GRAFICAS_ADOPCION = ["sir-baseline", "sir-beta", "sir-gamma"]
+
 layout = dbc.Container([
     dbc.Row([
         # =========================================
@@ -163,6 +215,10 @@ $$\frac{dR}{dt} = \gamma I$$
                         )
                     ]),
 
+                    html.Div(id="sir-barrido-info", className="text-muted small mt-2"),
+                    dcc.Store(id="ancho-sir-adopcion"),
+                    *[store_firma(id_grafica) for id_grafica in GRAFICAS_ADOPCION],
+
                 ])
             ),
             md=7
@@ -174,10 +230,21 @@ $$\frac{dR}{dt} = \gamma I$$
 # ===============================================================
 # CALLBACK
 # ===============================================================
+registrar_ancho_graficas("ancho-sir-adopcion", GRAFICAS_ADOPCION)
+
+
+def titulos(titulo, eje_y):
+    """Cambios sobre el estilo "simple": título y ejes de las tres gráficas."""
+    return {"title": {"text": titulo}, "xaxis": {"title": {"text": "Tiempo (días)"}},
+            "yaxis": {"title": {"text": eje_y}}}
+
+
 @dash.callback(
     Output("sir-baseline", "figure"),
     Output("sir-beta", "figure"),
     Output("sir-gamma", "figure"),
+    Output("sir-barrido-info", "children"),
+    *[Output(id_firma(id_grafica), "data") for id_grafica in GRAFICAS_ADOPCION],
     Input("sirN", "value"),
     Input("sirS0", "value"),
     Input("sirI0", "value"),
@@ -187,37 +254,55 @@ $$\frac{dR}{dt} = \gamma I$$
     Input("sirAlpha", "value"),
     Input("sirBetaList", "value"),
     Input("sirGammaList", "value"),
+    State("ancho-sir-adopcion", "data"),
+    *[State(id_firma(id_grafica), "data") for id_grafica in GRAFICAS_ADOPCION],
 )
-def actualizar(N, S0, I0, R0, beta, gamma, alpha, betaList, gammaList):
+def actualizar(N, S0, I0, R0, beta, gamma, alpha, betaList, gammaList, anchos, *firmas):
 
     # ---------------- baseline ----------------
-    t, (S, I, R) = simular_sir(N, S0, I0, R0, beta, gamma, alpha)
+    t, (S, I, R) = simular_sir(N, S0, I0, R0, beta, gamma, alpha,
+                               presupuesto=presupuesto_puntos(ancho_de(anchos, "sir-baseline")))
+    S, I, R = S[0], I[0], R[0]
 
-    fig_base = go.Figure()
-    fig_base.add_trace(go.Scatter(x=t, y=S, name="S(t)", line=dict(color="orange")))
-    fig_base.add_trace(go.Scatter(x=t, y=I, name="I(t)", line=dict(color="blue")))
-    fig_base.add_trace(go.Scatter(x=t, y=R, name="R(t)", line=dict(color="green")))
-    fig_base.update_layout(title="Adopción tecnológica (baseline)",
-                           xaxis_title="Tiempo (días)", yaxis_title="Personas")
+    fig_base = figura_rapida([
+        traza(t, S, "S(t)", line={"color": "orange"}),
+        traza(t, I, "I(t)", line={"color": "blue"}),
+        traza(t, R, "R(t)", line={"color": "green"}),
+    ], "simple", **titulos("Adopción tecnológica (baseline)", "Personas"))
 
     # ---------------- variando β ----------------
     beta_vals = [float(x) for x in betaList.split(",")]
-    fig_beta = go.Figure()
 
-    for b in beta_vals:
-        t2, (_, I2, _) = simular_sir(N, S0, I0, R0, b, gamma, alpha)
-        fig_beta.add_trace(go.Scatter(x=t2, y=I2, name=f"I(t), beta={b}"))
-    fig_beta.update_layout(title="Efecto de aumentar β (contacto social)",
-                           xaxis_title="Tiempo (días)", yaxis_title="Adoptantes activos")
+    barrido_beta = barrer_sir(N, S0, I0, R0, beta_vals, gamma, alpha,
+                              presupuesto=presupuesto_puntos(ancho_de(anchos, "sir-beta")))
+    fig_beta = figura_rapida(
+        [traza(t2, I2, f"I(t), beta={b}")
+         for b, (t2, (_, I2, _)) in zip(beta_vals, barrido_beta["resultados"])],
+        "simple", **titulos("Efecto de aumentar β (contacto social)", "Adoptantes activos"))
 
     # ---------------- variando γ ----------------
     gamma_vals = [float(x) for x in gammaList.split(",")]
-    fig_gamma = go.Figure()
 
-    for g in gamma_vals:
-        t3, (_, I3, _) = simular_sir(N, S0, I0, R0, beta, g, alpha)
-        fig_gamma.add_trace(go.Scatter(x=t3, y=I3, name=f"I(t), gamma={g}"))
-    fig_gamma.update_layout(title="Efecto de aumentar γ (abandono)",
-                            xaxis_title="Tiempo (días)", yaxis_title="Adoptantes activos")
+    barrido_gamma = barrer_sir(N, S0, I0, R0, beta, gamma_vals, alpha,
+                               presupuesto=presupuesto_puntos(ancho_de(anchos, "sir-gamma")))
+    fig_gamma = figura_rapida(
+        [traza(t3, I3, f"I(t), gamma={g}")
+         for g, (t3, (_, I3, _)) in zip(gamma_vals, barrido_gamma["resultados"])],
+        "simple", **titulos("Efecto de aumentar γ (abandono)", "Adoptantes activos"))
+
+    # Solo viajan los datos nuevos mientras no cambie el número de curvas
+    figuras, firmas = zip(*(actualizar_figura(fig, firma) for fig, firma
+                            in zip((fig_base, fig_beta, fig_gamma), firmas)))
+
+    info = [
+        html.Div(resumen_barrido("Barrido β", barrido_beta)),
+        html.Div(resumen_barrido("Barrido γ", barrido_gamma)),
+        html.Div(
+            "Cache de simulaciones: {aciertos} aciertos, {aciertos_disco} desde disco, "
+            "{fallos} fallos, {desalojos} desalojos ({entradas}/{max_entradas} entradas)."
+            .format(**CACHE_SIMULACIONES.estadisticas())
+        ),
+        html.Div(resumen_envio(firmas)),
+    ]
 
-    return fig_base, fig_beta, fig_gamma
+    return (*figuras, info, *firmas)
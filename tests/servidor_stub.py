@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+# ===============================================================
+# Servidor local que hace de disease.sh en los tests
+# ---------------------------------------------------------------
+# Sirve JSON fijo por ruta (sin la query), con un retardo configurable por
+# respuesta, ETag y 304 ante If-None-Match, y un modo de fallo que responde
+# 500. Cuenta las peticiones recibidas para comprobar qué llegó a la red.
+# ===============================================================
+
+
+class ServidorStub:
+    """
+    ``rutas`` mapea ruta (p. ej. "countries/Peru") a los datos JSON que se
+    devuelven. Se usa como context manager: arranca en un puerto libre y
+    ``base`` es la URL para ClienteHTTP.
+    """
+
+    def __init__(self, rutas, retardo=0.0):
+        self.rutas = dict(rutas)
+        self.retardo = retardo
+        self.fallar = False
+        self.version = 1
+        self.peticiones = []
+        self.no_modificados = 0
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._manejador())
+        self._servidor.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *error):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def contar(self, ruta=None):
+        """GET recibidos (todos o solo los de ``ruta``)."""
+        with self._lock:
+            return sum(1 for r in self.peticiones if ruta is None or r == ruta)
+
+    def _manejador(self):
+        stub = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                ruta = unquote(urlparse(self.path).path).strip("/")
+                with stub._lock:
+                    stub.peticiones.append(ruta)
+                time.sleep(stub.retardo)
+                if stub.fallar:
+                    return self._enviar(500, {"message": "error"})
+                if ruta not in stub.rutas:
+                    return self._enviar(404, {"message": "not found"})
+                etag = f'"{ruta}-v{stub.version}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.no_modificados += 1
+                    return self._enviar(304, None, etag)
+                return self._enviar(200, stub.rutas[ruta], etag)
+
+            def _enviar(self, codigo, datos, etag=None):
+                cuerpo = b"" if datos is None else json.dumps(datos).encode()
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+        return Manejador
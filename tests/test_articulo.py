@@ -0,0 +1,64 @@
+import base64
+import json
+import math
+
+import dash._callback_context as contexto
+import numpy as np
+from dash._utils import AttributeDict
+from plotly.io.json import to_json_plotly
+
+import app  # noqa: F401  registra las páginas de Dash
+from pages.k_articulo import aviso_betas, parsear_betas, update_seir_tablas, zoom_seir_tablas
+
+
+def test_parsear_betas_descarta_valores_no_finitos():
+    valores, invalidas = parsear_betas("0.2; nan, inf ,abc,, -inf, 1e400, 0.5")
+    assert valores == [0.2, 0.5]
+    assert invalidas == ["nan", "inf", "abc", "-inf", "1e400"]
+    assert all(math.isfinite(v) for v in valores)
+    assert "nan" in aviso_betas(invalidas)
+
+
+def test_parsear_betas_sin_errores_no_avisa():
+    assert parsear_betas("") == ([], [])
+    assert aviso_betas(parsear_betas("0.1, 0.3")[1]) == ""
+
+
+def _contexto(id_grafica):
+    contexto.context_value.set(AttributeDict(
+        triggered_inputs=[{"prop_id": f"{id_grafica}.relayoutData", "value": None}]))
+
+
+def _x(figura, traza=0):
+    datos = json.loads(to_json_plotly(figura))["data"][traza]["x"]
+    if isinstance(datos, dict):
+        return np.frombuffer(base64.b64decode(datos["bdata"]), dtype=datos["dtype"])
+    return np.asarray(datos, dtype=float)
+
+
+def test_recalculo_respeta_el_zoom_conservado():
+    entradas = [None] * 13 + ["", 200, 400, "auto"]
+    _contexto("graph-expuestos-tablas")
+    *_, ventanas = zoom_seir_tablas({"xaxis.range[0]": 40, "xaxis.range[1]": 60}, None,
+                                    *entradas, None, None)
+    assert ventanas["graph-expuestos-tablas"] == [40.0, 60.0]
+
+    # Cambia un parámetro (mismo horizonte): E se muestrea en su ventana, I entera
+    entradas_nuevas = entradas[:5] + [0.5] + entradas[6:]
+    fig_E, fig_I, *_ = update_seir_tablas(*entradas_nuevas, None, ventanas, None, None)
+    x_E, x_I = _x(fig_E), _x(fig_I)
+    assert x_E.min() >= 30 and x_E.max() <= 70
+    assert x_I.min() == 0 and x_I.max() == 200
+
+    # Zoom automático: se olvida la ventana
+    *_, ventanas = zoom_seir_tablas({"xaxis.autorange": True}, None, *entradas, None, ventanas)
+    assert ventanas["graph-expuestos-tablas"] is None
+    fig_E, *_ = update_seir_tablas(*entradas_nuevas, None, ventanas, None, None)
+    assert _x(fig_E).max() == 200
+
+    # Otro horizonte: uirevision cambia y la ventana guardada ya no vale
+    *_, ventanas = zoom_seir_tablas({"xaxis.range[0]": 40, "xaxis.range[1]": 60}, None,
+                                    *entradas, None, None)
+    otro = entradas_nuevas[:14] + [300] + entradas_nuevas[15:]
+    fig_E, *_ = update_seir_tablas(*otro, None, ventanas, None, None)
+    assert _x(fig_E).max() == 300
@@ -0,0 +1,106 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from servidor_stub import ServidorStub
+from utils.cliente_http import ClienteHTTP
+
+RUTAS = {"countries/Peru": {"country": "Peru", "cases": 100},
+         "countries/Mexico": {"country": "Mexico", "cases": 200}}
+
+
+def esperar(condicion, limite=5.0):
+    fin = time.monotonic() + limite
+    while not condicion():
+        assert time.monotonic() < fin, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def stub():
+    with ServidorStub(RUTAS) as servidor:
+        yield servidor
+
+
+def test_dentro_del_ttl_no_sale_a_la_red(stub):
+    cliente = ClienteHTTP(stub.base, ttl={"countries": 60})
+    datos, estado = cliente.obtener_con_estado("countries/Peru")
+    assert (datos, estado) == (RUTAS["countries/Peru"], "red")
+    for _ in range(5):
+        assert cliente.obtener_con_estado("countries/Peru") == (datos, "fresco")
+    assert stub.contar() == 1
+
+
+def test_copia_vencida_se_sirve_y_se_revalida_en_segundo_plano(stub):
+    cliente = ClienteHTTP(stub.base, ttl_por_defecto=0.2, max_obsoleto=60)
+    datos, _ = cliente.obtener_con_estado("countries/Peru")
+    time.sleep(0.25)
+
+    stub.retardo = 0.5
+    inicio = time.perf_counter()
+    obsoletos, estado = cliente.obtener_con_estado("countries/Peru")
+    assert estado == "obsoleto" and obsoletos is datos
+    # Se responde al instante, sin esperar a la revalidación
+    assert time.perf_counter() - inicio < stub.retardo / 2
+    esperar(lambda: stub.no_modificados == 1)
+
+
+def test_304_solo_renueva_el_ttl(stub):
+    cliente = ClienteHTTP(stub.base, ttl_por_defecto=0.2, max_obsoleto=60)
+    datos, _ = cliente.obtener_con_estado("countries/Peru")
+    time.sleep(0.25)
+    cliente.obtener_con_estado("countries/Peru")
+    esperar(lambda: cliente.estadisticas()["no_modificados"] == 1)
+
+    # Renovado: fresco otra vez, con el mismo objeto y sin más descargas
+    assert cliente.obtener_con_estado("countries/Peru") == (datos, "fresco")
+    assert cliente.obtener_con_estado("countries/Peru")[0] is datos
+    assert stub.contar() == 2
+    assert cliente.estadisticas()["descargas"] == 1
+
+
+def test_fallos_simultaneos_comparten_una_descarga(stub):
+    stub.retardo = 0.3
+    cliente = ClienteHTTP(stub.base)
+    with ThreadPoolExecutor(12) as hilos:
+        resultados = list(hilos.map(lambda _: cliente.obtener("countries/Peru"), range(12)))
+    assert stub.contar() == 1
+    assert all(r is resultados[0] for r in resultados)
+
+
+def test_copia_vieja_si_la_red_falla(stub):
+    cliente = ClienteHTTP(stub.base, ttl_por_defecto=0.1, max_obsoleto=0)
+    datos, _ = cliente.obtener_con_estado("countries/Peru")
+    time.sleep(0.15)
+    stub.fallar = True
+    assert cliente.obtener_con_estado("countries/Peru") == (datos, "error")
+    assert cliente.estadisticas()["errores"] == 1
+    # Sin copia guardada el error sí llega a quien llama
+    with pytest.raises(requests.RequestException):
+        cliente.obtener("countries/Mexico")
+
+
+def test_interpretar_una_respuesta_no_bloquea_la_cache(stub):
+    cliente = ClienteHTTP(stub.base)
+    cliente.obtener("countries/Peru")
+    interpretando = threading.Event()
+    get = cliente.sesion.get
+
+    def get_lento(url, **kwargs):
+        respuesta = get(url, **kwargs)
+        if url.endswith("Mexico"):
+            json = respuesta.json
+            respuesta.json = lambda: (interpretando.set(), time.sleep(0.5), json())[2]
+        return respuesta
+
+    cliente.sesion.get = get_lento
+    with ThreadPoolExecutor(1) as hilo:
+        lento = hilo.submit(cliente.obtener, "countries/Mexico")
+        assert interpretando.wait(5)
+        inicio = time.perf_counter()
+        assert cliente.obtener_con_estado("countries/Peru")[1] == "fresco"
+        assert time.perf_counter() - inicio < 0.1
+        assert lento.result()["country"] == "Mexico"
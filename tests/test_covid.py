@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from utils.covid import Historico, alinear_historicos, calcular_metricas, parsear_fechas
+
+CAMPOS_METRICAS = ("nuevos", "media_7", "media_14", "crecimiento", "duplicacion",
+                   "rt", "rt_bajo", "rt_alto")
+
+
+def historico(casos, inicio="2021-01-01"):
+    casos = np.asarray(casos, dtype=np.int64)
+    fechas = np.datetime64(inicio) + np.arange(casos.size)
+    return Historico("P", fechas, {"cases": casos, "deaths": casos // 10,
+                                   "recovered": np.zeros_like(casos)})
+
+
+def test_parsear_fechas():
+    fechas = parsear_fechas(["1/22/20", "12/31/21"])
+    assert fechas.tolist() == [np.datetime64("2020-01-22").item(), np.datetime64("2021-12-31").item()]
+
+
+def test_metricas_con_crecimiento_exponencial():
+    dias = np.arange(120)
+    metricas = calcular_metricas(np.cumsum(100 * np.exp(0.05 * dias)))
+    assert metricas["crecimiento"][-1] == pytest.approx(0.05, rel=1e-3)
+    assert metricas["duplicacion"][-1] == pytest.approx(np.log(2) / 0.05, rel=1e-3)
+    assert metricas["rt"][-1] > 1
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 6, 7, 8, 20])
+def test_metricas_de_series_cortas_o_vacias(n):
+    metricas = calcular_metricas(np.arange(n) * 5)
+    assert set(metricas) == set(CAMPOS_METRICAS)
+    for campo in CAMPOS_METRICAS:
+        assert metricas[campo].shape == (n,), campo
+    if n < 8:
+        assert np.isnan(metricas["crecimiento"]).all()
+
+
+@pytest.mark.parametrize("campo", ["cases", "media_7", "crecimiento", "rt"])
+def test_alinear_con_un_pais_vacio_o_corto(campo):
+    historicos = {"A": historico(np.arange(40) * 10), "B": historico([]), "C": historico([1, 2, 4])}
+    fechas, paises, matriz = alinear_historicos(historicos, campo)
+    assert paises == ["A", "B", "C"]
+    assert matriz.shape == (40, 3)
+    assert np.isnan(matriz[:, 1]).all()
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from dash._callback import GLOBAL_CALLBACK_LIST
+
+import app  # noqa: F401  registra las páginas de Dash
+import pages.i_clase4 as covid
+from servidor_stub import ServidorStub
+from utils.cliente_http import ClienteHTTP
+
+RETARDO = 0.5
+RUTAS = {
+    "countries/Peru": {"country": "Peru", "cases": 1500, "todayCases": 20,
+                       "deaths": 40, "recovered": 1200},
+    "historical/Peru": {"country": "Peru", "timeline": {
+        "cases": {f"3/{d}/23": 100 * d * d for d in range(1, 31)},
+        "deaths": {f"3/{d}/23": d for d in range(1, 31)},
+        "recovered": {f"3/{d}/23": 0 for d in range(1, 31)},
+    }},
+}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with ServidorStub(RUTAS, retardo=RETARDO) as servidor:
+        monkeypatch.setattr(covid, "DISEASE_SH", ClienteHTTP(servidor.base))
+        yield servidor
+
+
+def test_resumen_e_historico_se_piden_a_la_vez(stub):
+    inicio = time.perf_counter()
+    salida = covid.actualizar_dashboard_covid(1, "acumulados", "Peru", 30)
+    transcurrido = time.perf_counter() - inicio
+
+    assert salida[5] == "Datos actualizados para Peru (recién descargados)."
+    assert stub.contar("countries/Peru") == 1 and stub.contar("historical/Peru") == 1
+    # La latencia es la de la petición más lenta, no la suma de las dos
+    assert RETARDO <= transcurrido < 1.5 * RETARDO
+
+
+def test_cambiar_de_metrica_no_vuelve_a_la_red(stub):
+    covid.actualizar_dashboard_covid(1, "acumulados", "Peru", 30)
+    inicio = time.perf_counter()
+    for metrica in covid.METRICAS_COVID:
+        assert covid.actualizar_dashboard_covid(1, metrica, "Peru", 30)[5].endswith("(desde cache).")
+    assert time.perf_counter() - inicio < RETARDO
+    assert stub.contar() == 2
+
+
+def test_lista_de_paises_solo_en_modo_comparacion(stub):
+    stub.rutas["countries"] = [{"country": "Peru", "countryInfo": {"iso3": "PER"}},
+                               {"country": "Chile", "countryInfo": {"iso3": "CHL"}}]
+    salida = covid.opciones_paises("pais")
+    assert salida[:2] == (covid.no_update, covid.no_update)
+    assert stub.contar() == 0
+
+    opciones, _, bloque_pais, bloque_comparar = covid.opciones_paises("comparar")
+    assert {"label": "Chile", "value": "Chile"} in opciones
+    assert bloque_pais == {"display": "none"} and bloque_comparar == {}
+    assert stub.contar("countries") == 1
+
+
+def test_la_pagina_no_pide_nada_al_cargar():
+    callbacks = [c for c in GLOBAL_CALLBACK_LIST if "bloque-pais.style" in c["output"]]
+    assert callbacks and all(c["prevent_initial_call"] for c in callbacks)
@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.expresiones import ErrorExpresion, compilar_expresion
+
+X, Y = np.meshgrid(np.linspace(-2, 2, 5), np.linspace(-2, 2, 5))
+
+
+def test_evalua_con_funciones_de_numpy():
+    resultado = compilar_expresion("np.sin(X) * Y + 2**3")(X=X, Y=Y)
+    np.testing.assert_allclose(resultado, np.sin(X) * Y + 8)
+
+
+@pytest.mark.parametrize("texto", ["__import__('os')", "X.__class__", "'a'", "f(X)"])
+def test_rechaza_construcciones_fuera_de_la_lista_blanca(texto):
+    with pytest.raises(ErrorExpresion):
+        compilar_expresion(texto)
+
+
+@pytest.mark.parametrize("texto", ["X + 9**9**9", "X ** 100000", "2 ** (10**6)"])
+def test_exponentes_enormes_se_rechazan_sin_evaluar(texto):
+    inicio = time.perf_counter()
+    with pytest.raises(ErrorExpresion) as error:
+        compilar_expresion(texto)(X=X, Y=Y)
+    assert "Exponente" in error.value.mensaje
+    assert time.perf_counter() - inicio < 1
+
+
+def test_constantes_enteras_se_evaluan_en_float():
+    # Sin la conversión, 9**9**9 se calcularía con enteros de Python
+    assert "9.0" in compilar_expresion("X + 9**9").normalizada
+    with pytest.raises(ErrorExpresion):
+        compilar_expresion("X + 1" + "0" * 400)
+    with pytest.raises(ErrorExpresion):
+        compilar_expresion("(10.0 ** 300) ** 2 + X")(X=X, Y=Y)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from utils.cache import CACHE_SIMULACIONES
+from utils.modelos import obtener_trayectoria
+from utils.muestreo import muestrear_ventana, parche_zoom
+
+Y0 = [990, 10, 0]
+PARAMS = {"beta": 0.3, "gamma": 0.1, "N": 1000}
+
+
+def test_zoom_no_muestra_mas_alla_del_horizonte_dibujado():
+    CACHE_SIMULACIONES.limpiar()
+    # Otra sesión ya extendió la trayectoria compartida hasta t=200
+    obtener_trayectoria("sir", Y0, PARAMS, 200.0)
+    simulacion = {"y0": Y0, "params": PARAMS, "t_max": 50.0}
+
+    for relayout in ({"xaxis.autorange": True},
+                     {"xaxis.range[0]": 40.0, "xaxis.range[1]": 49.0}):
+        parche = parche_zoom(relayout, simulacion, "sir", 200).to_plotly_json()
+        x = np.asarray(parche["operations"][0]["params"]["value"])
+        assert x.max() <= 50.0
+
+
+def test_ventana_sin_horizonte_usa_todo_lo_integrado():
+    CACHE_SIMULACIONES.limpiar()
+    trayectoria = obtener_trayectoria("sir", Y0, PARAMS, 80.0)
+    t, _ = muestrear_ventana(trayectoria, 70.0, 100.0, 100)
+    assert t.max() <= trayectoria.t_fin
+    t, _ = muestrear_ventana(trayectoria, 70.0, 100.0, 100, t_max=75.0)
+    assert t.max() <= 75.0
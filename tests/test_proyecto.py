@@ -0,0 +1,21 @@
+import app  # noqa: F401  registra las páginas de Dash
+from pages.l_proyecto import TAMANO_LOTE, barrer_sir
+from utils.barrido import resumen_barrido
+from utils.cache import CACHE_SIMULACIONES
+from utils.modelos import Trayectoria
+
+BETAS = [0.05 * i for i in range(1, TAMANO_LOTE + 6)]
+
+
+def test_barrido_guarda_solo_trayectorias_en_cache():
+    CACHE_SIMULACIONES.limpiar()
+    primero = barrer_sir(1000, 990, 10, 0, BETAS, 0.1, 0.01)
+    assert len(primero["resultados"]) == len(BETAS)
+    assert primero["escenarios"] == len(BETAS) and len(primero["tiempos"]) == 2
+    assert all(isinstance(v, Trayectoria) for v in CACHE_SIMULACIONES._memoria.values())
+
+    segundo = barrer_sir(1000, 990, 10, 0, BETAS, 0.1, 0.01)
+    assert segundo["desde_cache"] == 2 and not segundo["tiempos"]
+    assert resumen_barrido("Barrido β", segundo) == "Barrido β: 2 lote(s) servidos desde cache."
+    for (t1, y1), (t2, y2) in zip(primero["resultados"], segundo["resultados"]):
+        assert (t1 == t2).all() and (y1 == y2).all()
@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils.cache import CACHE_SIMULACIONES
+from utils.modelos import Trayectoria, integrar_trayectoria, obtener_trayectoria
+from utils.servicio import ServicioSolver
+
+N_HILOS = 16
+T = np.linspace(0, 60, 241)
+ESCENARIOS = [
+    ("sir", [990, 10, 0], {"beta": b, "gamma": g, "N": 1000})
+    for b in (0.2, 0.3, 0.45, 0.6) for g in (0.05, 0.1, 0.2)
+]
+
+
+@pytest.fixture(scope="module")
+def servicio():
+    pool = ProcessPoolExecutor(max_workers=2)
+    yield ServicioSolver(pool=pool)
+    pool.shutdown()
+
+
+def serial(modelo, y0, params, t_max=T[-1]):
+    return integrar_trayectoria(modelo, y0, params, t_max, method="LSODA").evaluar(T)
+
+
+def test_extensiones_concurrentes_iguales_a_las_seriales(servicio):
+    esperados = [serial(*e) for e in ESCENARIOS]
+
+    def extender(i):
+        modelo, y0, params = ESCENARIOS[i % len(ESCENARIOS)]
+        trayectoria = Trayectoria(modelo, y0, params, method="LSODA", t_referencia=T[-1])
+        servicio.extender(("prueba", i), trayectoria, T[-1])
+        return i % len(ESCENARIOS), trayectoria
+
+    with ThreadPoolExecutor(N_HILOS) as hilos:
+        resultados = list(hilos.map(extender, range(20 * N_HILOS)))
+    for indice, trayectoria in resultados:
+        np.testing.assert_array_equal(trayectoria.evaluar(T), esperados[indice])
+        # Solo vuelve el tramo nuevo: uno por trayectoria
+        assert len(trayectoria.tramos) == 1
+
+
+def test_misma_clave_desde_varios_hilos(servicio):
+    modelo, y0, params = ESCENARIOS[0]
+    trayectoria = Trayectoria(modelo, y0, params, method="LSODA", t_referencia=T[-1])
+    with ThreadPoolExecutor(N_HILOS) as hilos:
+        list(hilos.map(lambda _: servicio.extender("misma", trayectoria, T[-1]), range(N_HILOS)))
+    assert trayectoria.t_fin == pytest.approx(T[-1])
+    np.testing.assert_array_equal(trayectoria.evaluar(T), serial(modelo, y0, params))
+
+
+def test_obtener_trayectoria_concurrente_con_horizontes_distintos(servicio):
+    CACHE_SIMULACIONES.limpiar()
+    esperados = [serial(*e) for e in ESCENARIOS]
+    aleatorio = random.Random(0)
+    peticiones = [(aleatorio.randrange(len(ESCENARIOS)), aleatorio.choice((20.0, 40.0, 60.0)))
+                  for _ in range(10 * N_HILOS)]
+
+    def pedir(peticion):
+        i, t_max = peticion
+        modelo, y0, params = ESCENARIOS[i]
+        trayectoria = obtener_trayectoria(modelo, y0, params, t_max,
+                                          ejecutar=servicio.extender, method="LSODA")
+        assert trayectoria.t_fin >= t_max
+        t = T[T <= t_max]
+        return i, t, trayectoria.evaluar(t)
+
+    with ThreadPoolExecutor(N_HILOS) as hilos:
+        resultados = list(hilos.map(pedir, peticiones))
+    for i, t, y in resultados:
+        # Un horizonte extendido por tramos da pasos distintos: igual a la tolerancia del solver
+        np.testing.assert_allclose(y, esperados[i][..., :t.size], rtol=1e-4, atol=1e-3)
+
+    # Lo que queda en cache llega al mayor horizonte pedido en cada escenario
+    for i, (modelo, y0, params) in enumerate(ESCENARIOS):
+        pedidos = [t_max for j, t_max in peticiones if j == i]
+        if pedidos:
+            trayectoria = obtener_trayectoria(modelo, y0, params, 1.0, method="LSODA")
+            assert trayectoria.t_fin >= max(pedidos)
+
+
+def test_una_extension_mas_corta_no_reemplaza_a_la_cacheada():
+    CACHE_SIMULACIONES.limpiar()
+    modelo, y0, params = ESCENARIOS[0]
+    larga = integrar_trayectoria(modelo, y0, params, 60.0, method="LSODA")
+
+    def ejecutar_cruzado(clave, trayectoria, t_max):
+        # Mientras se integra hasta t_max, otra petición guarda una trayectoria más larga
+        CACHE_SIMULACIONES.guardar(clave, larga)
+        return integrar_trayectoria(modelo, y0, params, t_max, method="LSODA")
+
+    resultado = obtener_trayectoria(modelo, y0, params, 30.0, ejecutar=ejecutar_cruzado,
+                                    method="LSODA")
+    assert resultado is larga
+    assert obtener_trayectoria(modelo, y0, params, 1.0, method="LSODA") is larga
+
+
+class PoolRetenido:
+    """Pool de hilos que no empieza ningún trabajo hasta ``soltar()``."""
+
+    def __init__(self):
+        self.hilos = ThreadPoolExecutor(4)
+        self.evento = threading.Event()
+        self.enviados = 0
+
+    def submit(self, funcion, *args):
+        self.enviados += 1
+        return self.hilos.submit(lambda: self.evento.wait(10) and funcion(*args))
+
+    def soltar(self):
+        self.evento.set()
+
+
+def test_anexar_rechaza_una_continuacion_con_hueco():
+    modelo, y0, params = ESCENARIOS[0]
+    continuacion = integrar_trayectoria(modelo, y0, params, 20.0, method="LSODA").continuacion()
+    continuacion.extender(60.0)
+    nueva = Trayectoria(modelo, y0, params, method="LSODA", t_referencia=60.0)
+    assert not nueva.anexar(continuacion)
+    assert nueva.t_fin == 0.0 and not nueva.tramos
+
+
+def test_objeto_recargado_no_se_une_a_un_tramo_que_no_cubre():
+    # Tras un desalojo (o una lectura de sqlite) la misma clave tiene otro
+    # objeto más corto mientras la copia anterior sigue extendiéndose
+    modelo, y0, params = ESCENARIOS[0]
+    pool = PoolRetenido()
+    servicio = ServicioSolver(pool=pool)
+    anterior = integrar_trayectoria(modelo, y0, params, 20.0, method="LSODA")
+    recargada = Trayectoria(modelo, y0, params, method="LSODA", t_referencia=60.0)
+
+    with ThreadPoolExecutor(2) as hilos:
+        primero = hilos.submit(servicio.extender, "clave", anterior, 60.0)
+        esperar_hasta = time.monotonic() + 5
+        while pool.enviados < 1:
+            assert time.monotonic() < esperar_hasta
+            time.sleep(0.01)
+        segundo = hilos.submit(servicio.extender, "clave", recargada, 60.0)
+        while pool.enviados < 2:
+            assert time.monotonic() < esperar_hasta
+            time.sleep(0.01)
+        pool.soltar()
+        primero.result(), segundo.result()
+
+    referencia = serial(modelo, y0, params)
+    for trayectoria in (anterior, recargada):
+        assert trayectoria.t_fin == pytest.approx(60.0)
+        np.testing.assert_allclose(trayectoria.evaluar(T), referencia, rtol=1e-4, atol=1e-3)
+    assert recargada.evaluar([0.0])[1, 0, 0] == pytest.approx(10.0)
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.kernels import precompilar
+
+# ===============================================================
+# Ejecutor de barridos de parámetros
+# ---------------------------------------------------------------
+# Listas cortas se resuelven en serie (arrancar procesos cuesta más que
+# integrarlas); listas largas se reparten en un pool de procesos del
+# tamaño de la máquina. Es el mismo pool que usa el servicio de solvers
+# (utils.servicio): se crea una sola vez, al arrancar la app y antes de
+# que el servidor abra hilos, y se reutiliza entre callbacks.
+# ===============================================================
+
+UMBRAL_SERIAL = 8
+N_PROCESOS = (len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity")
+              else os.cpu_count() or 1)
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def iniciar_pool():
+    """
+    Crea el pool compartido (un proceso por núcleo, cada uno carga los
+    núcleos compilados al arrancar) y espera a que arranquen todos sus
+    procesos. Se llama desde el punto de entrada de la app, para que los
+    procesos se bifurquen desde un intérprete de un solo hilo.
+    """
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=N_PROCESOS, initializer=precompilar)
+            for futuro in [_pool.submit(int) for _ in range(N_PROCESOS)]:
+                futuro.result()
+    return _pool
+
+
+def obtener_pool():
+    """
+    Devuelve el pool compartido. Si el punto de entrada no lo inició
+    (tests, otros servidores), se crea aquí la primera vez.
+    """
+    return _pool or iniciar_pool()
+
+
+def cerrar_pool():
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _cronometrar(funcion, kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(**kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def ejecutar_barrido(funcion, escenarios, umbral_serial=UMBRAL_SERIAL):
+    """
+    Ejecuta ``funcion(**escenario)`` para cada escenario.
+
+    ``funcion`` debe ser importable a nivel de módulo (se envía por pickle a
+    los procesos). Devuelve un dict con:
+      - "resultados": en el mismo orden que ``escenarios``
+      - "tiempos": segundos de cómputo de cada escenario, medidos en el
+        proceso que lo ejecuta
+      - "modo": "serial" o "paralelo"
+      - "total": segundos de pared de todo el barrido
+    """
+    escenarios = list(escenarios)
+    inicio = time.perf_counter()
+
+    if len(escenarios) < umbral_serial or N_PROCESOS < 2:
+        modo = "serial"
+        salidas = [_cronometrar(funcion, e) for e in escenarios]
+    else:
+        modo = "paralelo"
+        pool = obtener_pool()
+        trozo = max(1, len(escenarios) // (4 * N_PROCESOS))
+        salidas = list(pool.map(_cronometrar, [funcion] * len(escenarios), escenarios,
+                                chunksize=trozo))
+
+    return {
+        "resultados": [r for r, _ in salidas],
+        "tiempos": [s for _, s in salidas],
+        "modo": modo,
+        "total": time.perf_counter() - inicio,
+    }
+
+
+def resumen_barrido(nombre, barrido):
+    """
+    Texto corto con el modo y los tiempos del barrido, para mostrar en la
+    página. Si los escenarios se agruparon en lotes (``barrido["escenarios"]``
+    mayor que el número de tiempos), los tiempos medidos son por lote y por
+    escenario solo se da la media. Los lotes servidos desde cache
+    (``barrido["desde_cache"]``) no tienen tiempo.
+    """
+    tiempos = barrido["tiempos"]
+    if not tiempos:
+        if barrido.get("desde_cache"):
+            return f"{nombre}: {barrido['desde_cache']} lote(s) servidos desde cache."
+        return f"{nombre}: sin escenarios."
+    escenarios = barrido.get("escenarios", len(tiempos))
+    rango = f"{min(tiempos) * 1000:.1f}–{max(tiempos) * 1000:.1f} ms"
+    texto = f"{nombre}: {escenarios} escenarios ({barrido['modo']}) en {barrido['total'] * 1000:.0f} ms; "
+    if escenarios == len(tiempos):
+        texto += f"por escenario {rango}."
+    else:
+        texto += (f"por lote ({len(tiempos)}) {rango}, media por escenario "
+                  f"{sum(tiempos) / escenarios * 1000:.2f} ms.")
+    if barrido.get("desde_cache"):
+        texto += f" {barrido['desde_cache']} lote(s) servidos desde cache."
+    return texto
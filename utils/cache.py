@@ -0,0 +1,165 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# ===============================================================
+# Memoización de simulaciones
+# ---------------------------------------------------------------
+# Nivel 1: LRU acotado en memoria. Nivel 2 (opcional): tabla sqlite
+# que sobrevive a reinicios y se comparte entre procesos del servidor.
+# Las claves se canonizan redondeando los flotantes a la tolerancia del
+# solver, así 0.3 y 0.30000000001 reutilizan la misma simulación.
+# ===============================================================
+
+CIFRAS_SIGNIFICATIVAS = 7   # acorde a rtol=1e-6 del motor
+
+
+def canonizar(valor, cifras=CIFRAS_SIGNIFICATIVAS):
+    """Convierte ``valor`` en una estructura hashable y estable entre ejecuciones."""
+    if isinstance(valor, dict):
+        return tuple(sorted((str(k), canonizar(v, cifras)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(canonizar(v, cifras) for v in valor)
+    if isinstance(valor, np.ndarray):
+        return ("array", valor.shape) + tuple(canonizar(float(v), cifras) for v in valor.ravel())
+    if isinstance(valor, (bool, np.bool_)) or valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        valor = float(valor)
+        if valor == 0.0:
+            return 0.0
+        return float(f"{valor:.{cifras}g}")
+    return repr(valor)
+
+
+def clave_canonica(*partes):
+    """Huella SHA-1 de las partes canonizadas; se usa como clave de cache."""
+    return hashlib.sha1(repr(canonizar(partes)).encode("utf-8")).hexdigest()
+
+
+class CacheSimulaciones:
+    """
+    LRU en memoria con un segundo nivel sqlite opcional.
+
+    ``estadisticas()`` expone aciertos, fallos y desalojos para dimensionar
+    ``max_entradas`` con tráfico real.
+    """
+
+    def __init__(self, max_entradas=256, ruta_disco=None, max_entradas_disco=5000):
+        self.max_entradas = int(max_entradas)
+        self.max_entradas_disco = int(max_entradas_disco)
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {"aciertos": 0, "aciertos_disco": 0, "fallos": 0, "desalojos": 0}
+        self._db = None
+        if ruta_disco:
+            self._db = sqlite3.connect(ruta_disco, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS simulaciones "
+                "(clave TEXT PRIMARY KEY, valor BLOB, usado REAL)"
+            )
+            self._db.commit()
+
+    # ---------------- API ----------------
+    def obtener(self, clave):
+        """Devuelve el valor guardado o ``None`` si no está en ningún nivel."""
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self._contadores["aciertos"] += 1
+                return self._memoria[clave]
+
+            valor = self._leer_disco(clave)
+            if valor is None:
+                self._contadores["fallos"] += 1
+                return None
+            self._contadores["aciertos_disco"] += 1
+            self._guardar_memoria(clave, valor)
+            return valor
+
+    def guardar(self, clave, valor, conservar=None):
+        """
+        Guarda ``valor`` y lo devuelve. Si se da ``conservar(actual, valor)``
+        y devuelve True para lo que ya había en memoria, se mantiene lo
+        anterior y se devuelve eso.
+        """
+        with self._lock:
+            actual = self._memoria.get(clave)
+            if conservar is not None and actual is not None and conservar(actual, valor):
+                return actual
+            self._guardar_memoria(clave, valor)
+            self._escribir_disco(clave, valor)
+            return valor
+
+    def obtener_o_calcular(self, clave, calcular):
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._contadores)
+            datos["entradas"] = len(self._memoria)
+            datos["max_entradas"] = self.max_entradas
+            consultas = datos["aciertos"] + datos["aciertos_disco"] + datos["fallos"]
+            datos["tasa_aciertos"] = (
+                (datos["aciertos"] + datos["aciertos_disco"]) / consultas if consultas else 0.0
+            )
+            return datos
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM simulaciones")
+                self._db.commit()
+
+    # ---------------- niveles internos ----------------
+    def _guardar_memoria(self, clave, valor):
+        self._memoria[clave] = valor
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+            self._contadores["desalojos"] += 1
+
+    def _leer_disco(self, clave):
+        if self._db is None:
+            return None
+        fila = self._db.execute(
+            "SELECT valor FROM simulaciones WHERE clave = ?", (clave,)
+        ).fetchone()
+        if fila is None:
+            return None
+        self._db.execute("UPDATE simulaciones SET usado = ? WHERE clave = ?", (time.time(), clave))
+        self._db.commit()
+        return pickle.loads(fila[0])
+
+    def _escribir_disco(self, clave, valor):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO simulaciones (clave, valor, usado) VALUES (?, ?, ?)",
+            (clave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+        )
+        self._db.execute(
+            "DELETE FROM simulaciones WHERE clave IN ("
+            "SELECT clave FROM simulaciones ORDER BY usado DESC LIMIT -1 OFFSET ?)",
+            (self.max_entradas_disco,),
+        )
+        self._db.commit()
+
+
+# Instancia compartida por todas las páginas. El nivel en disco se activa
+# con SIMULACIONES_CACHE_DB=/ruta/a/cache.sqlite
+CACHE_SIMULACIONES = CacheSimulaciones(
+    max_entradas=int(os.environ.get("SIMULACIONES_CACHE_MAX", 256)),
+    ruta_disco=os.environ.get("SIMULACIONES_CACHE_DB"),
+)
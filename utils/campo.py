@@ -0,0 +1,332 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# ===============================================================
+# Campos vectoriales 2D
+# ---------------------------------------------------------------
+# Todas las flechas de una malla van en dos trazas: los segmentos
+# base -> punta separados con NaN (con la punta marcada) y los puntos
+# base, que llevan el vector en ``customdata`` para el hover. Una malla
+# de 200×200 son 40 000 flechas en dos objetos de Plotly (WebGL a partir
+# de UMBRAL_WEBGL flechas) en lugar de 40 000 trazas.
+#
+# Las trayectorias siguen el mismo criterio: todas las semillas avanzan
+# juntas como un array en un RK4 vectorizado y se dibujan en una traza.
+# ===============================================================
+
+UMBRAL_WEBGL = 1000
+HOVER_QUIVER = (
+    "Punto: (%{x:.1f}, %{y:.1f})<br>"
+    "Vector: (%{customdata[0]:.2f}, %{customdata[1]:.2f})<extra></extra>"
+)
+
+
+def segmentos_quiver(X, Y, U, V, escala=1.0):
+    """
+    Coordenadas (x, y) de los segmentos base -> punta separados por NaN
+    (tres puntos por flecha: base, punta, hueco) y los arrays planos
+    (x0, y0, u, v) de la malla. ``escala`` (escalar o un valor por flecha)
+    solo cambia la longitud dibujada.
+    """
+    x0, y0 = np.ravel(X).astype(float), np.ravel(Y).astype(float)
+    u = np.broadcast_to(np.asarray(U, dtype=float), np.shape(X)).ravel()
+    v = np.broadcast_to(np.asarray(V, dtype=float), np.shape(X)).ravel()
+    escala = np.broadcast_to(np.asarray(escala, dtype=float), np.shape(X)).ravel()
+    xs = np.column_stack([x0, x0 + escala * u, np.full_like(x0, np.nan)]).ravel()
+    ys = np.column_stack([y0, y0 + escala * v, np.full_like(y0, np.nan)]).ravel()
+    return xs, ys, (x0, y0, u, v)
+
+
+def trazas_quiver(X, Y, U, V, color="blue", color_punta="red", ancho=2,
+                  tamano_base=3, tamano_punta=5, webgl=None, escala=1.0):
+    """
+    Dos trazas con todas las flechas del campo (U, V) dibujadas desde los
+    puntos de la malla (X, Y): los segmentos con un marcador en la punta
+    y los puntos base con el hover (que muestra el vector sin escalar).
+    Las coordenadas viajan en float32.
+    """
+    xs, ys, (x0, y0, u, v) = segmentos_quiver(X, Y, U, V, escala)
+    n = x0.size
+    if webgl is None:
+        webgl = n >= UMBRAL_WEBGL
+    clase = go.Scattergl if webgl else go.Scatter
+    segmentos = clase(
+        x=xs.astype(np.float32),
+        y=ys.astype(np.float32),
+        mode="lines+markers",
+        line=dict(color=color, width=ancho),
+        marker=dict(size=np.tile(np.array([0, tamano_punta, 0], dtype=np.uint8), n),
+                    color=color_punta),
+        connectgaps=False,
+        hoverinfo="skip",
+        showlegend=False,
+    )
+    bases = clase(
+        x=x0.astype(np.float32),
+        y=y0.astype(np.float32),
+        mode="markers",
+        marker=dict(size=tamano_base, color=color),
+        customdata=np.column_stack([u, v]).astype(np.float32),
+        hovertemplate=HOVER_QUIVER,
+        showlegend=False,
+    )
+    return [segmentos, bases]
+
+
+# ---------------------------------------------------------------
+# Malla adaptativa (quadtree)
+# ---------------------------------------------------------------
+UMBRAL_VARIACION = 0.25
+PRESUPUESTO_FLECHAS = 2500
+MAX_NIVELES = 6
+_HIJOS = np.array([[-1, -1], [1, -1], [-1, 1], [1, 1]], dtype=float)
+_MUESTRAS = np.array([[0, 0], [-1, -1], [1, -1], [-1, 1], [1, 1]], dtype=float)
+
+
+def _variacion(campo, cx, cy, hx, hy, referencia):
+    """
+    Evalúa el campo en el centro y las esquinas de cada celda. La variación
+    es el mayor salto esquina-centro relativo a la magnitud en el centro
+    (más ``referencia`` para no dividir entre cero cerca de los equilibrios).
+    """
+    px = cx[:, None] + hx[:, None] * _MUESTRAS[:, 0]
+    py = cy[:, None] + hy[:, None] * _MUESTRAS[:, 1]
+    with np.errstate(all="ignore"):
+        u, v = campo(px, py)
+        u = np.broadcast_to(np.asarray(u, dtype=float), px.shape)
+        v = np.broadcast_to(np.asarray(v, dtype=float), px.shape)
+        salto = np.hypot(u[:, 1:] - u[:, :1], v[:, 1:] - v[:, :1]).max(axis=1)
+        variacion = salto / (np.hypot(u[:, 0], v[:, 0]) + referencia)
+    return np.nan_to_num(variacion, nan=0.0, posinf=0.0), u[:, 0], v[:, 0]
+
+
+def malla_adaptativa(campo, xmax, ymax, n_base, presupuesto=PRESUPUESTO_FLECHAS,
+                     umbral=UMBRAL_VARIACION, max_niveles=MAX_NIVELES):
+    """
+    Quadtree sobre [-xmax, xmax]×[-ymax, ymax] que parte de n_base×n_base
+    celdas (recortado para que quepa en ``presupuesto``) y divide en cuatro
+    las de mayor variación (> ``umbral``) hasta agotar ``presupuesto``
+    flechas o ``max_niveles``. Solo se evalúa el campo en las celdas
+    nuevas de cada nivel.
+
+    Devuelve un dict con los centros (x, y), las semianchuras (hx, hy), el
+    campo en los centros (u, v) y el nivel de cada hoja.
+    """
+    n_base = int(np.clip(n_base, 1, np.sqrt(presupuesto)))
+    cx, cy = semillas_malla(xmax, ymax, n_base)
+    hx = np.full(cx.size, xmax / n_base)
+    hy = np.full(cx.size, ymax / n_base)
+    nivel = np.zeros(cx.size, dtype=int)
+
+    with np.errstate(all="ignore"):
+        u0, v0 = campo(cx, cy)
+        magnitud = np.hypot(np.broadcast_to(u0, cx.shape), np.broadcast_to(v0, cx.shape))
+    referencia = 0.1 * (float(np.nanmedian(magnitud)) if np.isfinite(magnitud).any() else 1.0)
+    referencia = referencia if referencia > 0 else 1e-12
+    variacion, u, v = _variacion(campo, cx, cy, hx, hy, referencia)
+
+    while True:
+        cupo = (presupuesto - cx.size) // 3
+        candidatas = np.flatnonzero((variacion > umbral) & (nivel < max_niveles))
+        if cupo <= 0 or candidatas.size == 0:
+            break
+        candidatas = candidatas[np.argsort(-variacion[candidatas], kind="stable")[:cupo]]
+
+        hx_h = np.repeat(hx[candidatas] / 2, 4)
+        hy_h = np.repeat(hy[candidatas] / 2, 4)
+        cx_h = np.repeat(cx[candidatas], 4) + np.tile(_HIJOS[:, 0], candidatas.size) * hx_h
+        cy_h = np.repeat(cy[candidatas], 4) + np.tile(_HIJOS[:, 1], candidatas.size) * hy_h
+        nivel_h = np.repeat(nivel[candidatas] + 1, 4)
+        variacion_h, u_h, v_h = _variacion(campo, cx_h, cy_h, hx_h, hy_h, referencia)
+
+        quedan = np.ones(cx.size, dtype=bool)
+        quedan[candidatas] = False
+        cx, cy = np.concatenate([cx[quedan], cx_h]), np.concatenate([cy[quedan], cy_h])
+        hx, hy = np.concatenate([hx[quedan], hx_h]), np.concatenate([hy[quedan], hy_h])
+        u, v = np.concatenate([u[quedan], u_h]), np.concatenate([v[quedan], v_h])
+        nivel = np.concatenate([nivel[quedan], nivel_h])
+        variacion = np.concatenate([variacion[quedan], variacion_h])
+
+    return {"x": cx, "y": cy, "hx": hx, "hy": hy, "u": u, "v": v, "nivel": nivel}
+
+
+def escala_por_celda(malla, relleno=0.9):
+    """
+    Factor de longitud de cada flecha: el tamaño de su celda dividido por
+    la magnitud máxima de toda la malla (una sola para todas). Ninguna
+    flecha se sale de su celda y solo la más larga de la malla llena la
+    suya; entre celdas del mismo tamaño se conservan las proporciones.
+    """
+    magnitud = np.hypot(malla["u"], malla["v"])
+    maximo = np.nanmax(magnitud[np.isfinite(magnitud)], initial=0.0)
+    if maximo == 0:
+        return np.ones_like(magnitud)
+    return relleno * 2 * np.minimum(malla["hx"], malla["hy"]) / maximo
+
+
+# ---------------------------------------------------------------
+# Trayectorias en el plano de fase
+# ---------------------------------------------------------------
+def semillas_malla(xmax, ymax, n):
+    """Semillas en una malla n×n que no toca los bordes de la ventana."""
+    x = (np.arange(n) + 0.5) / n * 2 * xmax - xmax
+    y = (np.arange(n) + 0.5) / n * 2 * ymax - ymax
+    X, Y = np.meshgrid(x, y)
+    return X.ravel(), Y.ravel()
+
+
+def integrar_semillas(campo, x0, y0, t_max, pasos, limites):
+    """
+    Integra todas las semillas a la vez con RK4 de paso fijo
+    dt = t_max / pasos. ``campo(x, y)`` devuelve (u, v) vectorizado y
+    ``limites`` es (xmin, xmax, ymin, ymax): una semilla se detiene al
+    salir de la ventana o si el campo deja de ser finito, y solo se sigue
+    evaluando el campo en las activas.
+
+    Devuelve (xs, ys) de forma (n_semillas, pasos + 1), con NaN después de
+    que cada semilla se detiene.
+    """
+    xmin, xmax, ymin, ymax = limites
+    x = np.asarray(x0, dtype=float).ravel().copy()
+    y = np.asarray(y0, dtype=float).ravel().copy()
+    xs = np.full((pasos + 1, x.size), np.nan)
+    ys = np.full((pasos + 1, x.size), np.nan)
+    xs[0], ys[0] = x, y
+    activas = np.flatnonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+    dt = float(t_max) / pasos
+
+    with np.errstate(all="ignore"):
+        for paso in range(1, pasos + 1):
+            if activas.size == 0:
+                break
+            xa, ya = x[activas], y[activas]
+            u1, v1 = campo(xa, ya)
+            u2, v2 = campo(xa + 0.5 * dt * u1, ya + 0.5 * dt * v1)
+            u3, v3 = campo(xa + 0.5 * dt * u2, ya + 0.5 * dt * v2)
+            u4, v4 = campo(xa + dt * u3, ya + dt * v3)
+            xa = xa + dt / 6 * (u1 + 2 * u2 + 2 * u3 + u4)
+            ya = ya + dt / 6 * (v1 + 2 * v2 + 2 * v3 + v4)
+
+            finitas = np.isfinite(xa) & np.isfinite(ya)
+            x[activas], y[activas] = xa, ya
+            # El punto de salida se guarda para que la curva llegue al borde
+            xs[paso, activas[finitas]] = xa[finitas]
+            ys[paso, activas[finitas]] = ya[finitas]
+            dentro = finitas & (xa >= xmin) & (xa <= xmax) & (ya >= ymin) & (ya <= ymax)
+            activas = activas[dentro]
+    return xs.T, ys.T
+
+
+def integrar_trayectorias(campo, x0, y0, t_max, pasos, limites, ambos_sentidos=True):
+    """
+    Como ``integrar_semillas``; con ``ambos_sentidos`` integra además hacia
+    atrás (campo cambiado de signo) y une las dos mitades en cada fila,
+    de modo que cada semilla queda en medio de su trayectoria.
+    """
+    xs, ys = integrar_semillas(campo, x0, y0, t_max, pasos, limites)
+    if not ambos_sentidos:
+        return xs, ys
+
+    def inverso(x, y):
+        u, v = campo(x, y)
+        return -u, -v
+
+    xa, ya = integrar_semillas(inverso, x0, y0, t_max, pasos, limites)
+    return (np.hstack([xa[:, :0:-1], xs]), np.hstack([ya[:, :0:-1], ys]))
+
+
+# ---------------------------------------------------------------
+# Animación de partículas
+# ---------------------------------------------------------------
+N_CUADROS = 60
+SUBPASOS = 4               # pasos RK4 entre cuadro y cuadro
+DURACION_CUADRO_MS = 60
+
+
+def particulas_aleatorias(xmax, ymax, n, semilla=0):
+    """Nube de ``n`` partículas uniformes en la ventana (reproducible)."""
+    rng = np.random.default_rng(semilla)
+    return rng.uniform(-xmax, xmax, n), rng.uniform(-ymax, ymax, n)
+
+
+def cuadros_particulas(campo, x0, y0, t_max, limites, n_cuadros=N_CUADROS, subpasos=SUBPASOS):
+    """
+    Posiciones de todas las partículas en ``n_cuadros + 1`` instantes
+    equiespaciados de [0, t_max]. Se integran juntas con el RK4 de
+    ``integrar_semillas`` (``subpasos`` pasos por cuadro); las que salen de
+    la ventana quedan en NaN. Devuelve (xs, ys) de forma (n_cuadros + 1, n).
+    """
+    xs, ys = integrar_semillas(campo, x0, y0, t_max, n_cuadros * subpasos, limites)
+    return xs[:, ::subpasos].T, ys[:, ::subpasos].T
+
+
+def animar_particulas(fig, xs, ys, t_max, color="black", duracion_ms=DURACION_CUADRO_MS):
+    """
+    Añade a ``fig`` la nube de partículas y un ``go.Frame`` por instante,
+    con botones de reproducción y un deslizador. Cada cuadro solo
+    reemplaza la traza de partículas: el navegador reproduce sin volver
+    al servidor.
+    """
+    indice = len(fig.data)
+    estilo = dict(mode="markers", marker=dict(size=3, color=color, opacity=0.8),
+                  hoverinfo="skip", showlegend=False)
+    fig.add_trace(go.Scattergl(x=xs[0].astype(np.float32), y=ys[0].astype(np.float32), **estilo))
+
+    tiempos = np.linspace(0, t_max, len(xs))
+    fig.frames = [
+        go.Frame(
+            data=[go.Scattergl(x=x.astype(np.float32), y=y.astype(np.float32), **estilo)],
+            traces=[indice],
+            name=str(k),
+        )
+        for k, (x, y) in enumerate(zip(xs, ys))
+    ]
+    reproducir = dict(frame=dict(duration=duracion_ms, redraw=True),
+                      transition=dict(duration=0), fromcurrent=True, mode="immediate")
+    fig.update_layout(
+        updatemenus=[dict(
+            type="buttons", direction="left", x=0.0, y=-0.12, xanchor="left", yanchor="top",
+            buttons=[
+                dict(label="▶", method="animate", args=[None, reproducir]),
+                dict(label="❚❚", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+            ],
+        )],
+        sliders=[dict(
+            x=0.12, y=-0.08, len=0.88, currentvalue=dict(prefix="t = "),
+            steps=[dict(label=f"{t:.2f}", method="animate",
+                        args=[[str(k)], dict(frame=dict(duration=0, redraw=True), mode="immediate")])
+                   for k, t in enumerate(tiempos)],
+        )],
+    )
+    return fig
+
+
+MAX_PUNTOS_TRAYECTORIAS = 200_000
+
+
+def traza_trayectorias(xs, ys, color="blue", ancho=1.5, webgl=True,
+                       max_puntos=MAX_PUNTOS_TRAYECTORIAS):
+    """
+    Una sola traza con todas las trayectorias: se quitan los NaN de las
+    semillas detenidas y se deja uno entre curva y curva. Si pasan de
+    ``max_puntos`` se dibuja uno de cada k pasos del integrador.
+    """
+    cada = int(np.ceil(np.isfinite(xs).sum() / max_puntos))
+    if cada > 1:
+        xs, ys = xs[:, ::cada], ys[:, ::cada]
+    separador = np.full((xs.shape[0], 1), np.nan)
+    x = np.hstack([xs, separador])
+    y = np.hstack([ys, separador])
+    conservar = np.isfinite(x) & np.isfinite(y)
+    conservar[:, -1] = True
+    clase = go.Scattergl if webgl else go.Scatter
+    return clase(
+        x=x[conservar].astype(np.float32),
+        y=y[conservar].astype(np.float32),
+        mode="lines",
+        line=dict(color=color, width=ancho),
+        connectgaps=False,
+        hovertemplate="(%{x:.2f}, %{y:.2f})<extra></extra>",
+        showlegend=False,
+    )
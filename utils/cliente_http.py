@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ===============================================================
+# Cliente HTTP con cache para APIs de datos lentos
+# ---------------------------------------------------------------
+# Las respuestas JSON se guardan en memoria con un TTL por endpoint. Mientras
+# están frescas se sirven sin salir a la red. Pasado el TTL, y durante
+# ``max_obsoleto`` segundos más, se sirve la copia guardada al instante y se
+# revalida en segundo plano (stale-while-revalidate) con If-None-Match /
+# If-Modified-Since; un 304 solo renueva el TTL. Más allá de esa ventana la
+# petición espera a la red, y si esta falla se devuelve la copia vieja antes
+# que un error. Peticiones simultáneas a la misma URL comparten una sola
+# descarga.
+# ===============================================================
+
+TTL_POR_DEFECTO = 10 * 60        # s
+MAX_OBSOLETO = 24 * 60 * 60      # s que se sigue sirviendo una copia vencida
+TIMEOUT = 10                     # s por petición
+CONEXIONES_POR_HOST = 16         # conexiones keep-alive reutilizables por host
+
+
+def crear_sesion(conexiones=CONEXIONES_POR_HOST):
+    """
+    requests.Session con un pool de conexiones keep-alive del tamaño de los
+    hilos que la usan a la vez, para que las peticiones paralelas no abran
+    (ni descarten) conexiones nuevas.
+    """
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=conexiones)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+class ClienteHTTP:
+    """
+    GET de JSON contra ``base`` con cache en memoria.
+
+    ``ttl`` asigna segundos de frescura por prefijo de ruta, p. ej.
+    ``{"countries": 600, "historical": 3600}``; gana el prefijo más largo.
+    Los datos devueltos se comparten entre llamadas: no modificarlos.
+    """
+
+    def __init__(self, base, ttl=None, ttl_por_defecto=TTL_POR_DEFECTO,
+                 max_obsoleto=MAX_OBSOLETO, timeout=TIMEOUT, max_entradas=256, sesion=None):
+        self.base = base.rstrip("/")
+        self.ttl = dict(ttl or {})
+        self.ttl_por_defecto = ttl_por_defecto
+        self.max_obsoleto = max_obsoleto
+        self.timeout = timeout
+        self.max_entradas = int(max_entradas)
+        self.sesion = sesion or crear_sesion()
+        self._entradas = OrderedDict()
+        self._descargando = {}
+        self._lock = threading.Lock()
+        self._fondo = ThreadPoolExecutor(max_workers=2, thread_name_prefix="revalidar")
+        self._contadores = {"frescos": 0, "obsoletos": 0, "descargas": 0,
+                            "no_modificados": 0, "errores": 0}
+
+    # ---------------- API ----------------
+    def obtener(self, ruta, params=None):
+        """JSON de ``base/ruta`` (con ``params``); lanza requests.RequestException si no hay copia."""
+        return self.obtener_con_estado(ruta, params)[0]
+
+    def obtener_con_estado(self, ruta, params=None):
+        """
+        Devuelve (datos, estado). ``estado`` es "fresco" (de cache, dentro del
+        TTL), "obsoleto" (de cache, revalidando en segundo plano), "red"
+        (descargado o revalidado ahora) o "error" (falló la red y se sirvió
+        una copia vieja).
+        """
+        clave = self._clave(ruta, params)
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                if ahora < entrada["expira"]:
+                    self._contadores["frescos"] += 1
+                    return entrada["datos"], "fresco"
+                if ahora < entrada["expira"] + self.max_obsoleto:
+                    self._contadores["obsoletos"] += 1
+                    if clave not in self._descargando:
+                        self._descargando[clave] = threading.Event()
+                        self._fondo.submit(self._revalidar_fondo, clave, ruta, params)
+                    return entrada["datos"], "obsoleto"
+            # Sin copia útil: descarga una sola petición; el resto espera
+            evento = self._descargando.get(clave)
+            propia = evento is None
+            if propia:
+                evento = self._descargando[clave] = threading.Event()
+
+        if not propia:
+            evento.wait(self.timeout * 2)
+            with self._lock:
+                entrada = self._entradas.get(clave)
+            if entrada is not None and time.monotonic() < entrada["expira"]:
+                return entrada["datos"], "red"
+            # La otra descarga falló o tardó demasiado: se intenta aquí
+
+        try:
+            return self._descargar(clave, ruta, params), "red"
+        except requests.RequestException:
+            with self._lock:
+                self._contadores["errores"] += 1
+                entrada = self._entradas.get(clave)
+            if entrada is None:
+                raise
+            return entrada["datos"], "error"
+        finally:
+            if propia:
+                self._liberar(clave)
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._contadores)
+            datos["entradas"] = len(self._entradas)
+            consultas = datos["frescos"] + datos["obsoletos"] + datos["descargas"]
+            datos["tasa_cache"] = (
+                (datos["frescos"] + datos["obsoletos"]) / consultas if consultas else 0.0
+            )
+            return datos
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    # ---------------- internos ----------------
+    def _clave(self, ruta, params):
+        return ruta.strip("/"), tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+    def _ttl(self, ruta):
+        ruta = ruta.strip("/")
+        prefijos = [p for p in self.ttl if ruta.startswith(p)]
+        return self.ttl[max(prefijos, key=len)] if prefijos else self.ttl_por_defecto
+
+    def _descargar(self, clave, ruta, params):
+        """GET condicional si hay copia; guarda y devuelve los datos vigentes."""
+        with self._lock:
+            anterior = self._entradas.get(clave)
+        cabeceras = {}
+        if anterior is not None:
+            if anterior["etag"]:
+                cabeceras["If-None-Match"] = anterior["etag"]
+            if anterior["modificado"]:
+                cabeceras["If-Modified-Since"] = anterior["modificado"]
+
+        respuesta = self.sesion.get(f"{self.base}/{clave[0]}", params=params,
+                                    headers=cabeceras, timeout=self.timeout)
+        expira = time.monotonic() + self._ttl(ruta)
+        if respuesta.status_code == 304 and anterior is not None:
+            with self._lock:
+                self._contadores["no_modificados"] += 1
+                anterior["expira"] = expira
+            return anterior["datos"]
+        respuesta.raise_for_status()
+        # El cuerpo se interpreta fuera del lock: un JSON grande no frena
+        # las consultas a la cache de otras rutas
+        datos = respuesta.json()
+        with self._lock:
+            self._contadores["descargas"] += 1
+            self._entradas[clave] = {
+                "datos": datos,
+                "etag": respuesta.headers.get("ETag"),
+                "modificado": respuesta.headers.get("Last-Modified"),
+                "expira": expira,
+            }
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+            return datos
+
+    def _revalidar_fondo(self, clave, ruta, params):
+        try:
+            self._descargar(clave, ruta, params)
+        except requests.RequestException:
+            # Se sigue sirviendo la copia vieja; el próximo acceso lo reintenta
+            with self._lock:
+                self._contadores["errores"] += 1
+        finally:
+            self._liberar(clave)
+
+    def _liberar(self, clave):
+        with self._lock:
+            evento = self._descargando.pop(clave, None)
+        if evento is not None:
+            evento.set()
@@ -0,0 +1,241 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import stats
+
+# ===============================================================
+# Históricos de disease.sh como arrays
+# ---------------------------------------------------------------
+# Cada serie llega como dict {"m/d/yy": valor}. Se convierte una sola vez
+# por respuesta en un Historico columnar: fechas datetime64[D] (las claves
+# se interpretan de forma vectorizada, sin strptime por fecha) y arrays
+# int64 de casos, muertes y recuperados. Gráficas, comparación entre
+# países y métricas trabajan sobre esos arrays. Para comparar países las
+# fechas de todos se alinean con np.unique y se vuelcan de golpe en una
+# matriz fechas × países, con NaN donde un país no tiene dato.
+# ===============================================================
+
+CAMPOS = ("cases", "deaths", "recovered")
+MAX_HISTORICOS = 128        # conversiones guardadas (una por respuesta de la API)
+
+# Métricas derivadas
+VENTANAS_MEDIA = (7, 14)    # días de las medias móviles
+DIAS_CRECIMIENTO = 7        # la tasa compara la media de 7 días con la de una semana antes
+INTERVALO_SERIE = (4.7, 2.9)  # media y desviación (días) del intervalo serial de COVID-19
+MAX_INTERVALO = 20          # días del núcleo serial discretizado
+VENTANA_RT = 7              # días que agrupa cada estimación de Rt (método de Cori)
+PRIOR_RT = (1.0, 5.0)       # gamma a priori de Rt: forma y escala (media 5, desviación 5)
+MIN_CASOS_RT = 12           # casos en la ventana por debajo de los cuales Rt no se estima
+
+# np.strings (NumPy >= 2) opera en C; np.char es la versión antigua
+_texto = getattr(np, "strings", np.char)
+
+
+def parsear_fechas(claves):
+    """Convierte claves "m/d/yy" en datetime64[D] sin recorrerlas en Python."""
+    claves = np.asarray(claves, dtype=str)
+    if not claves.size:
+        return np.array([], dtype="datetime64[D]")
+    mes, _, resto = _texto.partition(claves, "/")
+    dia, _, anio = _texto.partition(resto, "/")
+    anio = anio.astype(np.int64)
+    anio = np.where(anio < 100, anio + 2000, anio)
+    meses = (anio - 1970) * 12 + mes.astype(np.int64) - 1
+    return meses.astype("datetime64[M]").astype("datetime64[D]") + (dia.astype(np.int64) - 1)
+
+
+def _valores(serie):
+    try:
+        return np.fromiter(serie.values(), dtype=np.int64, count=len(serie))
+    except TypeError:
+        # Algún valor nulo en la API: se toma como 0
+        return np.array([v or 0 for v in serie.values()], dtype=np.int64)
+
+
+class Historico:
+    """
+    Serie de un país en columnas: ``fechas`` (datetime64[D], ordenadas) y
+    ``cases``/``deaths``/``recovered`` (int64, acumulados). ``pais`` es el
+    nombre que devolvió la API.
+    """
+
+    def __init__(self, pais, fechas, columnas):
+        self.pais = pais
+        self.fechas = fechas
+        self.columnas = columnas
+
+    def __len__(self):
+        return self.fechas.size
+
+    def __getitem__(self, campo):
+        """Columna acumulada (``cases``...) o métrica derivada (ver ``metricas``)."""
+        if campo in self.columnas:
+            return self.columnas[campo]
+        return self.metricas()[campo]
+
+    def metricas(self):
+        """
+        Métricas derivadas de los casos, calculadas la primera vez que se
+        piden y guardadas en el propio Historico (que ya está en cache por
+        país y ventana de días).
+        """
+        if getattr(self, "_metricas", None) is None:
+            self._metricas = calcular_metricas(self.columnas["cases"])
+        return self._metricas
+
+    @classmethod
+    def desde_json(cls, datos):
+        """
+        Acepta la respuesta de /historical/{pais} (objeto o lista de uno) o
+        directamente el dict ``timeline``.
+        """
+        if isinstance(datos, list):
+            datos = datos[0] if datos else {}
+        timeline = datos.get("timeline", datos) if isinstance(datos, dict) else {}
+        casos = timeline.get("cases") or {}
+        fechas = parsear_fechas(list(casos))
+        orden = np.argsort(fechas, kind="stable")
+        columnas = {}
+        for campo in CAMPOS:
+            serie = timeline.get(campo) or {}
+            if list(serie) == list(casos):
+                valores = _valores(serie)
+            else:
+                # Serie incompleta o con otras fechas: se alinea con las de casos
+                valores = np.zeros(fechas.size, dtype=np.int64)
+                indice = dict(zip(casos, range(fechas.size)))
+                for clave, valor in serie.items():
+                    if clave in indice:
+                        valores[indice[clave]] = valor or 0
+            columnas[campo] = valores[orden]
+        return cls(datos.get("country") if isinstance(datos, dict) else None,
+                   fechas[orden], columnas)
+
+
+_HISTORICOS = OrderedDict()
+_lock = threading.Lock()
+
+
+def historico_columnar(clave, datos):
+    """
+    Historico de ``datos`` (respuesta JSON), convertido una sola vez: mientras
+    el cliente HTTP devuelva el mismo objeto para ``clave`` se reutiliza la
+    conversión; si la respuesta cambió, se vuelve a convertir.
+    """
+    with _lock:
+        guardado = _HISTORICOS.get(clave)
+        if guardado is not None and guardado[0] is datos:
+            _HISTORICOS.move_to_end(clave)
+            return guardado[1]
+    historico = Historico.desde_json(datos)
+    with _lock:
+        _HISTORICOS[clave] = (datos, historico)
+        _HISTORICOS.move_to_end(clave)
+        while len(_HISTORICOS) > MAX_HISTORICOS:
+            _HISTORICOS.popitem(last=False)
+    return historico
+
+
+def alinear_historicos(historicos, campo="cases"):
+    """
+    ``historicos`` es {pais: Historico}. Devuelve (fechas, paises, matriz) con
+    ``fechas`` datetime64[D] ordenadas (la unión de las de todos) y ``matriz``
+    float de forma (n_fechas, n_paises).
+    """
+    paises = list(historicos)
+    longitudes = np.fromiter((len(historicos[p]) for p in paises), dtype=np.int64,
+                             count=len(paises))
+    if not longitudes.sum():
+        return np.array([], dtype="datetime64[D]"), paises, np.empty((0, len(paises)))
+
+    todas = np.concatenate([historicos[p].fechas for p in paises])
+    valores = np.concatenate([historicos[p][campo] for p in paises]).astype(float)
+    fechas, fila = np.unique(todas, return_inverse=True)
+
+    matriz = np.full((fechas.size, len(paises)), np.nan)
+    matriz[fila, np.repeat(np.arange(len(paises)), longitudes)] = valores
+    return fechas, paises, matriz
+
+
+# ===============================================================
+# Métricas epidemiológicas
+# ---------------------------------------------------------------
+# Todo sobre arrays: casos nuevos por diferencia de acumulados (las
+# correcciones negativas de la fuente cuentan como 0), medias móviles con
+# sumas acumuladas, tasa de crecimiento semanal y tiempo de duplicación, y
+# Rt por el método de Cori: la infectividad Λ es la convolución de los casos
+# con el núcleo del intervalo serial y, en cada ventana, la posterior gamma
+# tiene forma a + ΣI y escala 1 / (1/b + ΣΛ).
+# ===============================================================
+
+def media_movil(x, ventana):
+    """Media de los últimos ``ventana`` días; NaN hasta tener la ventana completa."""
+    x = np.asarray(x, dtype=float)
+    if x.size < ventana:
+        return np.full(x.size, np.nan)
+    suma = np.cumsum(np.concatenate([[0.0], x]))
+    return np.concatenate([np.full(ventana - 1, np.nan), (suma[ventana:] - suma[:-ventana]) / ventana])
+
+
+def suma_movil(x, ventana):
+    suma = np.cumsum(np.concatenate([[0.0], x]))
+    resultado = np.full(x.size, np.nan)
+    resultado[ventana - 1:] = suma[ventana:] - suma[:-ventana]
+    return resultado
+
+
+def nucleo_serial(media=INTERVALO_SERIE[0], desviacion=INTERVALO_SERIE[1], dias=MAX_INTERVALO):
+    """Intervalo serial gamma discretizado: w[s] = P(s - 1/2 < SI < s + 1/2), s = 1..dias."""
+    forma, escala = (media / desviacion) ** 2, desviacion ** 2 / media
+    bordes = stats.gamma.cdf(np.arange(dias + 1) + 0.5, forma, scale=escala)
+    w = np.diff(bordes)
+    return w / w.sum()
+
+
+def estimar_rt(nuevos, ventana=VENTANA_RT, prior=PRIOR_RT, nucleo=None):
+    """Rt de Cori (media y cuantiles 2.5 % / 97.5 %) para cada día, NaN sin datos suficientes."""
+    nuevos = np.asarray(nuevos, dtype=float)
+    w = nucleo_serial() if nucleo is None else nucleo
+    # Λ_t = Σ_s w_s I_{t-s}, con w_0 = 0
+    infectividad = np.convolve(nuevos, np.concatenate([[0.0], w]))[:nuevos.size]
+    casos, presion = suma_movil(nuevos, ventana), suma_movil(infectividad, ventana)
+
+    a, b = prior
+    forma = a + casos
+    escala = 1.0 / (1.0 / b + presion)
+    valido = (casos >= MIN_CASOS_RT) & (presion > 0) & (np.arange(nuevos.size) >= w.size)
+    forma, escala = np.where(valido, forma, np.nan), np.where(valido, escala, np.nan)
+    return (forma * escala,
+            stats.gamma.ppf(0.025, forma, scale=escala),
+            stats.gamma.ppf(0.975, forma, scale=escala))
+
+
+def calcular_metricas(acumulados):
+    """
+    Dict de arrays (misma longitud que ``acumulados``): ``nuevos``,
+    ``media_7``/``media_14``, ``crecimiento`` (tasa diaria, fracción),
+    ``duplicacion`` (días, solo con crecimiento positivo) y ``rt`` con
+    ``rt_bajo``/``rt_alto``.
+    """
+    acumulados = np.asarray(acumulados, dtype=float)
+    if not acumulados.size:
+        vacio = np.empty(0)
+        return {campo: vacio for campo in ("nuevos", *(f"media_{v}" for v in VENTANAS_MEDIA),
+                                           "crecimiento", "duplicacion", "rt", "rt_bajo", "rt_alto")}
+    nuevos = np.clip(np.diff(acumulados, prepend=acumulados[:1]), 0, None)
+    metricas = {"nuevos": nuevos}
+    for ventana in VENTANAS_MEDIA:
+        metricas[f"media_{ventana}"] = media_movil(nuevos, ventana)
+
+    media = metricas["media_7"]
+    anterior = np.full(media.size, np.nan)
+    anterior[DIAS_CRECIMIENTO:] = media[:-DIAS_CRECIMIENTO]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crecimiento = np.where((media > 0) & (anterior > 0),
+                               np.log(media / anterior) / DIAS_CRECIMIENTO, np.nan)
+        metricas["crecimiento"] = crecimiento
+        metricas["duplicacion"] = np.where(crecimiento > 0, np.log(2) / crecimiento, np.nan)
+
+    metricas["rt"], metricas["rt_bajo"], metricas["rt_alto"] = estimar_rt(nuevos)
+    return metricas
@@ -0,0 +1,202 @@
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# ===============================================================
+# Expresiones escritas por el usuario
+# ---------------------------------------------------------------
+# El texto se analiza una sola vez: se recorre el AST aceptando solo
+# números, variables de la malla, operadores aritméticos y una lista
+# blanca de funciones de NumPy (con o sin prefijo "np."), y se compila a
+# una función vectorizada que queda en cache. Los números se pasan a float
+# (así 9**9**9 desborda en vez de calcularse con enteros de precisión
+# arbitraria) y se rechazan exponentes constantes enormes. Con numexpr instalado y
+# mallas grandes, la evaluación se hace con numexpr (multihilo). Los
+# errores salen como ErrorExpresion con mensaje y columna, no como
+# excepciones de Python.
+# ===============================================================
+
+FUNCIONES = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan, "arctan2": np.arctan2,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "expm1": np.expm1, "log": np.log, "log10": np.log10, "log1p": np.log1p,
+    "sqrt": np.sqrt, "abs": np.abs, "sign": np.sign,
+    "minimum": np.minimum, "maximum": np.maximum, "where": np.where,
+}
+CONSTANTES = {"pi": np.pi, "e": np.e}
+
+# Funciones que numexpr sabe evaluar (con el mismo nombre)
+FUNCIONES_NUMEXPR = {
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2", "sinh", "cosh", "tanh",
+    "exp", "expm1", "log", "log10", "log1p", "sqrt", "abs", "where",
+}
+UMBRAL_NUMEXPR = 10_000     # puntos de malla a partir de los cuales compensa numexpr
+MAX_EXPONENTE = 1000        # |exponente| constante máximo en una potencia
+
+_OPERADORES = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv,
+    ast.UAdd, ast.USub,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+_NODOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+    ast.Name, ast.Load, ast.Constant,
+) + _OPERADORES
+
+
+class ErrorExpresion(ValueError):
+    """
+    Expresión rechazada o que no se pudo evaluar. ``columna`` (desde 1)
+    señala el nodo culpable cuando se conoce; ``componente`` lo rellena
+    quien llama para indicar qué campo del formulario falló.
+    """
+
+    def __init__(self, mensaje, expresion="", columna=None, componente=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.expresion = expresion
+        self.columna = columna
+        self.componente = componente
+
+    def como_dict(self):
+        return {"mensaje": self.mensaje, "expresion": self.expresion,
+                "columna": self.columna, "componente": self.componente}
+
+    def __str__(self):
+        if self.columna is None:
+            return self.mensaje
+        return f"{self.mensaje} (columna {self.columna})"
+
+
+def _valor_constante(nodo):
+    """Valor de un subárbol hecho solo de números (ya en float), o None si depende de variables."""
+    if not all(isinstance(n, (ast.Constant, ast.BinOp, ast.UnaryOp) + _OPERADORES)
+               for n in ast.walk(nodo)):
+        return None
+    codigo = compile(ast.fix_missing_locations(ast.Expression(nodo)), "<constante>", "eval")
+    try:
+        return float(eval(codigo, {"__builtins__": {}}))
+    except (ArithmeticError, ValueError):
+        return math.inf
+
+
+class _Validador(ast.NodeTransformer):
+    """Comprueba la lista blanca y reescribe ``np.f`` como ``f``."""
+
+    def __init__(self, texto, variables):
+        self.texto = texto
+        self.variables = set(variables)
+        self.funciones = set()
+
+    def _error(self, mensaje, nodo):
+        columna = getattr(nodo, "col_offset", None)
+        raise ErrorExpresion(mensaje, self.texto, None if columna is None else columna + 1)
+
+    def visit_Attribute(self, nodo):
+        if isinstance(nodo.value, ast.Name) and nodo.value.id in ("np", "numpy"):
+            return ast.copy_location(ast.Name(id=nodo.attr, ctx=ast.Load()), nodo)
+        self._error("Solo se permiten atributos de la forma np.funcion", nodo)
+
+    def visit_Call(self, nodo):
+        if nodo.keywords:
+            self._error("Las funciones no admiten argumentos con nombre", nodo.keywords[0])
+        funcion = nodo.func
+        if isinstance(funcion, ast.Attribute):
+            funcion = self.visit_Attribute(funcion)
+        if not isinstance(funcion, ast.Name) or funcion.id not in FUNCIONES:
+            nombre = getattr(funcion, "id", None) or ast.unparse(funcion)
+            self._error(f"Función no permitida: '{nombre}'", nodo)
+        nodo.func = funcion
+        nodo.args = [self.visit(argumento) for argumento in nodo.args]
+        self.funciones.add(funcion.id)
+        return nodo
+
+    def visit_Name(self, nodo):
+        if nodo.id in FUNCIONES:
+            self._error(f"'{nodo.id}' es una función: falta llamarla, p. ej. {nodo.id}(X)", nodo)
+        if nodo.id not in self.variables and nodo.id not in CONSTANTES:
+            self._error(f"Nombre no permitido: '{nodo.id}'", nodo)
+        return nodo
+
+    def visit_BinOp(self, nodo):
+        self.generic_visit(nodo)
+        if isinstance(nodo.op, ast.Pow):
+            exponente = _valor_constante(nodo.right)
+            if exponente is not None and not abs(exponente) <= MAX_EXPONENTE:
+                self._error(f"Exponente demasiado grande (máximo {MAX_EXPONENTE})", nodo.right)
+        return nodo
+
+    def visit_Constant(self, nodo):
+        if not isinstance(nodo.value, (int, float)) or isinstance(nodo.value, bool):
+            self._error(f"Solo se permiten constantes numéricas, no {nodo.value!r}", nodo)
+        try:
+            valor = float(nodo.value)
+        except OverflowError:
+            self._error("Número demasiado grande", nodo)
+        return ast.copy_location(ast.Constant(value=valor), nodo)
+
+    def generic_visit(self, nodo):
+        if not isinstance(nodo, _NODOS):
+            self._error(f"Construcción no permitida: {type(nodo).__name__}", nodo)
+        return super().generic_visit(nodo)
+
+
+class Expresion:
+    """
+    Expresión validada y compilada. ``expresion(**valores)`` evalúa con
+    arrays para cada variable y devuelve un array con su forma común.
+    """
+
+    def __init__(self, texto, variables):
+        self.texto = texto
+        self.variables = tuple(variables)
+        try:
+            arbol = ast.parse(texto, mode="eval")
+        except SyntaxError as error:
+            raise ErrorExpresion(f"Sintaxis inválida: {error.msg}", texto, error.offset or None) from None
+        validador = _Validador(texto, variables)
+        arbol = ast.fix_missing_locations(validador.visit(arbol))
+        self.normalizada = ast.unparse(arbol)
+        self.usa = validador.funciones
+        self.numexpr = (numexpr is not None and self.usa <= FUNCIONES_NUMEXPR
+                        and "//" not in self.normalizada)
+        self._codigo = compile(arbol, "<expresion>", "eval")
+
+    def __call__(self, **valores):
+        arrays = {k: np.asarray(v, dtype=float) for k, v in valores.items()}
+        forma = np.broadcast_shapes(*(a.shape for a in arrays.values())) if arrays else ()
+        try:
+            with np.errstate(all="ignore"):
+                if self.numexpr and int(np.prod(forma)) >= UMBRAL_NUMEXPR:
+                    resultado = numexpr.evaluate(self.normalizada, local_dict=arrays,
+                                                 global_dict=CONSTANTES)
+                else:
+                    resultado = eval(self._codigo, {"__builtins__": {}},
+                                     {**FUNCIONES, **CONSTANTES, **arrays})
+        except ErrorExpresion:
+            raise
+        except Exception as error:
+            raise ErrorExpresion(f"No se pudo evaluar: {error}", self.texto) from None
+        resultado = np.asarray(resultado, dtype=float)
+        return np.broadcast_to(resultado, forma) if resultado.shape != forma else resultado
+
+
+@lru_cache(maxsize=256)
+def compilar_expresion(texto, variables=("X", "Y")):
+    """Expresion compilada para ``texto``; cada texto distinto se analiza una sola vez."""
+    if not isinstance(texto, str) or not texto.strip():
+        raise ErrorExpresion("La expresión está vacía", texto or "")
+    return Expresion(texto.strip(), variables)
+
+
+def evaluar_expresion(texto, **valores):
+    """Atajo: compila (o reutiliza) ``texto`` y lo evalúa con ``valores``."""
+    return compilar_expresion(texto, tuple(sorted(valores)))(**valores)
@@ -0,0 +1,322 @@
+import warnings
+
+import numpy as np
+import plotly.graph_objects as go
+
+# ===============================================================
+# Nulclinas y equilibrios de campos 2D
+# ---------------------------------------------------------------
+# Todo se calcula en bloque sobre una malla fina:
+#   * nulclinas: contornos de nivel 0 de fx y fy con marching squares
+#     (las 16 configuraciones de celda se resuelven con máscaras, no con
+#     un bucle por celda);
+#   * equilibrios: Newton vectorizado que arranca en las celdas donde
+#     fx y fy cambian de signo a la vez;
+#   * clasificación: traza y determinante del jacobiano numérico;
+#   * capas de fondo |F|, divergencia y rotacional con np.gradient.
+# ===============================================================
+
+RESOLUCION = 500
+ITERACIONES_NEWTON = 30
+
+# Aristas de una celda: 0 abajo, 1 derecha, 2 arriba, 3 izquierda.
+# Bits de las esquinas (valor > 0): 1 abajo-izq, 2 abajo-der, 4 arriba-der, 8 arriba-izq.
+_SEGMENTOS = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 6: [(0, 2)], 7: [(2, 3)],
+    8: [(2, 3)], 9: [(0, 2)], 11: [(1, 2)], 12: [(3, 1)], 13: [(0, 1)], 14: [(3, 0)],
+}
+# Casos ambiguos (esquinas opuestas con el mismo signo): según el signo del centro
+_AMBIGUOS = {
+    5: {True: [(0, 1), (2, 3)], False: [(3, 0), (1, 2)]},
+    10: {True: [(3, 0), (1, 2)], False: [(0, 1), (2, 3)]},
+}
+
+
+def malla_fina(xmax, ymax, resolucion=RESOLUCION):
+    x = np.linspace(-xmax, xmax, resolucion)
+    y = np.linspace(-ymax, ymax, resolucion)
+    return x, y
+
+
+def _cruce(a, b):
+    """Fracción del camino de a a b donde la interpolación lineal vale 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return a / (a - b)
+
+
+def casos_celdas(F):
+    """Índice de marching squares (0..15) de cada celda; -1 si hay valores no finitos."""
+    positivo = F > 0
+    caso = (positivo[:-1, :-1] * 1 + positivo[:-1, 1:] * 2
+            + positivo[1:, 1:] * 4 + positivo[1:, :-1] * 8)
+    finito = np.isfinite(F)
+    validas = finito[:-1, :-1] & finito[:-1, 1:] & finito[1:, 1:] & finito[1:, :-1]
+    return np.where(validas, caso, -1)
+
+
+def contorno_cero(x, y, F, funcion=None):
+    """
+    Segmentos de la curva F = 0 (F con forma (len(y), len(x))) por marching
+    squares. Devuelve (xs, ys) con tres puntos por segmento (el tercero NaN),
+    listos para una sola traza.
+
+    Con ``funcion(X, Y)`` se comprueba cada segmento en su punto medio y se
+    descartan los cambios de signo que son polos (p. ej. 1/X en X = 0).
+    """
+    caso = casos_celdas(F)
+    i, j = np.indices(caso.shape)
+    x0, x1 = x[j], x[j + 1]
+    y0, y1 = y[i], y[i + 1]
+    fa, fb, fc, fd = F[:-1, :-1], F[:-1, 1:], F[1:, 1:], F[1:, :-1]
+
+    # Punto de cruce en cada arista (solo se usa donde hay cambio de signo)
+    ta, tb, tc, td = _cruce(fa, fb), _cruce(fb, fc), _cruce(fd, fc), _cruce(fa, fd)
+    aristas = (
+        (x0 + ta * (x1 - x0), y0),
+        (x1, y0 + tb * (y1 - y0)),
+        (x0 + tc * (x1 - x0), y1),
+        (x0, y0 + td * (y1 - y0)),
+    )
+    centro_positivo = (fa + fb + fc + fd) > 0
+    cota = np.maximum.reduce([np.abs(fa), np.abs(fb), np.abs(fc), np.abs(fd)])
+
+    trozos_x, trozos_y = [], []
+
+    def agregar(mascara, pares):
+        for e1, e2 in pares:
+            (ax, ay), (bx, by) = aristas[e1], aristas[e2]
+            ax = np.broadcast_to(ax, caso.shape)[mascara]
+            ay = np.broadcast_to(ay, caso.shape)[mascara]
+            bx = np.broadcast_to(bx, caso.shape)[mascara]
+            by = np.broadcast_to(by, caso.shape)[mascara]
+            if funcion is not None:
+                with np.errstate(all="ignore"):
+                    medio = np.abs(funcion((ax + bx) / 2, (ay + by) / 2))
+                cero = medio <= 0.5 * cota[mascara]
+                ax, ay, bx, by = ax[cero], ay[cero], bx[cero], by[cero]
+            hueco = np.full_like(ax, np.nan)
+            trozos_x.append(np.column_stack([ax, bx, hueco]).ravel())
+            trozos_y.append(np.column_stack([ay, by, hueco]).ravel())
+
+    for c, pares in _SEGMENTOS.items():
+        mascara = caso == c
+        if mascara.any():
+            agregar(mascara, pares)
+    for c, opciones in _AMBIGUOS.items():
+        for centro, pares in opciones.items():
+            mascara = (caso == c) & (centro_positivo == centro)
+            if mascara.any():
+                agregar(mascara, pares)
+
+    if not trozos_x:
+        return np.array([]), np.array([])
+    return np.concatenate(trozos_x), np.concatenate(trozos_y)
+
+
+def _evaluar(campo, x, y):
+    u, v = campo(x, y)
+    return (np.broadcast_to(np.asarray(u, dtype=float), np.shape(x)),
+            np.broadcast_to(np.asarray(v, dtype=float), np.shape(x)))
+
+
+def jacobiano_numerico(campo, x, y, h):
+    """Jacobiano por diferencias centrales en cada punto; devuelve (a, b, c, d) = [[a, b], [c, d]]."""
+    up, vp = _evaluar(campo, x + h, y)
+    um, vm = _evaluar(campo, x - h, y)
+    a, c = (up - um) / (2 * h), (vp - vm) / (2 * h)
+    up, vp = _evaluar(campo, x, y + h)
+    um, vm = _evaluar(campo, x, y - h)
+    b, d = (up - um) / (2 * h), (vp - vm) / (2 * h)
+    return a, b, c, d
+
+
+def newton_vectorizado(campo, x, y, h, iteraciones=ITERACIONES_NEWTON, tol=1e-10):
+    """
+    Newton para campo = 0 desde todas las semillas (x, y) a la vez.
+    Devuelve (x, y, convergio).
+    """
+    x, y = np.array(x, dtype=float), np.array(y, dtype=float)
+    with np.errstate(all="ignore"):
+        for _ in range(iteraciones):
+            u, v = _evaluar(campo, x, y)
+            a, b, c, d = jacobiano_numerico(campo, x, y, h)
+            det = a * d - b * c
+            dx = (d * u - b * v) / det
+            dy = (a * v - c * u) / det
+            x, y = x - dx, y - dy
+            if np.all(~np.isfinite(dx) | (np.hypot(dx, dy) < tol)):
+                break
+        u, v = _evaluar(campo, x, y)
+    escala = max(float(np.nanmax(np.abs(np.concatenate([x, y])), initial=1.0)), 1.0)
+    convergio = np.isfinite(x) & np.isfinite(y) & (np.hypot(u, v) < 1e-8 * escala)
+    return x, y, convergio
+
+
+def clasificar(a, b, c, d, tol=1e-7):
+    """Tipo de equilibrio a partir de la traza y el determinante del jacobiano."""
+    traza = a + d
+    det = a * d - b * c
+    discriminante = traza ** 2 - 4 * det
+    tipo = np.full(np.shape(traza), "no hiperbólico", dtype=object)
+    tipo[det < -tol] = "silla"
+    estable = np.where(traza < 0, "estable", "inestable")
+    nodo = (det > tol) & (discriminante >= 0)
+    foco = (det > tol) & (discriminante < 0)
+    tipo[nodo] = "nodo " + estable[nodo]
+    tipo[foco] = "foco " + estable[foco]
+    tipo[foco & (np.abs(traza) <= tol)] = "centro"
+    return tipo
+
+
+def equilibrios(campo, x, y, U, V):
+    """
+    Equilibrios dentro de la ventana de la malla (x, y) con valores U, V.
+    Las semillas de Newton son los centros de las celdas donde U y V
+    cambian de signo; los puntos repetidos se funden a la resolución de
+    la malla. Devuelve una lista de dicts {"x", "y", "tipo", "autovalores"}.
+    """
+    cambia_u = ~np.isin(casos_celdas(U), (-1, 0, 15))
+    cambia_v = ~np.isin(casos_celdas(V), (-1, 0, 15))
+    i, j = np.nonzero(cambia_u & cambia_v)
+    if i.size == 0:
+        return []
+
+    dx, dy = x[1] - x[0], y[1] - y[0]
+    h = 1e-6 * max(abs(x[-1]), abs(y[-1]), 1.0)
+    px, py, ok = newton_vectorizado(campo, x[j] + dx / 2, y[i] + dy / 2, h)
+    dentro = ok & (px >= x[0]) & (px <= x[-1]) & (py >= y[0]) & (py <= y[-1])
+    px, py = px[dentro], py[dentro]
+    if px.size == 0:
+        return []
+
+    # Fundir raíces a media celda de distancia
+    claves = np.column_stack([np.round(px / (dx / 2)), np.round(py / (dy / 2))])
+    _, unicos = np.unique(claves, axis=0, return_index=True)
+    px, py = px[unicos], py[unicos]
+
+    a, b, c, d = jacobiano_numerico(campo, px, py, h)
+    tipos = clasificar(a, b, c, d)
+    matrices = np.stack([np.stack([a, b], -1), np.stack([c, d], -1)], -2)
+    autovalores = np.linalg.eigvals(matrices)
+    return [
+        {"x": float(px[k]), "y": float(py[k]), "tipo": tipos[k], "autovalores": autovalores[k]}
+        for k in range(px.size)
+    ]
+
+
+def analizar_campo(campo, xmax, ymax, resolucion=RESOLUCION):
+    """Nulclinas y equilibrios de ``campo`` en [-xmax, xmax]×[-ymax, ymax]."""
+    x, y = malla_fina(xmax, ymax, resolucion)
+    X, Y = np.meshgrid(x, y)
+    with np.errstate(all="ignore"):
+        U, V = _evaluar(campo, X, Y)
+    return {
+        "nulclina_x": contorno_cero(x, y, U, lambda a, b: _evaluar(campo, a, b)[0]),
+        "nulclina_y": contorno_cero(x, y, V, lambda a, b: _evaluar(campo, a, b)[1]),
+        "equilibrios": equilibrios(campo, x, y, U, V),
+    }
+
+
+COLORES_EQUILIBRIO = {
+    "silla": "orange",
+    "nodo estable": "green",
+    "foco estable": "green",
+    "nodo inestable": "red",
+    "foco inestable": "red",
+    "centro": "purple",
+    "no hiperbólico": "gray",
+}
+
+
+def trazas_analisis(analisis):
+    """Dos trazas de nulclinas (fx = 0, fy = 0) y una de equilibrios."""
+    trazas = []
+    for clave, nombre, color in (("nulclina_x", "dx/dt = 0", "darkorange"),
+                                 ("nulclina_y", "dy/dt = 0", "darkviolet")):
+        xs, ys = analisis[clave]
+        trazas.append(go.Scattergl(
+            x=xs.astype(np.float32), y=ys.astype(np.float32), mode="lines",
+            line=dict(color=color, width=2), name=nombre, hoverinfo="skip",
+        ))
+    puntos = analisis["equilibrios"]
+    trazas.append(go.Scatter(
+        x=[p["x"] for p in puntos],
+        y=[p["y"] for p in puntos],
+        mode="markers",
+        name="Equilibrios",
+        marker=dict(size=11, color=[COLORES_EQUILIBRIO[p["tipo"]] for p in puntos],
+                    line=dict(color="black", width=1)),
+        customdata=[p["tipo"] for p in puntos],
+        hovertemplate="(%{x:.3f}, %{y:.3f})<br>%{customdata}<extra></extra>",
+    ))
+    return trazas
+
+
+# ---------------------------------------------------------------
+# Capas escalares: |F|, divergencia y rotacional
+# ---------------------------------------------------------------
+RESOLUCION_CAPA = 1000
+MAX_CELDAS_CAPA = 500      # por eje, lo que viaja al navegador
+CAPAS = {
+    "magnitud": {"titulo": "|F|", "colores": "Viridis", "simetrica": False},
+    "divergencia": {"titulo": "div F", "colores": "RdBu_r", "simetrica": True},
+    "rotacional": {"titulo": "rot F", "colores": "PiYG", "simetrica": True},
+}
+
+
+def campo_escalar(campo, xmax, ymax, capa, resolucion=RESOLUCION_CAPA):
+    """
+    Evalúa ``campo`` en una malla resolucion×resolucion y devuelve
+    (x, y, Z) con Z = |F|, ∂u/∂x + ∂v/∂y o ∂v/∂x − ∂u/∂y, derivadas con
+    ``np.gradient`` (diferencias centrales en el interior).
+    """
+    x, y = malla_fina(xmax, ymax, resolucion)
+    X, Y = np.meshgrid(x, y)
+    with np.errstate(all="ignore"):
+        U, V = _evaluar(campo, X, Y)
+        if capa == "magnitud":
+            Z = np.hypot(U, V)
+        elif capa == "divergencia":
+            Z = np.gradient(U, x, axis=1) + np.gradient(V, y, axis=0)
+        elif capa == "rotacional":
+            Z = np.gradient(V, x, axis=1) - np.gradient(U, y, axis=0)
+        else:
+            raise ValueError(f"Capa desconocida: {capa!r}")
+    return x, y, Z
+
+
+def reducir_malla(x, y, Z, max_celdas=MAX_CELDAS_CAPA):
+    """Promedia bloques k×k para que Z no pase de ``max_celdas`` por eje (ignora NaN)."""
+    k = int(np.ceil(max(Z.shape) / max_celdas))
+    if k <= 1:
+        return x, y, Z
+    ny, nx = (Z.shape[0] // k) * k, (Z.shape[1] // k) * k
+    bloques = Z[:ny, :nx].reshape(ny // k, k, nx // k, k)
+    with warnings.catch_warnings():
+        # Bloques enteramente NaN (p. ej. sobre un polo) quedan NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        Z = np.nanmean(bloques, axis=(1, 3))
+    return x[:nx].reshape(-1, k).mean(axis=1), y[:ny].reshape(-1, k).mean(axis=1), Z
+
+
+def traza_capa(x, y, Z, capa, percentil=98):
+    """
+    ``go.Heatmap`` de la capa; la escala de color se recorta al percentil
+    ``percentil`` de |Z| para que un polo no la aplaste. Divergencia y
+    rotacional usan una escala simétrica centrada en 0.
+    """
+    spec = CAPAS[capa]
+    finitos = np.abs(Z[np.isfinite(Z)])
+    tope = float(np.percentile(finitos, percentil)) if finitos.size else 1.0
+    tope = tope if tope > 0 else 1.0
+    rango = dict(zmin=-tope, zmax=tope) if spec["simetrica"] else dict(zmin=0, zmax=tope)
+    return go.Heatmap(
+        x=x.astype(np.float32),
+        y=y.astype(np.float32),
+        z=np.where(np.isfinite(Z), Z, np.nan).astype(np.float32),
+        colorscale=spec["colores"],
+        colorbar=dict(title=dict(text=spec["titulo"]), thickness=12),
+        hovertemplate="(%{x:.2f}, %{y:.2f})<br>" + spec["titulo"] + " = %{z:.3g}<extra></extra>",
+        opacity=0.75,
+        **rango,
+    )
@@ -0,0 +1,263 @@
+import base64
+import hashlib
+
+from dash import Patch, dcc
+import numpy as np
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+# ===============================================================
+# Actualizaciones parciales de figuras
+# ---------------------------------------------------------------
+# Tras el primer dibujo solo viaja lo que cambia entre simulaciones: x/y de
+# cada traza (más nombre y customdata) y unas pocas claves del layout
+# (uirevision, líneas y anotaciones como la de K), mediante dash.Patch. El
+# resto (tipo y estilo de las trazas, ejes, títulos, plantilla) se resume en
+# una firma que se guarda en un dcc.Store junto a la gráfica. Si la firma
+# cambia, p. ej. porque cambió el número de curvas, se envía la figura
+# completa. El Store guarda también los bytes enviados en cada actualización.
+# ===============================================================
+
+CAMPOS_TRAZA = ("x", "y", "name", "customdata")
+CLAVES_LAYOUT = ("uirevision", "shapes", "annotations")
+
+
+def id_firma(id_grafica):
+    return f"firma-{id_grafica}"
+
+
+def store_firma(id_grafica):
+    """dcc.Store que acompaña a ``id_grafica`` con la firma de su última figura."""
+    return dcc.Store(id=id_firma(id_grafica))
+
+
+def separar_figura(figura, claves_layout=CLAVES_LAYOUT):
+    """
+    Divide la figura (go.Figure o dict) en (estructura, variable). La
+    estructura anota qué campos variables tiene cada traza, así que si uno
+    aparece o desaparece la firma cambia y no hace falta borrar nada.
+    """
+    figura = figura.to_plotly_json() if hasattr(figura, "to_plotly_json") else figura
+    trazas = figura.get("data", [])
+    layout = figura.get("layout", {})
+    estructura = {
+        "data": [
+            {**{k: v for k, v in traza.items() if k not in CAMPOS_TRAZA},
+             "_campos": [k for k in CAMPOS_TRAZA if k in traza]}
+            for traza in trazas
+        ],
+        "layout": {k: v for k, v in layout.items() if k not in claves_layout},
+        "_claves_layout": [k for k in claves_layout if k in layout],
+        "frames": figura.get("frames", []),
+    }
+    variable = {
+        "data": [{k: traza[k] for k in CAMPOS_TRAZA if k in traza} for traza in trazas],
+        "layout": {k: layout[k] for k in claves_layout if k in layout},
+    }
+    return estructura, variable
+
+
+def actualizar_figura(figura, estado, claves_layout=CLAVES_LAYOUT):
+    """
+    Devuelve (salida, estado) para un callback con Output(grafica, "figure")
+    y Output(store_firma, "data"). ``estado`` es lo que había en el Store:
+    si su firma coincide con la de ``figura`` la salida es un Patch con los
+    datos nuevos; si no (o en el primer dibujo), la figura completa.
+    """
+    estructura, variable = separar_figura(figura, claves_layout)
+    texto = to_json_plotly(estructura)
+    firma = hashlib.sha1(texto.encode()).hexdigest()
+    bytes_figura = len(texto) + len(to_json_plotly(variable))
+
+    if not estado or estado.get("firma") != firma:
+        return figura, {"firma": firma, "parcial": False,
+                        "bytes_figura": bytes_figura, "bytes_enviados": bytes_figura}
+
+    parche = Patch()
+    for i, traza in enumerate(variable["data"]):
+        for clave, valor in traza.items():
+            parche["data"][i][clave] = valor
+    for clave, valor in variable["layout"].items():
+        parche["layout"][clave] = valor
+    bytes_parche = len(to_json_plotly(parche.to_plotly_json()))
+    return parche, {"firma": firma, "parcial": True,
+                    "bytes_figura": bytes_figura, "bytes_enviados": bytes_parche}
+
+
+def formato_bytes(n):
+    return f"{n / 1024:.1f} kB" if n >= 1024 else f"{n} B"
+
+
+def resumen_envio(estados):
+    """Texto con lo enviado frente a la figura completa para una o varias gráficas."""
+    if isinstance(estados, dict):
+        estados = [estados]
+    estados = [e for e in estados if e]
+    if not estados:
+        return ""
+    total = sum(e["bytes_figura"] for e in estados)
+    enviados = sum(e["bytes_enviados"] for e in estados)
+    parciales = sum(e["parcial"] for e in estados)
+    if not parciales:
+        return f"Figura completa enviada ({formato_bytes(enviados)})."
+    return (f"Actualización parcial de {parciales}/{len(estados)} gráficas: "
+            f"{formato_bytes(enviados)} enviados de {formato_bytes(total)} "
+            f"(ahorro de {formato_bytes(total - enviados)}, {100 * (1 - enviados / total):.0f} %).")
+
+
+# ===============================================================
+# Fábrica de figuras sin validación
+# ---------------------------------------------------------------
+# Construir go.Figure y llamar a update_layout/update_xaxes en cada callback
+# valida cada propiedad (y copia la plantilla) una y otra vez, aunque el
+# estilo de la página nunca cambie. Cada estilo se valida una sola vez al
+# registrarlo, con go.Layout, y queda como dict plano con la plantilla ya
+# resuelta. En el camino caliente las figuras son dicts: trazas planas más
+# el layout base fusionado con lo que cambia (título, uirevision...).
+# Las trazas no se validan, así que un nombre de propiedad mal escrito solo
+# se nota en el navegador.
+# ===============================================================
+
+# Ejes con rejilla rosa (gráficas del logístico y del artículo)
+EJES_ROSA = dict(
+    showgrid=True, gridwidth=1, gridcolor="lightpink",
+    zeroline=True, zerolinewidth=2, zerolinecolor="red",
+    showline=True, linecolor="black", linewidth=2, mirror=True,
+)
+# Ejes de las páginas SIR/SEIR: misma rejilla, cero en negro y sin marco
+EJES_SIR = dict(
+    showgrid=True, gridwidth=1, gridcolor="lightpink",
+    zeroline=True, zerolinewidth=2, zerolinecolor="black",
+)
+
+ESTILOS = {}
+
+
+def registrar_estilo(nombre, **layout):
+    """
+    Valida ``layout`` (mismos argumentos que go.Layout) y lo guarda como
+    layout base del estilo ``nombre``, con la plantilla por defecto incluida.
+    """
+    ESTILOS[nombre] = go.Figure(layout=go.Layout(**layout)).to_plotly_json()["layout"]
+    return ESTILOS[nombre]
+
+
+def _fusionar(base, cambios):
+    """Copia de ``base`` con ``cambios`` encima; solo se copian las ramas que cambian."""
+    resultado = dict(base)
+    for clave, valor in cambios.items():
+        if isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            resultado[clave] = _fusionar(resultado[clave], valor)
+        else:
+            resultado[clave] = valor
+    return resultado
+
+
+def arreglo(valores):
+    """
+    Arrays numéricos 1D de NumPy como typed array de Plotly (base64), igual
+    que hace go.Scatter; los de texto, fechas o varias columnas pasan a
+    lista y las listas se dejan como están.
+    """
+    if not isinstance(valores, np.ndarray):
+        return valores
+    if valores.dtype.kind not in "biuf" or valores.ndim != 1:
+        return valores.tolist()
+    datos = np.ascontiguousarray(valores, dtype="<f8")
+    return {"dtype": "f8", "bdata": base64.b64encode(datos.tobytes()).decode("ascii")}
+
+
+def traza(x, y, nombre=None, tipo="scatter", **propiedades):
+    """Traza plana (sin validar) con x/y codificados como typed arrays."""
+    resultado = {"type": tipo, "x": arreglo(x), "y": arreglo(y), **propiedades}
+    if nombre is not None:
+        resultado["name"] = nombre
+    if "customdata" in resultado:
+        resultado["customdata"] = arreglo(resultado["customdata"])
+    return resultado
+
+
+def linea(x, y, nombre=None, color=None, ancho=2, **propiedades):
+    """Atajo para ``traza`` en modo líneas con color y ancho (None para omitirlos)."""
+    estilo_linea = {k: v for k, v in (("color", color), ("width", ancho)) if v is not None}
+    return traza(x, y, nombre, mode="lines",
+                 line={**estilo_linea, **propiedades.pop("line", {})}, **propiedades)
+
+
+def figura_rapida(trazas, estilo, **cambios):
+    """
+    Figura como dict: ``trazas`` planas sobre el layout base de ``estilo``
+    con ``cambios`` (dicts anidados, sin guiones bajos mágicos) encima. El
+    layout base se comparte entre figuras: no modificar el resultado en
+    sitio, pasar los cambios aquí.
+    """
+    return {"data": list(trazas), "layout": _fusionar(ESTILOS[estilo], cambios)}
+
+
+registrar_estilo("simple")
+# Páginas SIR y SEIR (clase 3 y tarea 3)
+registrar_estilo(
+    "sir",
+    title=dict(x=0.5, font=dict(size=16, color="darkblue")),
+    xaxis=dict(title="Tiempo (días)", **EJES_SIR),
+    yaxis=dict(title="Número de personas", **EJES_SIR),
+    paper_bgcolor="lightgray",
+    plot_bgcolor="white",
+    font=dict(family="Outfit", size=12),
+    legend=dict(orientation="h", yanchor="bottom", xanchor="right", y=1.02, x=0.5),
+    margin=dict(l=40, r=40, t=60, b=40),
+)
+
+
+if __name__ == "__main__":
+    # Comparativa: la figura de E(t) del artículo (3 curvas) construida como
+    # antes (go.Figure + update_*) y con la fábrica, incluyendo la
+    # serialización JSON que hace Dash al responder.
+    import json
+    import timeit
+
+    t = np.linspace(0, 60, 400)
+    curvas = [np.sin(t / k) * 1e4 for k in (3.0, 7.0, 14.0)]
+    colores = ["magenta", "black", "blue"]
+    plantilla = "t: %{x:.2f}<br>E(t): %{y:.2f}<extra></extra>"
+    titulo = dict(text="<b>Fig. 6</b>", font=dict(size=18, color="red"), x=0.5, y=0.93)
+    comun = dict(
+        margin=dict(l=40, r=40, t=50, b=40), paper_bgcolor="#b1b1f1", plot_bgcolor="white",
+        font=dict(family="Outfit", size=11, color="black"),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+    )
+
+    def con_go_figure():
+        fig = go.Figure(data=[
+            go.Scatter(x=t, y=c, mode="lines", line=dict(width=2, color=color),
+                       name=f"β = {k}", hovertemplate=plantilla)
+            for k, (c, color) in enumerate(zip(curvas, colores))
+        ])
+        fig.update_layout(title=titulo, xaxis_title="Time (day)", yaxis_title="Exposed E(t)",
+                          uirevision=60, **comun)
+        fig.update_xaxes(**EJES_ROSA)
+        fig.update_yaxes(**EJES_ROSA)
+        return fig
+
+    registrar_estilo("comparativa", title=titulo, xaxis=EJES_ROSA, yaxis=EJES_ROSA, **comun)
+
+    def con_fabrica():
+        return figura_rapida(
+            [linea(t, c, f"β = {k}", color, hovertemplate=plantilla)
+             for k, (c, color) in enumerate(zip(curvas, colores))],
+            "comparativa",
+            xaxis={"title": {"text": "Time (day)"}}, yaxis={"title": {"text": "Exposed E(t)"}},
+            uirevision=60,
+        )
+
+    def normalizada(figura):
+        return json.dumps(json.loads(go.Figure(figura).to_json()), sort_keys=True)
+
+    assert normalizada(con_go_figure()) == normalizada(con_fabrica()), "las figuras difieren"
+
+    for nombre, construir in (("go.Figure + update_*", con_go_figure),
+                              ("fábrica de dicts", con_fabrica)):
+        n = 200
+        solo = min(timeit.repeat(construir, number=n, repeat=5)) / n
+        total = min(timeit.repeat(lambda: to_json_plotly(construir()), number=n, repeat=5)) / n
+        print(f"{nombre:22s} construir {solo * 1e3:7.3f} ms   construir + JSON {total * 1e3:7.3f} ms")
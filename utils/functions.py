@@ -1,46 +1,118 @@
+import dash
+from dash import Input, Output, State
 import numpy as np
-import plotly.graph_objects as go
 
-def build_logistic_figure(P0: float, r: float, K: float, t_max: float, npoints: int = 200) -> go.Figure:
-    """Devuelve la figura del modelo logístico con línea horizontal en K."""
+from utils.figuras import EJES_ROSA, registrar_estilo, figura_rapida, traza, linea
+
+# Estilo de las gráficas del logístico: validado una vez al importar
+registrar_estilo(
+    "logistico",
+    title="Modelo mejorado",
+    xaxis=dict(title="t", **EJES_ROSA),
+    yaxis=dict(title="P(t)", **EJES_ROSA),
+    margin=dict(l=40, r=20, t=40, b=40),
+)
+
+
+def build_logistic_figure(P0: float, r: float, K: float, t_max: float, npoints: int = 200) -> dict:
+    """Devuelve la figura (dict) del modelo logístico con línea horizontal en K."""
     # Tiempo
     t = np.linspace(0, float(t_max), int(npoints))
 
     # Modelo logístico
     P = (P0 * K * np.exp(r * t)) / ((K - P0) + P0 * np.exp(r * t))
 
-    # Trace población
-    trace_poblacion = go.Scatter(
-        x=t, y=P, mode='lines+markers', name='P(t)',
-        line=dict(color='black', width=2),
-        marker=dict(size=6, color='blue', symbol='circle'),
-        hovertemplate='t: %{x:.2f}<br>P(t): %{y:.2f}<extra></extra>'
-    )
+    return figura_rapida([
+        # Trace población
+        traza(t, P, "P(t)", mode='lines+markers',
+              line=dict(color='black', width=2),
+              marker=dict(size=6, color='blue', symbol='circle'),
+              hovertemplate='t: %{x:.2f}<br>P(t): %{y:.2f}<extra></extra>'),
+        # Trace capacidad de carga
+        linea([0, t_max], [K, K], "K", 'red', line=dict(dash='dot'),
+              hovertemplate='K: %{y:.2f}<extra></extra>'),
+    ], "logistico")
 
-    # Trace capacidad de carga
-    trace_capacidad = go.Scatter(
-        x=[0, t_max], y=[K, K], mode='lines', name='K',
-        line=dict(color='red', width=2, dash='dot'),
-        hovertemplate='K: %{y:.2f}<extra></extra>'
-    )
 
-    fig = go.Figure(data=[trace_poblacion, trace_capacidad])
-    fig.update_layout(
-        title="Modelo mejorado",
-        xaxis_title="t",
-        yaxis_title="P(t)",
-        margin=dict(l=40, r=20, t=40, b=40)
-    )
+# ===============================================================
+# Curva logística evaluada en el navegador
+# ---------------------------------------------------------------
+# P(t) = K / (1 + ((K - P0)/P0) e^{-rt}) tiene forma cerrada, así que no
+# hace falta ir al servidor: los callbacks de cliente calculan la curva
+# en JavaScript y devuelven un Patch que solo toca los datos de las
+# trazas (y la línea de K). La figura completa se construye una vez en
+# Python, al crear el layout.
+# ===============================================================
+_JS_LOGISTICA = """
+    function logistica(P0, r, K, tmax, n) {
+        var t = new Array(n), P = new Array(n);
+        for (var i = 0; i < n; i++) {
+            t[i] = n > 1 ? tmax * i / (n - 1) : 0;
+            P[i] = (P0 <= 0 || K <= 0) ? 0 : K / (1 + ((K - P0) / P0) * Math.exp(-r * t[i]));
+        }
+        return [t, P];
+    }
+    function g(x) { return String(parseFloat(Number(x).toPrecision(6))); }
+"""
+
+
+def registrar_logistica_interactiva(id_grafica, id_info, ids_entradas):
+    """
+    Callback de cliente para la gráfica con línea ``add_hline`` de K: se
+    dispara con cada cambio de (P0, r, K, tmax, npoints) y parchea la traza
+    0, la línea de K y su anotación, más el texto de ``id_info``.
+    """
+    dash.clientside_callback(
+        "function(P0, r, K, tmax, npoints) {" + _JS_LOGISTICA + """
+            P0 = P0 == null ? 0 : P0;
+            r = r == null ? 0 : r;
+            K = K == null ? 1 : K;
+            tmax = tmax == null ? 100 : tmax;
+            npoints = npoints == null ? 200 : npoints;
 
-    fig.update_xaxes(
-    showgrid=True, gridwidth=1, gridcolor='lightpink',
-    zeroline=True, zerolinewidth=2, zerolinecolor='red',
-    showline=True, linecolor='black', linewidth=2, mirror=True,
+            var curva = logistica(P0, r, K, Math.max(tmax, 1), Math.max(Math.round(npoints), 10));
+            var parche = new dash_clientside.Patch()
+                .assign(["data", 0, "x"], curva[0])
+                .assign(["data", 0, "y"], curva[1])
+                .assign(["layout", "shapes", 0, "y0"], K)
+                .assign(["layout", "shapes", 0, "y1"], K)
+                .assign(["layout", "annotations", 0, "y"], K)
+                .build();
+            var info = "Modelo: dP/dt = r·P·(1 - P/K).  " +
+                "Solución: P(t) = K / (1 + ((K - P₀)/P₀) e^(-r t)).  " +
+                "Usando P₀=" + g(P0) + ", r=" + g(r) + ", K=" + g(K) +
+                ", t_max=" + g(tmax) + ", puntos=" + npoints + ".";
+            return [parche, info];
+        }""",
+        Output(id_grafica, "figure"),
+        Output(id_info, "children"),
+        *[Input(id_entrada, "value") for id_entrada in ids_entradas],
     )
 
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor='lightpink',
-        zeroline=True, zerolinewidth=2, zerolinecolor='red',
-        showline=True, linecolor='black', linewidth=2, mirror=True,
+
+def registrar_logistica_boton(id_grafica, id_boton, ids_entradas, npoints=20):
+    """
+    Callback de cliente para las gráficas de ``build_logistic_figure``
+    (traza P(t) + traza de K): al pulsar ``id_boton`` parchea x/y de ambas.
+    Con algún campo vacío dibuja el mismo marcador que el servidor
+    (P0=0, r=0, K=1, t=1).
+    """
+    dash.clientside_callback(
+        "function(n_clicks, P0, r, K, tmax) {" + _JS_LOGISTICA + """
+            if (P0 == null || r == null || K == null || tmax == null) {
+                P0 = 0; r = 0; K = 1; tmax = 1;
+            }
+            var curva = logistica(P0, r, K, tmax, %d);
+            return new dash_clientside.Patch()
+                .assign(["data", 0, "x"], curva[0])
+                .assign(["data", 0, "y"], curva[1])
+                .assign(["data", 1, "x"], [0, tmax])
+                .assign(["data", 1, "y"], [K, K])
+                .build();
+        }""" % int(npoints),
+        Output(id_grafica, "figure"),
+        Input(id_boton, "n_clicks"),
+        *[State(id_entrada, "value") for id_entrada in ids_entradas],
+        prevent_initial_call=True,
     )
-    return fig
+
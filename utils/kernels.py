@@ -0,0 +1,288 @@
+import os
+
+import numpy as np
+
+# ===============================================================
+# Núcleos compilados (numba) de los modelos compartimentales
+# ---------------------------------------------------------------
+# Con numba instalado, los lados derechos se compilan a código máquina y
+# un bucle Dormand-Prince 5(4) también compilado integra el lote entero
+# sin volver al intérprete en cada paso. Los binarios se guardan en
+# __pycache__ (cache=True), así que los procesos del pool los cargan de
+# disco en lugar de recompilar. Sin numba (o con SIMULACIONES_JIT=0) el
+# motor sigue usando las funciones NumPy de utils.modelos y solve_ivp.
+# ===============================================================
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:
+    NUMBA_DISPONIBLE = False
+
+    def njit(*args, **kwargs):
+        """Sustituto sin numba: devuelve la función tal cual."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda funcion: funcion
+
+JIT_ACTIVO = NUMBA_DISPONIBLE and os.environ.get("SIMULACIONES_JIT", "1") != "0"
+
+# Identificadores de modelo dentro del código compilado
+KERNELS = {"sir": 0, "seir": 1, "seir_normalizado": 2, "sir_adopcion": 3}
+
+
+# ---------------------------------------------------------------
+# Lados derechos: y, dy con forma (n_estados, n_escenarios) y
+# p con forma (n_parametros, n_escenarios), en el orden de MODELOS.
+# ---------------------------------------------------------------
+@njit(cache=True)
+def kernel_sir(y, p, dy):
+    for k in range(y.shape[1]):
+        beta, gamma, N = p[0, k], p[1, k], p[2, k]
+        S, I = y[0, k], y[1, k]
+        contagio = beta * S * I / N
+        dy[0, k] = -contagio
+        dy[1, k] = contagio - gamma * I
+        dy[2, k] = gamma * I
+
+
+@njit(cache=True)
+def kernel_seir(y, p, dy):
+    for k in range(y.shape[1]):
+        beta, sigma, gamma, N = p[0, k], p[1, k], p[2, k], p[3, k]
+        S, E, I = y[0, k], y[1, k], y[2, k]
+        contagio = beta * S * I / N
+        dy[0, k] = -contagio
+        dy[1, k] = contagio - sigma * E
+        dy[2, k] = sigma * E - gamma * I
+        dy[3, k] = gamma * I
+
+
+@njit(cache=True)
+def kernel_seir_normalizado(y, p, dy):
+    for k in range(y.shape[1]):
+        beta, mu, alpha, delta, mu_i, nu = p[0, k], p[1, k], p[2, k], p[3, k], p[4, k], p[5, k]
+        S, E, I, R = y[0, k], y[1, k], y[2, k], y[3, k]
+        dy[0, k] = mu - (alpha * I + mu + nu) * S
+        dy[1, k] = alpha * I * S - (beta + mu) * E
+        dy[2, k] = beta * E - (mu_i + delta + mu) * I
+        dy[3, k] = delta * I + nu * S - mu * R
+
+
+@njit(cache=True)
+def kernel_sir_adopcion(y, p, dy):
+    for k in range(y.shape[1]):
+        beta, gamma, alpha, N = p[0, k], p[1, k], p[2, k], p[3, k]
+        S, I = y[0, k], y[1, k]
+        contagio = beta * S * I / N + alpha * S
+        dy[0, k] = -contagio
+        dy[1, k] = contagio - gamma * I
+        dy[2, k] = gamma * I
+
+
+@njit(cache=True)
+def evaluar_kernel(modelo, y, p, dy):
+    """Despacha por identificador (numba no cachea funciones pasadas como argumento)."""
+    if modelo == 0:
+        kernel_sir(y, p, dy)
+    elif modelo == 1:
+        kernel_seir(y, p, dy)
+    elif modelo == 2:
+        kernel_seir_normalizado(y, p, dy)
+    else:
+        kernel_sir_adopcion(y, p, dy)
+
+
+# ---------------------------------------------------------------
+# Dormand-Prince 5(4) con control de error como el RK45 de scipy
+# ---------------------------------------------------------------
+_A = np.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0],
+    [1 / 5, 0.0, 0.0, 0.0, 0.0],
+    [3 / 40, 9 / 40, 0.0, 0.0, 0.0],
+    [44 / 45, -56 / 15, 32 / 9, 0.0, 0.0],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0.0],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+])
+_B = np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+_E = np.array([-71 / 57600, 0.0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+# Salida densa de cuarto orden (los mismos coeficientes que usa scipy)
+_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+SEGURIDAD = 0.9
+FACTOR_MIN = 0.2
+FACTOR_MAX = 10.0
+MAX_PASOS = 1_000_000
+EPS = np.finfo(float).eps
+
+
+@njit(cache=True)
+def _norma(x, escala):
+    return np.sqrt(np.mean((x / escala) ** 2))
+
+
+@njit(cache=True, nogil=True)
+def dopri5(modelo, t0, t1, y0, p, rtol, atol, A, B, E, P):
+    """
+    Integra de t0 a t1 el estado plano ``y0`` (forma n_estados x n_escenarios
+    aplanada). Devuelve (ts, ys, qs, nfev, exito): instantes y estados de
+    cada paso aceptado y, por intervalo, los coeficientes (n, 4) de la
+    salida densa.
+    """
+    forma = (y0.size // p.shape[1], p.shape[1])
+    n = y0.size
+    capacidad = 256
+    ts = np.empty(capacidad)
+    ys = np.empty((capacidad, n))
+    qs = np.empty((capacidad, n, 4))
+    K = np.empty((7, n))
+
+    y = y0.copy()
+    f = np.empty(n)
+    evaluar_kernel(modelo, y.reshape(forma), p, f.reshape(forma))
+    nfev = 1
+    ts[0], ys[0] = t0, y
+    m = 1
+
+    # Paso inicial (Hairer, Nørsett y Wanner; igual que scipy)
+    escala = atol + np.abs(y) * rtol
+    d0, d1 = _norma(y, escala), _norma(f, escala)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    y1 = y + h0 * f
+    f1 = np.empty(n)
+    evaluar_kernel(modelo, y1.reshape(forma), p, f1.reshape(forma))
+    nfev += 1
+    d2 = _norma(f1 - f, escala) / h0
+    if d1 <= 1e-15 and d2 <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / 5)
+    h = min(100 * h0, h1, t1 - t0)
+
+    t = t_nuevo = t0
+    y_nuevo = np.empty(n)
+    while t < t1:
+        if m >= MAX_PASOS:
+            return ts[:m], ys[:m], qs[:m - 1], nfev, False
+        h_min = 10 * EPS * abs(t)
+        rechazado = False
+        while True:
+            if h < h_min:
+                return ts[:m], ys[:m], qs[:m - 1], nfev, False
+            h = min(h, t1 - t)
+            K[0] = f
+            for etapa in range(1, 6):
+                acumulado = y.copy()
+                for j in range(etapa):
+                    acumulado += h * A[etapa, j] * K[j]
+                evaluar_kernel(modelo, acumulado.reshape(forma), p, K[etapa].reshape(forma))
+            y_nuevo[:] = y
+            for j in range(6):
+                y_nuevo += h * B[j] * K[j]
+            evaluar_kernel(modelo, y_nuevo.reshape(forma), p, K[6].reshape(forma))
+            nfev += 6
+
+            error = np.zeros(n)
+            for j in range(7):
+                error += h * E[j] * K[j]
+            escala = atol + np.maximum(np.abs(y), np.abs(y_nuevo)) * rtol
+            norma = _norma(error, escala)
+
+            if norma < 1:
+                factor = FACTOR_MAX if norma == 0 else min(FACTOR_MAX, SEGURIDAD * norma ** (-1 / 5))
+                if rechazado:
+                    factor = min(1.0, factor)
+                t_nuevo = t1 if h >= t1 - t else t + h
+                h *= factor
+                break
+            h *= max(FACTOR_MIN, SEGURIDAD * norma ** (-1 / 5))
+            rechazado = True
+
+        if m == capacidad:
+            capacidad *= 2
+            ts2, ys2, qs2 = np.empty(capacidad), np.empty((capacidad, n)), np.empty((capacidad, n, 4))
+            ts2[:m], ys2[:m], qs2[:m - 1] = ts[:m], ys[:m], qs[:m - 1]
+            ts, ys, qs = ts2, ys2, qs2
+        qs[m - 1] = (t_nuevo - t) * (K.T @ P)
+        t = t_nuevo
+        y[:] = y_nuevo
+        f[:] = K[6]
+        ts[m], ys[m] = t, y
+        m += 1
+
+    return ts[:m], ys[:m], qs[:m - 1], nfev, True
+
+
+class TramoCompilado:
+    """
+    Salida densa de ``dopri5``. Expone lo mismo que usa ``Trayectoria`` de
+    un ``OdeSolution``: ``t_max``, ``ts`` y ``tramo(t)`` con forma
+    (n, len(t)).
+    """
+
+    def __init__(self, ts, ys, qs):
+        self.ts = ts
+        self.ys = ys
+        self.qs = qs
+        self.t_min = float(ts[0])
+        self.t_max = float(ts[-1])
+
+    def __call__(self, t):
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        if len(self.ts) < 2:
+            return np.repeat(self.ys[:1].T, t.size, axis=1)
+        i = np.clip(np.searchsorted(self.ts, t, side="right") - 1, 0, len(self.ts) - 2)
+        x = (t - self.ts[i]) / (self.ts[i + 1] - self.ts[i])
+        potencias = x[:, None] ** np.arange(1, 5)
+        return (self.ys[i] + np.einsum("kij,kj->ki", self.qs[i], potencias)).T
+
+
+def integrar_compilado(modelo, t0, t1, y0_plano, valores, rtol=1e-6, atol=1e-9):
+    """
+    Integra con ``dopri5`` y devuelve (tramo, estadisticas). ``valores`` es
+    la tupla de parámetros de ``preparar_lote``.
+    """
+    p = np.ascontiguousarray(np.vstack(valores), dtype=float)
+    ts, ys, qs, nfev, exito = dopri5(KERNELS[modelo], float(t0), float(t1),
+                                     np.ascontiguousarray(y0_plano, dtype=float), p,
+                                     float(rtol), float(atol), _A, _B, _E, _P)
+    if not exito:
+        raise RuntimeError(f"dopri5 no llegó a t={t1:g} (se detuvo en t={ts[-1]:g})")
+    return TramoCompilado(ts, ys, qs), {"pasos": len(ts) - 1, "nfev": int(nfev)}
+
+
+def rhs_compilado(modelo, forma, valores):
+    """``f(t, y_plano)`` para solve_ivp que evalúa el núcleo compilado."""
+    identificador = KERNELS[modelo]
+    p = np.ascontiguousarray(np.vstack(valores), dtype=float)
+
+    def f(t, y_plano):
+        dy = np.empty(forma)
+        evaluar_kernel(identificador, np.ascontiguousarray(y_plano).reshape(forma), p, dy)
+        return dy.ravel()
+
+    return f
+
+
+def precompilar():
+    """
+    Carga (o compila, la primera vez) los núcleos de todos los modelos.
+    Se usa para calentar los procesos del pool antes de la primera petición.
+    """
+    if not JIT_ACTIVO:
+        return False
+    from utils.modelos import MODELOS
+
+    for modelo in KERNELS:
+        spec = MODELOS[modelo]
+        integrar_compilado(modelo, 0.0, 1e-3, np.full(len(spec["estados"]), 0.25),
+                           tuple(np.ones(1) for _ in spec["parametros"]))
+    return True
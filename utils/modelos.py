@@ -0,0 +1,476 @@
+import copy
+import threading
+
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+
+from utils.cache import CACHE_SIMULACIONES, clave_canonica
+from utils.kernels import JIT_ACTIVO, KERNELS, integrar_compilado, rhs_compilado
+
+# ===============================================================
+# Motor vectorizado de modelos compartimentales
+# ---------------------------------------------------------------
+# Cada lado derecho recibe el estado con forma (n_estados, n_escenarios)
+# y parámetros escalares o arrays de longitud n_escenarios, de modo que
+# un barrido de cientos de β/γ se integra en una sola llamada a solve_ivp.
+# Subir "version" de un modelo invalida sus resultados en cache.
+# ===============================================================
+
+def rhs_sir(t, y, beta, gamma, N):
+    """SIR clásico: S' = -βSI/N, I' = βSI/N - γI, R' = γI."""
+    S, I, R = y
+    contagio = beta * S * I / N
+    return np.stack([-contagio, contagio - gamma * I, gamma * I])
+
+
+def rhs_seir(t, y, beta, sigma, gamma, N):
+    """SEIR clásico con periodo de incubación 1/σ."""
+    S, E, I, R = y
+    contagio = beta * S * I / N
+    return np.stack([
+        -contagio,
+        contagio - sigma * E,
+        sigma * E - gamma * I,
+        gamma * I,
+    ])
+
+
+def rhs_seir_normalizado(t, y, beta, mu, alpha, delta, mu_i, nu):
+    """
+    SEIR normalizado del artículo (S, E, I, R como fracciones de N):
+
+      dS/dt = mu - (alpha * I + mu + nu) * S
+      dE/dt = alpha * I * S - (beta + mu) * E
+      dI/dt = beta * E - (mu_i + delta + mu) * I
+      dR/dt = delta * I + nu * S - mu * R
+    """
+    S, E, I, R = y
+    return np.stack([
+        mu - (alpha * I + mu + nu) * S,
+        alpha * I * S - (beta + mu) * E,
+        beta * E - (mu_i + delta + mu) * I,
+        delta * I + nu * S - mu * R,
+    ])
+
+
+def rhs_sir_adopcion(t, y, beta, gamma, alpha, N):
+    """SIR de adopción con término de adopción externa αS."""
+    S, I, R = y
+    contagio = beta * S * I / N + alpha * S
+    return np.stack([-contagio, contagio - gamma * I, gamma * I])
+
+
+# ---------------------------------------------------------------
+# Jacobianos analíticos: bloques de forma (n_estados, n_estados, n_escenarios)
+# ---------------------------------------------------------------
+def _bloques(filas, n):
+    """Apila una matriz de expresiones (escalares o arrays) en un array 3D."""
+    return np.array([[np.broadcast_to(v, (n,)) for v in fila] for fila in filas], dtype=float)
+
+
+def jac_sir(t, y, beta, gamma, N):
+    S, I, R = y
+    n, cero = S.size, 0.0
+    return _bloques([
+        [-beta * I / N, -beta * S / N, cero],
+        [beta * I / N, beta * S / N - gamma, cero],
+        [cero, gamma, cero],
+    ], n)
+
+
+def jac_seir(t, y, beta, sigma, gamma, N):
+    S, E, I, R = y
+    n, cero = S.size, 0.0
+    return _bloques([
+        [-beta * I / N, cero, -beta * S / N, cero],
+        [beta * I / N, -sigma, beta * S / N, cero],
+        [cero, sigma, -gamma, cero],
+        [cero, cero, gamma, cero],
+    ], n)
+
+
+def jac_seir_normalizado(t, y, beta, mu, alpha, delta, mu_i, nu):
+    S, E, I, R = y
+    n, cero = S.size, 0.0
+    return _bloques([
+        [-(alpha * I + mu + nu), cero, -alpha * S, cero],
+        [alpha * I, -(beta + mu), alpha * S, cero],
+        [cero, beta, -(mu_i + delta + mu), cero],
+        [nu, cero, delta, -mu],
+    ], n)
+
+
+def jac_sir_adopcion(t, y, beta, gamma, alpha, N):
+    S, I, R = y
+    n, cero = S.size, 0.0
+    return _bloques([
+        [-beta * I / N - alpha, -beta * S / N, cero],
+        [beta * I / N + alpha, beta * S / N - gamma, cero],
+        [cero, gamma, cero],
+    ], n)
+
+
+MODELOS = {
+    "sir": {
+        "rhs": rhs_sir,
+        "jac": jac_sir,
+        "estados": ("S", "I", "R"),
+        "parametros": ("beta", "gamma", "N"),
+        "version": 1,
+    },
+    "seir": {
+        "rhs": rhs_seir,
+        "jac": jac_seir,
+        "estados": ("S", "E", "I", "R"),
+        "parametros": ("beta", "sigma", "gamma", "N"),
+        "version": 1,
+    },
+    "seir_normalizado": {
+        "rhs": rhs_seir_normalizado,
+        "jac": jac_seir_normalizado,
+        "estados": ("S", "E", "I", "R"),
+        "parametros": ("beta", "mu", "alpha", "delta", "mu_i", "nu"),
+        "version": 1,
+    },
+    "sir_adopcion": {
+        "rhs": rhs_sir_adopcion,
+        "jac": jac_sir_adopcion,
+        "estados": ("S", "I", "R"),
+        "parametros": ("beta", "gamma", "alpha", "N"),
+        "version": 1,
+    },
+}
+
+
+# ===============================================================
+# Integración por lotes
+# ===============================================================
+def preparar_lote(modelo, y0, params):
+    """
+    Normaliza condiciones iniciales y parámetros a un lote común.
+
+    Devuelve (y0, valores) con y0 de forma (n_estados, n_escenarios) y
+    valores como tupla de arrays de longitud n_escenarios, en el orden de
+    ``MODELOS[modelo]["parametros"]``.
+    """
+    spec = MODELOS[modelo]
+    faltantes = set(spec["parametros"]) - set(params)
+    if faltantes:
+        raise ValueError(f"Faltan parámetros para '{modelo}': {sorted(faltantes)}")
+
+    valores = [np.atleast_1d(np.asarray(params[p], dtype=float)) for p in spec["parametros"]]
+    y0 = np.asarray(y0, dtype=float)
+    if y0.ndim == 1:
+        y0 = y0[:, None]
+    if y0.shape[0] != len(spec["estados"]):
+        raise ValueError(f"'{modelo}' espera {len(spec['estados'])} estados, llegaron {y0.shape[0]}")
+
+    n = max([y0.shape[1]] + [v.size for v in valores])
+    y0 = np.broadcast_to(y0, (y0.shape[0], n)).copy()
+    valores = tuple(np.broadcast_to(v, (n,)).copy() for v in valores)
+    return y0, valores
+
+
+def rhs_plano(modelo, y0, params):
+    """
+    Prepara el lote y devuelve (f, y0_plano, forma), con ``f(t, y_plano)``
+    lista para solve_ivp sobre el estado aplanado. Con numba, ``f`` evalúa
+    el núcleo compilado del modelo.
+    """
+    y0, valores = preparar_lote(modelo, y0, params)
+    forma = y0.shape
+    if JIT_ACTIVO and modelo in KERNELS:
+        return rhs_compilado(modelo, forma, valores), y0.ravel(), forma
+    rhs = MODELOS[modelo]["rhs"]
+
+    def f(t, y_plano):
+        return rhs(t, y_plano.reshape(forma), *valores).ravel()
+
+    return f, y0.ravel(), forma
+
+
+METODOS_IMPLICITOS = ("LSODA", "BDF", "Radau")
+UMBRAL_RIGIDEZ = 500.0     # max|Re λ|·T a partir del cual RK45 da pasos forzados
+
+
+def jac_plano(modelo, y0, params, denso=False):
+    """
+    Jacobiano del sistema aplanado: diagonal por bloques (un bloque por
+    escenario). BDF/Radau aceptan la versión dispersa; LSODA necesita densa.
+    """
+    y0, valores = preparar_lote(modelo, y0, params)
+    forma = y0.shape
+    n_estados, n = forma
+    jac = MODELOS[modelo]["jac"]
+    i, j, k = np.meshgrid(np.arange(n_estados), np.arange(n_estados), np.arange(n), indexing="ij")
+    filas = (i * n + k).ravel()
+    columnas = (j * n + k).ravel()
+    tamano = n_estados * n
+
+    def J(t, y_plano):
+        bloques = jac(t, y_plano.reshape(forma), *valores).ravel()
+        if denso:
+            matriz = np.zeros((tamano, tamano))
+            matriz[filas, columnas] = bloques
+            return matriz
+        return sparse.csc_matrix((bloques, (filas, columnas)), shape=(tamano, tamano))
+
+    return J
+
+
+def diagnosticar_rigidez(modelo, y0, params, t_max):
+    """
+    Autovalores del jacobiano en y0 para cada escenario. Devuelve
+    {"rigidez": max|Re λ|·T, "cociente": max|Re λ| / min|Re λ|, "rigido": bool}.
+    """
+    y0, valores = preparar_lote(modelo, y0, params)
+    bloques = MODELOS[modelo]["jac"](0.0, y0, *valores)
+    autovalores = np.linalg.eigvals(np.moveaxis(bloques, -1, 0))
+    reales = np.abs(autovalores.real)
+    maximo = float(reales.max()) if reales.size else 0.0
+    no_nulos = reales[reales > 1e-14]
+    minimo = float(no_nulos.min()) if no_nulos.size else maximo
+    rigidez = maximo * float(t_max)
+    return {
+        "rigidez": rigidez,
+        "cociente": maximo / minimo if minimo > 0 else 1.0,
+        "rigido": rigidez > UMBRAL_RIGIDEZ,
+    }
+
+
+def elegir_metodo(modelo, y0, params, t_max, method="auto"):
+    """Resuelve ``method="auto"``: BDF con jacobiano si el problema es rígido, RK45 si no."""
+    if method != "auto":
+        return method, None
+    diagnostico = diagnosticar_rigidez(modelo, y0, params, t_max)
+    return ("BDF" if diagnostico["rigido"] else "RK45"), diagnostico
+
+
+def integrar_lote(modelo, y0, params, t_span, t_eval=None, method="RK45",
+                  rtol=1e-6, atol=1e-9, **opciones):
+    """
+    Integra todos los escenarios del lote en una sola llamada a solve_ivp.
+
+    ``params`` mapea nombre -> escalar o array (un valor por escenario);
+    los escalares se replican. Devuelve el resultado de solve_ivp con
+    ``sol.y`` de forma (n_estados, n_escenarios, n_tiempos).
+    """
+    f, y0_plano, forma = rhs_plano(modelo, y0, params)
+    sol = solve_ivp(f, t_span, y0_plano, t_eval=t_eval, method=method,
+                    rtol=rtol, atol=atol, **opciones)
+    sol.y = sol.y.reshape(forma + (-1,))
+    return sol
+
+
+def simular_lote(modelo, y0, params, t_span, t_eval=None, **opciones):
+    """
+    Integra un lote y devuelve (t, y) con ``y`` de forma
+    (n_estados, n_escenarios, n_tiempos). Vive en utils para que los
+    procesos del barrido puedan importarlo sin cargar las páginas de Dash.
+    """
+    sol = integrar_lote(modelo, y0, params, t_span, t_eval=t_eval, **opciones)
+    return sol.t, sol.y
+
+
+# ===============================================================
+# Trayectorias extensibles
+# ===============================================================
+class Trayectoria:
+    """
+    Solución densa por tramos de un lote, integrada desde t=0.
+
+    Guarda el estado final y el interpolante de cada tramo: pedir un
+    horizonte mayor solo integra [t_fin, t_nuevo] y pedir uno menor no
+    integra nada.
+    """
+
+    def __init__(self, modelo, y0, params, method="RK45", rtol=1e-6, atol=1e-9,
+                 t_referencia=None, **opciones):
+        self.modelo = modelo
+        self.params = params
+        self.y0, _ = preparar_lote(modelo, y0, params)
+        self.forma = self.y0.shape
+        # "auto" se decide una vez, con el horizonte de la primera petición
+        self.metodo, self.diagnostico = elegir_metodo(modelo, y0, params,
+                                                      t_referencia or 1.0, method)
+        self.opciones = dict(method=self.metodo, rtol=rtol, atol=atol, **opciones)
+        # RK45 sin opciones extra se integra con el bucle compilado de utils.kernels
+        self.compilado = (JIT_ACTIVO and modelo in KERNELS and self.metodo == "RK45"
+                          and not opciones)
+        self.t_fin = 0.0
+        self.y_fin = self.y0.ravel()
+        self.tramos = []
+        self.estadisticas = {"pasos": 0, "nfev": 0, "njev": 0, "nlu": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def nfev(self):
+        return self.estadisticas["nfev"]
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado["_lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        # Un proceso sin numba continúa la trayectoria con solve_ivp
+        self.compilado = estado.get("compilado", False) and JIT_ACTIVO
+        self._lock = threading.Lock()
+
+    def extender(self, t_nuevo):
+        """Integra solo el intervalo que falta hasta ``t_nuevo``."""
+        with self._lock:
+            if t_nuevo <= self.t_fin:
+                return False
+            if self.compilado:
+                return self._extender_compilado(t_nuevo)
+            f, _, _ = rhs_plano(self.modelo, self.y0, self.params)
+            opciones = dict(self.opciones)
+            if self.metodo in METODOS_IMPLICITOS and "jac" not in opciones:
+                opciones["jac"] = jac_plano(self.modelo, self.y0, self.params,
+                                            denso=self.metodo == "LSODA")
+            sol = solve_ivp(f, (self.t_fin, t_nuevo), self.y_fin,
+                            dense_output=True, **opciones)
+            if not sol.success:
+                raise RuntimeError(sol.message)
+            self.tramos.append(sol.sol)
+            self.t_fin = float(sol.t[-1])
+            self.y_fin = sol.y[:, -1].copy()
+            self.estadisticas["pasos"] += len(sol.t) - 1
+            for campo in ("nfev", "njev", "nlu"):
+                self.estadisticas[campo] += int(getattr(sol, campo))
+            return True
+
+    def continuacion(self):
+        """
+        Copia que parte del estado final, sin tramos ni estadísticas: es lo
+        que viaja a otro proceso para extenderla (ver ``anexar``).
+        """
+        with self._lock:
+            copia = copy.copy(self)
+        copia.tramos = []
+        copia.estadisticas = dict.fromkeys(self.estadisticas, 0)
+        return copia
+
+    def anexar(self, continuacion):
+        """
+        Añade los tramos de una ``continuacion`` ya extendida. Si mientras
+        tanto esta trayectoria llegó igual de lejos no cambia nada; si llegó
+        menos lejos el tramo nuevo se solapa con el último, que sigue siendo
+        válido. Una continuación que empieza después de ``t_fin`` (p. ej.
+        creada desde otra copia de la trayectoria, más larga) dejaría un
+        hueco sin integrar: se rechaza y devuelve False.
+        """
+        with self._lock:
+            if continuacion.t_fin <= self.t_fin:
+                return False
+            if continuacion.tramos and continuacion.tramos[0].t_min > self.t_fin:
+                return False
+            self.tramos.extend(continuacion.tramos)
+            self.t_fin = continuacion.t_fin
+            self.y_fin = continuacion.y_fin
+            for campo, valor in continuacion.estadisticas.items():
+                self.estadisticas[campo] += valor
+            return True
+
+    def _extender_compilado(self, t_nuevo):
+        _, valores = preparar_lote(self.modelo, self.y0, self.params)
+        tramo, estadisticas = integrar_compilado(
+            self.modelo, self.t_fin, t_nuevo, self.y_fin, valores,
+            rtol=self.opciones["rtol"], atol=self.opciones["atol"],
+        )
+        self.tramos.append(tramo)
+        self.t_fin = tramo.t_max
+        self.y_fin = tramo.ys[-1].copy()
+        for campo, valor in estadisticas.items():
+            self.estadisticas[campo] += valor
+        return True
+
+    def evaluar(self, t):
+        """Evalúa los interpolantes en ``t`` (dentro de [0, t_fin])."""
+        t = np.asarray(t, dtype=float)
+        if self.tramos and t.size and t.max() > self.t_fin * (1 + 1e-12):
+            raise ValueError(f"t={t.max():g} fuera del horizonte integrado ({self.t_fin:g})")
+        y = np.empty((self.y_fin.size, t.size))
+        if not self.tramos:
+            y[:] = self.y_fin[:, None]
+            return y.reshape(self.forma + (-1,))
+
+        limites = np.array([tramo.t_max for tramo in self.tramos])
+        indice = np.minimum(np.searchsorted(limites, t), len(self.tramos) - 1)
+        for i, tramo in enumerate(self.tramos):
+            sel = indice == i
+            if sel.any():
+                y[:, sel] = tramo(t[sel])
+        return y.reshape(self.forma + (-1,))
+
+    def tiempos_solver(self):
+        """Instantes de paso que eligió el solver en todos los tramos."""
+        if not self.tramos:
+            return np.array([0.0])
+        return np.unique(np.concatenate([tramo.ts for tramo in self.tramos]))
+
+
+def integrar_trayectoria(modelo, y0, params, t_max, **opciones):
+    """Trayectoria nueva (sin cache) integrada hasta ``t_max``; es serializable."""
+    trayectoria = Trayectoria(modelo, y0, params, t_referencia=t_max, **opciones)
+    trayectoria.extender(t_max)
+    return trayectoria
+
+
+def extender_trayectoria(trayectoria, t_max):
+    """
+    Extiende y devuelve la trayectoria; función de trabajo del servicio de
+    solvers, que le envía una ``continuacion`` y recibe solo el tramo nuevo.
+    """
+    trayectoria.extender(t_max)
+    return trayectoria
+
+
+def obtener_trayectoria(modelo, y0, params, t_max, ejecutar=None, **opciones):
+    """
+    Trayectoria compartida en ``CACHE_SIMULACIONES`` y extendida hasta
+    ``t_max``. La clave no incluye el horizonte, de modo que subir el
+    tiempo de simulación reutiliza lo ya integrado.
+
+    ``ejecutar(clave, trayectoria, t_max)``, si se da, hace la integración
+    fuera del hilo actual (p. ej. ``SERVICIO_SOLVER.extender``) y devuelve
+    la trayectoria extendida. Si dos extensiones se cruzan, en cache queda
+    la que llega más lejos.
+    """
+    clave = clave_canonica("trayectoria", modelo, MODELOS[modelo]["version"],
+                           y0, params, opciones)
+    trayectoria = CACHE_SIMULACIONES.obtener_o_calcular(
+        clave, lambda: Trayectoria(modelo, y0, params, t_referencia=t_max, **opciones)
+    )
+    if t_max <= trayectoria.t_fin:
+        return trayectoria
+
+    if ejecutar is None:
+        trayectoria.extender(t_max)
+    else:
+        trayectoria = ejecutar(clave, trayectoria, t_max)
+    # Volver a guardar para que el nivel en disco vea el tramo nuevo
+    return CACHE_SIMULACIONES.guardar(
+        clave, trayectoria,
+        conservar=lambda actual, nueva: actual is not nueva and actual.t_fin >= nueva.t_fin,
+    )
+
+
+def simular_cacheado(modelo, y0, params, t_span, t_eval=None, **opciones):
+    """
+    Como ``simular_lote`` pero evaluando una ``Trayectoria`` cacheada.
+    ``t_span`` debe empezar en 0; sin ``t_eval`` se devuelven los pasos
+    del solver.
+    """
+    t0, t1 = float(t_span[0]), float(t_span[1])
+    if t0 != 0.0:
+        raise ValueError("Las trayectorias cacheadas empiezan en t=0")
+    trayectoria = obtener_trayectoria(modelo, y0, params, t1, **opciones)
+    if t_eval is None:
+        t_eval = trayectoria.tiempos_solver()
+        t_eval = np.append(t_eval[t_eval < t1], t1)
+    t_eval = np.asarray(t_eval, dtype=float)
+    return t_eval, trayectoria.evaluar(t_eval)
@@ -0,0 +1,163 @@
+import json
+
+import dash
+from dash import Input, Output, Patch, no_update
+import numpy as np
+
+from utils.modelos import obtener_trayectoria
+
+# ===============================================================
+# Muestreo adaptativo de soluciones densas
+# ---------------------------------------------------------------
+# En lugar de rejillas fijas (200, 300, 1000, 1500 puntos) se resuelve una
+# vez con salida densa y se eligen los instantes según la curvatura: muchos
+# puntos alrededor del pico, pocos en las colas planas. El número total sale
+# del ancho en píxeles de la gráfica.
+# ===============================================================
+
+ANCHO_POR_DEFECTO = 800     # px, mientras el navegador no informe el real
+PIXELES_POR_PUNTO = 4
+MIN_PUNTOS = 40
+MAX_PUNTOS = 2000
+SOBREMUESTREO = 8           # rejilla fina usada para estimar la curvatura
+FRACCION_UNIFORME = 0.2     # parte del presupuesto repartida de forma uniforme
+
+
+def presupuesto_puntos(ancho_px=None, tope=MAX_PUNTOS):
+    """Número de muestras para una gráfica de ``ancho_px`` píxeles."""
+    ancho = ANCHO_POR_DEFECTO if not ancho_px else float(ancho_px)
+    return int(np.clip(ancho / PIXELES_POR_PUNTO, MIN_PUNTOS, min(tope, MAX_PUNTOS)))
+
+
+def tiempos_adaptativos(evaluar, t0, t1, presupuesto):
+    """
+    Elige ``presupuesto`` instantes en [t0, t1] con densidad proporcional a
+    la curvatura de las curvas que devuelve ``evaluar(t)`` (cualquier forma
+    cuyo último eje sea el tiempo).
+    """
+    presupuesto = max(int(presupuesto), 2)
+    fino = np.linspace(t0, t1, presupuesto * SOBREMUESTREO)
+    y = np.asarray(evaluar(fino)).reshape(-1, fino.size)
+
+    # Escalar cada curva a su rango para que todas pesen lo mismo
+    rango = np.ptp(y, axis=1, keepdims=True)
+    rango[rango == 0] = 1.0
+    curvatura = np.abs(np.diff(y / rango, n=2, axis=1)).max(axis=0)
+    curvatura = np.concatenate([[curvatura[0]], curvatura, [curvatura[-1]]])
+
+    total = curvatura.sum()
+    densidad = FRACCION_UNIFORME / fino.size + (
+        (1 - FRACCION_UNIFORME) * curvatura / total if total > 0 else (1 - FRACCION_UNIFORME) / fino.size
+    )
+    acumulada = np.concatenate([[0.0], np.cumsum(densidad[1:] + densidad[:-1]) / 2])
+    acumulada /= acumulada[-1]
+
+    t = np.interp(np.linspace(0, 1, presupuesto), acumulada, fino)
+    t[0], t[-1] = t0, t1
+    return np.unique(t)
+
+
+def muestrear_trayectoria(trayectoria, t0, t1, presupuesto):
+    """Devuelve (t, y) de una ``Trayectoria`` muestreada adaptativamente."""
+    t = tiempos_adaptativos(trayectoria.evaluar, t0, t1, presupuesto)
+    return t, trayectoria.evaluar(t)
+
+
+def simular_adaptativo(modelo, y0, params, t_max, presupuesto, ejecutar=None, **opciones):
+    """
+    Integra (o reutiliza) la trayectoria hasta ``t_max`` y la muestrea con
+    ``presupuesto`` puntos. ``y`` tiene forma (n_estados, n_escenarios, n_t).
+    ``ejecutar`` se pasa tal cual a ``obtener_trayectoria``.
+    """
+    trayectoria = obtener_trayectoria(modelo, y0, params, t_max, ejecutar=ejecutar, **opciones)
+    return muestrear_trayectoria(trayectoria, 0.0, float(t_max), presupuesto)
+
+
+def ventana_relayout(relayout, t_max):
+    """
+    Interpreta ``relayoutData`` de una gráfica temporal. Devuelve la ventana
+    (t0, t1) visible, (0, t_max) si el usuario volvió al zoom automático, o
+    None si el evento no cambia el eje x.
+    """
+    if not relayout:
+        return None
+    if relayout.get("xaxis.autorange"):
+        return 0.0, float(t_max)
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        t0, t1 = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    elif "xaxis.range" in relayout:
+        t0, t1 = relayout["xaxis.range"]
+    else:
+        return None
+    t0, t1 = sorted((float(t0), float(t1)))
+    return t0, t1
+
+
+def muestrear_ventana(trayectoria, t0, t1, presupuesto, t_max=None, relleno=0.5):
+    """
+    Muestrea solo la ventana visible (más ``relleno`` de su ancho a cada lado
+    para que un pequeño desplazamiento no deje huecos) con ``presupuesto``
+    puntos dentro de lo visible. No integra: usa el interpolante guardado.
+    ``t_max`` es el horizonte dibujado: la trayectoria viene de la cache y
+    puede estar integrada más allá, pero no se muestra nada pasado ``t_max``.
+    """
+    horizonte = trayectoria.t_fin if t_max is None else min(float(t_max), trayectoria.t_fin)
+    ancho = t1 - t0
+    a = max(0.0, t0 - relleno * ancho)
+    b = min(horizonte, t1 + relleno * ancho)
+    if b <= a:
+        a, b = 0.0, horizonte
+    presupuesto = int(presupuesto * (b - a) / ancho) if ancho > 0 else presupuesto
+    return muestrear_trayectoria(trayectoria, a, b, min(max(presupuesto, 2), MAX_PUNTOS * 2))
+
+
+def parche_zoom(relayout, simulacion, modelo, presupuesto, escenario=0, ejecutar=None,
+                **opciones):
+    """
+    Patch con x/y re-muestreados en la ventana visible para una gráfica con
+    una traza por estado. ``simulacion`` es el dict {"y0", "params", "t_max"}
+    guardado por el callback que dibujó la figura; la trayectoria sale de la
+    cache, así que no se vuelve a integrar.
+    """
+    if not simulacion:
+        return no_update
+    ventana = ventana_relayout(relayout, simulacion["t_max"])
+    if ventana is None:
+        return no_update
+
+    trayectoria = obtener_trayectoria(modelo, simulacion["y0"], simulacion["params"],
+                                      simulacion["t_max"], ejecutar=ejecutar, **opciones)
+    t, y = muestrear_ventana(trayectoria, *ventana, presupuesto, t_max=simulacion["t_max"])
+
+    parche = Patch()
+    for i, curva in enumerate(y[:, escenario, :]):
+        parche["data"][i]["x"] = t
+        parche["data"][i]["y"] = curva
+    return parche
+
+
+def registrar_ancho_graficas(id_store, ids_graficas):
+    """
+    Callback de cliente que guarda en ``id_store`` el ancho en píxeles de
+    cada gráfica ({id: ancho}). Se dispara al dibujar la primera gráfica,
+    así que la siguiente simulación ya usa el ancho real.
+    """
+    dash.clientside_callback(
+        """
+        function(_) {
+            var ids = %s, anchos = {};
+            ids.forEach(function(id) {
+                var el = document.getElementById(id);
+                if (el) { anchos[id] = el.offsetWidth; }
+            });
+            return anchos;
+        }
+        """ % json.dumps(list(ids_graficas)),
+        Output(id_store, "data"),
+        Input(ids_graficas[0], "figure"),
+    )
+
+
+def ancho_de(anchos, id_grafica):
+    """Lee el ancho de ``id_grafica`` del Store (o None si aún no llegó)."""
+    return (anchos or {}).get(id_grafica)
@@ -0,0 +1,62 @@
+import threading
+
+from utils.barrido import obtener_pool
+from utils.modelos import extender_trayectoria
+
+# ===============================================================
+# Servicio de solvers para servidores con hilos
+# ---------------------------------------------------------------
+# Los callbacks de Flask pueden llegar desde varios hilos a la vez y los
+# integradores Fortran (LSODA/odeint) no son reentrantes. Aquí cada
+# integración se encola en el pool de procesos compartido con los
+# barridos (utils.barrido): cada proceso ejecuta una integración a la vez
+# y varias peticiones avanzan en paralelo. Al proceso viaja solo el
+# estado final de la trayectoria y vuelve solo el tramo nuevo, que se
+# anexa a la trayectoria del cache. Peticiones simultáneas de la misma
+# trayectoria comparten un único cálculo.
+# ===============================================================
+
+
+class ServicioSolver:
+    def __init__(self, pool=None):
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._en_curso = {}
+
+    @property
+    def pool(self):
+        return self._pool or obtener_pool()
+
+    def extender(self, clave, trayectoria, t_max):
+        """
+        Extiende ``trayectoria`` (en sitio) hasta ``t_max`` en un proceso
+        del pool y la devuelve. Si otro hilo ya está integrando la misma
+        clave hasta un horizonte suficiente, desde un instante que esta
+        trayectoria ya cubre, espera ese tramo en lugar de repetir el
+        trabajo. Tras un desalojo de la cache o una lectura del nivel en
+        disco la misma clave puede tener otro objeto, más corto: en ese
+        caso se integra su propia continuación.
+        """
+        with self._lock:
+            en_curso = self._en_curso.get(clave)
+            if (en_curso is not None and en_curso[0] >= t_max
+                    and en_curso[1] <= trayectoria.t_fin):
+                futuro = en_curso[2]
+            else:
+                futuro = self._enviar(trayectoria, t_max)
+                self._en_curso[clave] = (t_max, trayectoria.t_fin, futuro)
+        try:
+            trayectoria.anexar(futuro.result())
+        finally:
+            with self._lock:
+                if self._en_curso.get(clave, (None, None, None))[2] is futuro:
+                    del self._en_curso[clave]
+        if trayectoria.t_fin < t_max:
+            # El tramo compartido no encajaba (empezaba más allá de t_fin)
+            trayectoria.anexar(self._enviar(trayectoria, t_max).result())
+        return trayectoria
+
+    def _enviar(self, trayectoria, t_max):
+        return self.pool.submit(extender_trayectoria, trayectoria.continuacion(), t_max)
+
+SERVICIO_SOLVER = ServicioSolver()